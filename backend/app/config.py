@@ -10,11 +10,74 @@ class Config:
     SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
     SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
 
+    # Async PostgREST connection pool used by the API handlers
+    SUPABASE_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_MAX_CONNECTIONS", "50"))
+    SUPABASE_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_MAX_KEEPALIVE", "20"))
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_KEEPALIVE_EXPIRY", "60"))
+    SUPABASE_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", "10"))
+    SUPABASE_HTTP2 = os.environ.get("SUPABASE_HTTP2", "true").lower() == "true"
+
+    # Read-through cache for token reads (TTL in seconds); set TOKEN_CACHE_REDIS_URL to share
+    # it between workers (needs the redis package) instead of keeping an LRU per process
+    TOKEN_CACHE = os.environ.get("TOKEN_CACHE", "true").lower() == "true"
+    TOKEN_CACHE_TTL = float(os.environ.get("TOKEN_CACHE_TTL", "10"))
+    TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_REDIS_URL = os.environ.get("TOKEN_CACHE_REDIS_URL")
+
     # Solana configuration
     SOLANA_NETWORK = os.environ.get("SOLANA_NETWORK", "testnet")
     SOLANA_RPC_ENDPOINT = os.environ.get("SOLANA_RPC_ENDPOINT", "https://api.testnet.solana.com")
+    # RPC URL for SOLANA_NETWORK=localnet: a local test validator or scripts/fake_rpc_server.py
+    SOLANA_LOCALNET_URL = os.environ.get("SOLANA_LOCALNET_URL", "http://127.0.0.1:8899")
     SOLANA_PAYER_KEY = os.environ.get("SOLANA_PAYER_KEY")
 
+    # Solana RPC connection pool
+    SOLANA_RPC_MAX_CONNECTIONS = int(os.environ.get("SOLANA_RPC_MAX_CONNECTIONS", "64"))
+    SOLANA_RPC_MAX_KEEPALIVE = int(os.environ.get("SOLANA_RPC_MAX_KEEPALIVE", "32"))
+    SOLANA_RPC_KEEPALIVE_EXPIRY = float(os.environ.get("SOLANA_RPC_KEEPALIVE_EXPIRY", "60"))
+    SOLANA_RPC_TIMEOUT = float(os.environ.get("SOLANA_RPC_TIMEOUT", "10"))
+    SOLANA_RPC_HTTP2 = os.environ.get("SOLANA_RPC_HTTP2", "true").lower() == "true"
+
+    # Extra read endpoints (comma-separated) and hedging for the RPC router
+    SOLANA_RPC_ENDPOINTS = [url.strip() for url in os.environ.get("SOLANA_RPC_ENDPOINTS", "").split(",") if url.strip()]
+    SOLANA_WS_ENDPOINT = os.environ.get("SOLANA_WS_ENDPOINT")
+    SOLANA_RPC_HEDGE = os.environ.get("SOLANA_RPC_HEDGE", "true").lower() == "true"
+
+    # Per-endpoint rate limit sized to the provider plan, retries and circuit breaker
+    SOLANA_RPC_RATE_LIMIT = float(os.environ.get("SOLANA_RPC_RATE_LIMIT", "25"))
+    SOLANA_RPC_BURST = float(os.environ.get("SOLANA_RPC_BURST", "50"))
+    SOLANA_RPC_MAX_RETRIES = int(os.environ.get("SOLANA_RPC_MAX_RETRIES", "4"))
+    SOLANA_RPC_BREAKER_FAILURES = int(os.environ.get("SOLANA_RPC_BREAKER_FAILURES", "5"))
+    SOLANA_RPC_BREAKER_RESET = float(os.environ.get("SOLANA_RPC_BREAKER_RESET", "10"))
+
+    # Extra fee payers (comma-separated base58 secret keys) and checkpoint directory for token distributions
+    SOLANA_FEE_PAYER_KEYS = [key.strip() for key in os.environ.get("SOLANA_FEE_PAYER_KEYS", "").split(",") if key.strip()]
+    DISTRIBUTION_CHECKPOINT_DIR = os.environ.get("DISTRIBUTION_CHECKPOINT_DIR", "distribution_checkpoints")
+    # Where the name -> address lookup table mapping is persisted
+    SOLANA_LOOKUP_TABLE_FILE = os.environ.get("SOLANA_LOOKUP_TABLE_FILE", "lookup_tables.json")
+    # Where the addresses of our durable nonce accounts are persisted
+    SOLANA_NONCE_POOL_FILE = os.environ.get("SOLANA_NONCE_POOL_FILE", "nonce_accounts.json")
+
+    # Priority fees: compute-unit price bounds in micro-lamports
+    SOLANA_PRIORITY_FEES = os.environ.get("SOLANA_PRIORITY_FEES", "true").lower() == "true"
+    SOLANA_PRIORITY_FEE_MIN = int(os.environ.get("SOLANA_PRIORITY_FEE_MIN", "0"))
+    SOLANA_PRIORITY_FEE_MAX = int(os.environ.get("SOLANA_PRIORITY_FEE_MAX", "1000000"))
+
+    # Size SetComputeUnitLimit from simulated usage instead of the 200k-per-instruction default
+    SOLANA_COMPUTE_UNIT_LIMITS = os.environ.get("SOLANA_COMPUTE_UNIT_LIMITS", "true").lower() == "true"
+
+    # ATA and metadata PDA cache size, and an optional SQLite file to persist it across restarts
+    SOLANA_DERIVATION_CACHE_SIZE = int(os.environ.get("SOLANA_DERIVATION_CACHE_SIZE", "100000"))
+    SOLANA_DERIVATION_CACHE_DB = os.environ.get("SOLANA_DERIVATION_CACHE_DB")
+
+    # Re-send in-flight transactions every interval (seconds) until they land or expire;
+    # SOLANA_SEND_ENDPOINT is an optional leader-facing RPC used for the resends
+    SOLANA_REBROADCAST = os.environ.get("SOLANA_REBROADCAST", "true").lower() == "true"
+    SOLANA_REBROADCAST_INTERVAL = float(os.environ.get("SOLANA_REBROADCAST_INTERVAL", "0.3"))
+    # Resends per second, budgeted apart from SOLANA_RPC_RATE_LIMIT; resends over it are dropped
+    SOLANA_REBROADCAST_RATE_LIMIT = float(os.environ.get("SOLANA_REBROADCAST_RATE_LIMIT", "25"))
+    SOLANA_SEND_ENDPOINT = os.environ.get("SOLANA_SEND_ENDPOINT")
+
     # Coinbase configuration
     COINBASE_API_KEY = os.environ.get("COINBASE_API_KEY")
     COINBASE_API_SECRET = os.environ.get("COINBASE_API_SECRET")
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import Config
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+# Bumped on every write that can change a token list; list entries are keyed by it
+LIST_GENERATION_KEY = "tokens:lists:generation"
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU with a TTL per entry. Values are stored as given, not copied."""
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Counters live outside the LRU so eviction can never reset a generation
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def clear(self):
+        self._entries.clear()
+        self._counters.clear()
+
+    async def close(self):
+        pass
+
+
+class RedisCacheBackend:
+    """The same interface on a Redis-compatible server, shared by every worker. Values are JSON."""
+
+    def __init__(self, url: str):
+        if redis_asyncio is None:
+            raise Exception("TOKEN_CACHE_REDIS_URL is set but the redis package is not installed")
+        self.client = redis_asyncio.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.client.set(key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def counter(self, key: str) -> int:
+        raw = await self.client.get(key)
+        return int(raw) if raw is not None else 0
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match="tokens:*"):
+            await self.client.delete(key)
+
+    async def close(self):
+        await self.client.close()
+
+
+class TokenCache:
+    """
+    Read-through cache for token detail and token list reads.
+
+    Token rows are keyed by id and list pages by a fingerprint of their query. Writes
+    call invalidate_token() / invalidate_lists(); lists are invalidated all at once by
+    bumping a generation number that is part of every list key, so entries of older
+    generations are simply never read again and age out. Concurrent misses on one key
+    share a single load. A load that was in flight when its key was invalidated does
+    not store its (possibly stale) result.
+
+    With the in-process backend each worker only sees its own invalidations, so other
+    workers can serve a stale row for up to `ttl` seconds; the Redis backend avoids that.
+    """
+
+    def __init__(self, backend, ttl: float = 10.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _read_through(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+
+            async def load_and_store():
+                value = await load()
+                # Misses are not cached: a token created after a 404 must show up at once
+                if value is not None and self._inflight.get(key) is task:
+                    await self.backend.set(key, value, self.ttl)
+                return value
+
+            task = asyncio.ensure_future(load_and_store())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None) if self._inflight.get(key) is task else None)
+        # A cancelled request must not cancel the load other requests are waiting on
+        return await asyncio.shield(task)
+
+    async def get_token(self, token_id: int, load: Callable[[], Awaitable[Optional[Dict]]]) -> Optional[Dict]:
+        return await self._read_through(f"tokens:{token_id}", load)
+
+    async def list_tokens(self, query: Dict, load: Callable[[], Awaitable[Any]]) -> Any:
+        generation = await self.backend.counter(LIST_GENERATION_KEY)
+        fingerprint = hashlib.sha1(json.dumps(query, sort_keys=True).encode()).hexdigest()
+        return await self._read_through(f"tokens:list:{generation}:{fingerprint}", load)
+
+    async def invalidate_token(self, token_id: int):
+        key = f"tokens:{token_id}"
+        self._inflight.pop(key, None)
+        await self.backend.delete(key)
+
+    async def invalidate_lists(self):
+        await self.backend.incr(LIST_GENERATION_KEY)
+
+    async def clear(self):
+        self._inflight.clear()
+        await self.backend.clear()
+
+    def stats(self) -> Dict:
+        return {"hits": self.hits, "misses": self.misses, "inflight": len(self._inflight)}
+
+    async def close(self):
+        await self.backend.close()
+
+
+_cache: Optional[TokenCache] = None
+
+def get_token_cache() -> TokenCache:
+    """Process-wide token cache, on Redis when TOKEN_CACHE_REDIS_URL is set."""
+    global _cache
+    if _cache is None:
+        if Config.TOKEN_CACHE_REDIS_URL:
+            backend = RedisCacheBackend(Config.TOKEN_CACHE_REDIS_URL)
+        else:
+            backend = MemoryCacheBackend(Config.TOKEN_CACHE_SIZE)
+        _cache = TokenCache(backend, Config.TOKEN_CACHE_TTL)
+    return _cache
@@ -0,0 +1,50 @@
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+
+from postgrest._async.request_builder import AsyncSelectRequestBuilder
+
+
+def encode_cursor(row: Dict) -> str:
+    """Opaque cursor pointing just past `row` in (created_at, id) descending order."""
+    payload = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(created_at, str) or not isinstance(row_id, int):
+            raise ValueError()
+        return created_at, row_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+async def fetch_page(
+    query: AsyncSelectRequestBuilder,
+    limit: int,
+    cursor: Optional[str] = None,
+    offset: int = 0
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of `query`, newest first, and the cursor for the page after it.
+
+    With a cursor the page starts right after the row it points to: the filter
+    created_at <= c AND (created_at < c OR id < i) lets Postgres start the
+    (created_at, id) index scan at the cursor, so deep pages cost the same as the
+    first. `offset` is the page/limit compatibility path and still scans past
+    every skipped row. One extra row is fetched to tell whether another page exists.
+    """
+    # postgrest 0.10 repeats the order parameter per column and has no or_(); PostgREST
+    # wants both as one parameter each
+    query.params = query.params.add("order", "created_at.desc,id.desc")
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.lte("created_at", created_at)
+        query.params = query.params.add("or", f"(created_at.lt.{json.dumps(created_at)},id.lt.{row_id})")
+        offset = 0
+    # postgrest 0.10's range() takes an exclusive end
+    result = await query.range(offset, offset + limit + 1).execute()
+    rows = result.data
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -0,0 +1,85 @@
+import asyncio
+from typing import Dict, Optional, Union
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+from ..config import Config
+from ..integrations.rpc_pool import HTTP2_AVAILABLE
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient on an httpx session with explicit connection pool limits."""
+
+    def __init__(self, base_url: str, headers: Dict[str, str], timeout: float, limits: httpx.Limits, http2: bool):
+        self.limits = limits
+        self.http2 = http2
+        super().__init__(base_url, headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, **headers}, timeout=timeout)
+
+    def create_session(self, base_url: str, headers: Dict[str, str], timeout: Union[int, float, httpx.Timeout]) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=self.limits,
+            http2=self.http2
+        )
+
+
+class PostgrestPool:
+    """
+    Process-wide async PostgREST client for the Supabase REST API.
+
+    Replaces the synchronous supabase client in request handlers: queries are awaited
+    on one keep-alive httpx session, so a slow query holds up only the request that
+    made it instead of blocking the event loop for every request on the worker.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = Config.SUPABASE_MAX_CONNECTIONS,
+        max_keepalive_connections: int = Config.SUPABASE_MAX_KEEPALIVE,
+        keepalive_expiry: float = Config.SUPABASE_KEEPALIVE_EXPIRY,
+        timeout: float = Config.SUPABASE_TIMEOUT,
+        http2: bool = Config.SUPABASE_HTTP2
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client: Optional[PooledPostgrestClient] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def client(self) -> PooledPostgrestClient:
+        """The shared client, created on first use."""
+        if self._client is None or self._client.session.is_closed:
+            # Read at first use rather than import, so importing the app needs no credentials
+            if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
+                raise ValueError("Missing Supabase credentials")
+            self._client = PooledPostgrestClient(
+                f"{Config.SUPABASE_URL}/rest/v1",
+                headers={"apiKey": Config.SUPABASE_KEY, "Authorization": f"Bearer {Config.SUPABASE_KEY}"},
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                http2=self.http2
+            )
+        return self._client
+
+    async def close(self):
+        async with self._lock:
+            if self._client is not None:
+                await self._client.aclose()
+            self._client = None
+
+
+postgrest_pool = PostgrestPool()
+
+def get_postgrest_pool() -> PostgrestPool:
+    return postgrest_pool
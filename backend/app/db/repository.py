@@ -0,0 +1,131 @@
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from ..config import Config
+from .cache import TokenCache, get_token_cache
+from .pagination import fetch_page
+from .postgrest import PostgrestPool, PooledPostgrestClient, get_postgrest_pool
+
+
+def _live(row: Dict) -> Dict:
+    """A tokens_live row with the shard-inclusive total as its amount_raised."""
+    row["amount_raised"] = row.pop("live_amount_raised")
+    return row
+
+class TokenRepository:
+    """
+    Async queries against the tokens and contributions tables, for the API handlers.
+
+    Errors from PostgREST surface as postgrest.exceptions.APIError, with the SQLSTATE
+    of a failed procedure call in `code`. With a cache, token detail and list reads
+    are served from it and every write here invalidates what it changed.
+    """
+
+    def __init__(self, pool: PostgrestPool, cache: Optional[TokenCache] = None):
+        self.pool = pool
+        self.cache = cache
+
+    @property
+    def db(self) -> PooledPostgrestClient:
+        return self.pool.client
+
+    async def get_token(self, token_id: int) -> Optional[Dict]:
+        if self.cache is not None:
+            return await self.cache.get_token(token_id, lambda: self._load_token(token_id))
+        return await self._load_token(token_id)
+
+    async def _load_token(self, token_id: int) -> Optional[Dict]:
+        result = await self.db.table("tokens_live").select("*").eq("id", token_id).execute()
+        return _live(result.data[0]) if result.data else None
+
+    async def list_tokens(
+        self,
+        status: Optional[str] = None,
+        creator_wallet: Optional[str] = None,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """A page of tokens, newest first, and the cursor of the next page (None on the last)."""
+        async def load():
+            query = self.db.table("tokens_live").select("*")
+            if status:
+                query = query.eq("status", status)
+            if creator_wallet:
+                query = query.eq("creator_wallet", creator_wallet)
+            rows, next_cursor = await fetch_page(query, limit, cursor=cursor, offset=(page - 1) * limit)
+            return [_live(row) for row in rows], next_cursor
+
+        if self.cache is None:
+            return await load()
+        fingerprint = {"status": status, "creator_wallet": creator_wallet, "page": page, "limit": limit, "cursor": cursor}
+        rows, next_cursor = await self.cache.list_tokens(fingerprint, load)
+        return rows, next_cursor
+
+    async def existing_symbols(self, symbols: Sequence[str]) -> Set[str]:
+        result = await self.db.table("tokens").select("symbol").in_("symbol", list(symbols)).execute()
+        return {row["symbol"] for row in result.data}
+
+    async def insert_tokens(self, rows: List[Dict]) -> List[Dict]:
+        """Insert token rows in one request; returns the stored rows in order."""
+        result = await self.db.table("tokens").insert(rows).execute()
+        if self.cache is not None:
+            await self.cache.invalidate_lists()
+        return result.data
+
+    async def update_token_status(self, token_id: int, status: str) -> Optional[Dict]:
+        result = await self.db.table("tokens").update({"status": status}).eq("id", token_id).execute()
+        if self.cache is not None:
+            await self.cache.invalidate_token(token_id)
+            await self.cache.invalidate_lists()
+        return result.data[0] if result.data else None
+
+    async def contribute(self, token_id: int, wallet_address: str, amount: float) -> Dict:
+        """Run the contribute_to_token procedure; returns {"contribution": ..., "token": ...}."""
+        query = await self.db.rpc("contribute_to_token", {
+            "token_id_param": token_id,
+            "contributor_wallet_param": wallet_address,
+            "amount_param": amount
+        })
+        result = await query.execute()
+        if not result.data:
+            raise Exception("Failed to record contribution")
+        # Every contribution changes the token's live total; lists are only invalidated when
+        # it completes the raise, and otherwise show totals up to the cache TTL old
+        if self.cache is not None:
+            await self.cache.invalidate_token(token_id)
+            if result.data[0]["token"]["status"] != "fundraising":
+                await self.cache.invalidate_lists()
+        return result.data[0]
+
+    async def settle_raises(self) -> Dict[str, List[Dict]]:
+        """
+        Fold the amount_raised shards, then complete or fail (and refund) every raise that
+        ended or reached its target. Contributions don't touch the token row, so nothing
+        else notices a raise ending; run this periodically.
+        """
+        folded = await (await self.db.rpc("fold_amount_raised", {})).execute()
+        settled = await (await self.db.rpc("settle_fundraising", {})).execute()
+        changed = [row["token_id"] for row in folded.data if row["status"] != "fundraising"]
+        changed += [row["settled_token_id"] for row in settled.data]
+        if self.cache is not None and changed:
+            for token_id in changed:
+                await self.cache.invalidate_token(token_id)
+            await self.cache.invalidate_lists()
+        return {"folded": folded.data, "settled": settled.data}
+
+    async def list_contributions(
+        self,
+        token_id: int,
+        page: int = 1,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """A page of a token's contributions, newest first, and the cursor of the next page."""
+        query = self.db.table("contributions").select("*").eq("token_id", token_id)
+        return await fetch_page(query, limit, cursor=cursor, offset=(page - 1) * limit)
+
+
+token_repository = TokenRepository(get_postgrest_pool(), get_token_cache() if Config.TOKEN_CACHE else None)
+
+def get_token_repository() -> TokenRepository:
+    return token_repository
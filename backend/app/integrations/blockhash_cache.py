@@ -0,0 +1,106 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from solana.rpc.commitment import Confirmed
+from solders.hash import Hash
+
+from .rpc_router import RpcRouter
+
+@dataclass(frozen=True)
+class CachedBlockhash:
+    blockhash: Hash
+    last_valid_block_height: int
+    fetched_at: float
+
+class BlockhashCache:
+    """
+    Keep a recent blockhash warm for transaction building.
+
+    A background task refreshes the blockhash every `refresh_interval` seconds so
+    that builders can sign immediately instead of paying a getLatestBlockhash round
+    trip per transaction. A blockhash older than `max_age` is refreshed inline.
+    """
+
+    def __init__(
+        self,
+        router: RpcRouter,
+        refresh_interval: float = 0.4,
+        max_age: float = 10.0,
+        commitment=Confirmed
+    ):
+        self.router = router
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.commitment = commitment
+        self._current: Optional[CachedBlockhash] = None
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _is_fresh(self) -> bool:
+        return self._current is not None and time.monotonic() - self._current.fetched_at < self.max_age
+
+    async def refresh(self) -> CachedBlockhash:
+        resp = await self.router.call(lambda client: client.get_latest_blockhash(self.commitment))
+        self._current = CachedBlockhash(
+            blockhash=resp.value.blockhash,
+            last_valid_block_height=resp.value.last_valid_block_height,
+            fetched_at=time.monotonic()
+        )
+        return self._current
+
+    async def get(self) -> CachedBlockhash:
+        """The latest cached blockhash and its lastValidBlockHeight."""
+        self._ensure_running()
+        if self._is_fresh():
+            self.hits += 1
+            return self._current
+        async with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._is_fresh():
+                self.hits += 1
+                return self._current
+            self.misses += 1
+            return await self.refresh()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error refreshing blockhash: {str(e)}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def start(self):
+        self._ensure_running()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+
+_caches: Dict[RpcRouter, BlockhashCache] = {}
+
+def get_blockhash_cache(router: RpcRouter) -> BlockhashCache:
+    """Process-wide blockhash cache per router."""
+    if router not in _caches:
+        _caches[router] = BlockhashCache(router)
+    return _caches[router]
+
+async def close_blockhash_caches():
+    for cache in _caches.values():
+        await cache.close()
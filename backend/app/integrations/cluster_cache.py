@@ -0,0 +1,96 @@
+import asyncio
+import time
+from typing import Dict, Iterable, Optional
+
+from solders.pubkey import Pubkey
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
+
+from .rpc_router import RpcRouter
+from .spl_accounts import MINT_LAYOUT_SIZE, TOKEN_ACCOUNT_LAYOUT_SIZE
+
+NONCE_ACCOUNT_LAYOUT_SIZE = 80
+# Average slot time used to estimate when the current epoch ends
+SLOT_SECONDS = 0.4
+
+PROGRAM_IDS: Dict[str, Pubkey] = {
+    "token": TOKEN_PROGRAM_ID,
+    "token_2022": Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"),
+    "associated_token": ASSOCIATED_TOKEN_PROGRAM_ID,
+    "token_metadata": Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
+}
+
+class ClusterConstantsCache:
+    """
+    Cache cluster values that only change between epochs.
+
+    Rent-exemption minimums by account size and the current epoch info are loaded
+    once at startup and kept until the estimated end of the epoch, after which the
+    next read refreshes epoch info and drops the rent table if the epoch changed.
+    """
+
+    def __init__(self, router: RpcRouter, account_sizes: Iterable[int] = (MINT_LAYOUT_SIZE, TOKEN_ACCOUNT_LAYOUT_SIZE, NONCE_ACCOUNT_LAYOUT_SIZE)):
+        self.router = router
+        self.account_sizes = tuple(account_sizes)
+        self.program_ids = dict(PROGRAM_IDS)
+        self.epoch_info = None
+        self._epoch_ends_at = 0.0
+        self._rent: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+        self.rpc_calls = 0
+
+    async def load(self):
+        """Populate epoch info, rent minimums for the common account sizes and check program IDs."""
+        await self._refresh_epoch()
+        await asyncio.gather(*(self._fetch_rent(size) for size in self.account_sizes))
+
+        self.rpc_calls += 1
+        resp = await self.router.call(lambda client: client.get_multiple_accounts(list(self.program_ids.values())))
+        for name, account in zip(list(self.program_ids), resp.value):
+            if account is None or not account.executable:
+                print(f"Program {name} ({self.program_ids[name]}) is not deployed on this cluster")
+
+    async def _refresh_epoch(self):
+        self.rpc_calls += 1
+        resp = await self.router.call(lambda client: client.get_epoch_info())
+        info = resp.value
+        if self.epoch_info is not None and info.epoch != self.epoch_info.epoch:
+            self._rent.clear()
+        self.epoch_info = info
+        self._epoch_ends_at = time.monotonic() + (info.slots_in_epoch - info.slot_index) * SLOT_SECONDS
+
+    async def _fetch_rent(self, size: int) -> int:
+        self.rpc_calls += 1
+        resp = await self.router.call(lambda client: client.get_minimum_balance_for_rent_exemption(size))
+        self._rent[size] = resp.value
+        return resp.value
+
+    async def _check_epoch(self):
+        if self.epoch_info is not None and time.monotonic() < self._epoch_ends_at:
+            return
+        async with self._lock:
+            if self.epoch_info is None or time.monotonic() >= self._epoch_ends_at:
+                await self._refresh_epoch()
+
+    async def get_rent_exemption(self, size: int) -> int:
+        """Minimum lamports for a rent-exempt account of `size` bytes."""
+        await self._check_epoch()
+        lamports = self._rent.get(size)
+        if lamports is None:
+            lamports = await self._fetch_rent(size)
+        return lamports
+
+    def get_program_id(self, name: str) -> Pubkey:
+        return self.program_ids[name]
+
+    @property
+    def current_epoch(self) -> Optional[int]:
+        return self.epoch_info.epoch if self.epoch_info is not None else None
+
+
+_caches: Dict[RpcRouter, ClusterConstantsCache] = {}
+
+def get_cluster_cache(router: RpcRouter) -> ClusterConstantsCache:
+    """Process-wide cluster constants per router, shared by every manager instance."""
+    if router not in _caches:
+        _caches[router] = ClusterConstantsCache(router)
+    return _caches[router]
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from solana.rpc.commitment import Confirmed
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID, set_compute_unit_limit
+from solders.instruction import Instruction
+from solders.transaction import Transaction, VersionedTransaction
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID
+
+from .rpc_router import RpcRouter
+
+# Per-transaction compute-unit ceiling
+MAX_COMPUTE_UNITS = 1_400_000
+# Compute budget instruction discriminator for SetComputeUnitLimit
+SET_COMPUTE_UNIT_LIMIT = 2
+# Associated token program Create and CreateIdempotent (the latter is a no-op on an existing account)
+ASSOCIATED_ACCOUNT_CREATES = {b"", bytes([0]), bytes([1])}
+# Logged by the associated token program only when it actually creates the account
+ASSOCIATED_ACCOUNT_CREATED_LOG = "Initialize the associated token account"
+
+TemplateShape = Tuple[Tuple[Tuple[str, bytes], int], ...]
+
+def template_shape(instructions: Sequence[Instruction]) -> TemplateShape:
+    """Instruction kinds and their counts, ignoring compute budget instructions, accounts and amounts."""
+    kinds = Counter(
+        (str(ix.program_id), bytes(ix.data[:1]))
+        for ix in instructions
+        if ix.program_id != COMPUTE_BUDGET_PROGRAM_ID
+    )
+    return tuple(sorted(kinds.items()))
+
+def associated_account_creates(instructions: Sequence[Instruction]) -> int:
+    return sum(1 for ix in instructions if ix.program_id == ASSOCIATED_TOKEN_PROGRAM_ID and bytes(ix.data[:1]) in ASSOCIATED_ACCOUNT_CREATES)
+
+def has_compute_unit_limit(instructions: Sequence[Instruction]) -> bool:
+    return any(ix.program_id == COMPUTE_BUDGET_PROGRAM_ID and ix.data[:1] == bytes([SET_COMPUTE_UNIT_LIMIT]) for ix in instructions)
+
+class ComputeUnitEstimator:
+    """
+    Size SetComputeUnitLimit from simulation.
+
+    The first transaction of each template shape (e.g. create mint + init + ATA + mint_to,
+    or a batch of k transfers) is simulated with the maximum budget; the units it consumed
+    are cached per shape and every later transaction of that shape gets a limit of that
+    many units plus a safety margin, instead of the 200k-per-instruction default. A shape
+    whose simulation failed goes without a limit for `failure_ttl` seconds rather than
+    making every concurrent sender queue behind a fresh simulation.
+
+    A shape only says how many associated token accounts a transaction creates, not
+    whether they exist yet, and CreateIdempotent on an existing account costs a fraction
+    of a real creation. A simulation in which some create found its account already
+    there is not cached, so the shape is never sized below its create path.
+    """
+
+    def __init__(self, router: RpcRouter, margin: float = 0.15, headroom: int = 1000, failure_ttl: float = 5.0):
+        self.router = router
+        self.margin = margin
+        self.headroom = headroom
+        self.failure_ttl = failure_ttl
+        self._units: Dict[TemplateShape, int] = {}
+        # shape -> monotonic time until which it is not simulated again
+        self._failed: Dict[TemplateShape, float] = {}
+        self._locks: Dict[TemplateShape, asyncio.Lock] = {}
+        self.simulations = 0
+        self.hits = 0
+
+    def _limit(self, units: int) -> int:
+        return min(MAX_COMPUTE_UNITS, int(units * (1 + self.margin)) + self.headroom)
+
+    async def limit_for(
+        self,
+        instructions: List[Instruction],
+        build: Callable[[List[Instruction]], Union[Transaction, VersionedTransaction]]
+    ) -> Optional[int]:
+        """
+        Compute-unit limit for `instructions`, simulating the transaction `build` returns
+        the first time a shape is seen. None if the simulation failed, now or within the
+        last `failure_ttl` seconds.
+        """
+        shape = template_shape(instructions)
+        if shape in self._units:
+            self.hits += 1
+            return self._limit(self._units[shape])
+        if self._recently_failed(shape):
+            return None
+
+        lock = self._locks.setdefault(shape, asyncio.Lock())
+        async with lock:
+            # Concurrent senders of a new shape wait for one simulation
+            if shape in self._units:
+                self.hits += 1
+                return self._limit(self._units[shape])
+            if self._recently_failed(shape):
+                return None
+
+            tx = build([set_compute_unit_limit(MAX_COMPUTE_UNITS)] + instructions)
+            if isinstance(tx, Transaction):
+                tx = VersionedTransaction.populate(tx.message, tx.signatures)
+            self.simulations += 1
+            try:
+                resp = await self.router.call(lambda client: client.simulate_transaction(tx, commitment=Confirmed))
+            except Exception:
+                self._failed[shape] = time.monotonic() + self.failure_ttl
+                raise
+            if resp.value.err is not None or not resp.value.units_consumed:
+                print(f"Compute unit simulation failed: {resp.value.err}")
+                self._failed[shape] = time.monotonic() + self.failure_ttl
+                return None
+            creates = associated_account_creates(instructions)
+            if creates and sum(ASSOCIATED_ACCOUNT_CREATED_LOG in line for line in resp.value.logs or []) < creates:
+                print("Compute unit simulation skipped existing token accounts, not caching its units")
+                self._failed[shape] = time.monotonic() + self.failure_ttl
+                return None
+            self._failed.pop(shape, None)
+            self._units[shape] = resp.value.units_consumed
+            return self._limit(resp.value.units_consumed)
+
+    def _recently_failed(self, shape: TemplateShape) -> bool:
+        retry_at = self._failed.get(shape)
+        if retry_at is None:
+            return False
+        if time.monotonic() >= retry_at:
+            del self._failed[shape]
+            return False
+        return True
+
+    async def with_compute_unit_limit(
+        self,
+        instructions: List[Instruction],
+        build: Callable[[List[Instruction]], Union[Transaction, VersionedTransaction]]
+    ) -> List[Instruction]:
+        """Prepend SetComputeUnitLimit unless the caller already set one or simulation failed."""
+        if has_compute_unit_limit(instructions):
+            return instructions
+        try:
+            limit = await self.limit_for(instructions, build)
+        except Exception as e:
+            print(f"Error simulating compute units: {str(e)}")
+            limit = None
+        if limit is None:
+            return instructions
+        return [set_compute_unit_limit(limit)] + list(instructions)
+
+
+_estimators: Dict[RpcRouter, ComputeUnitEstimator] = {}
+
+def get_compute_unit_estimator(router: RpcRouter) -> ComputeUnitEstimator:
+    """Process-wide compute unit estimates per router, so each shape is simulated once."""
+    if router not in _estimators:
+        _estimators[router] = ComputeUnitEstimator(router)
+    return _estimators[router]
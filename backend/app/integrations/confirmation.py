@@ -0,0 +1,197 @@
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from solana.rpc.websocket_api import SubscriptionError, connect
+from solders.commitment_config import CommitmentLevel
+from solders.errors import SerdeJSONError
+from solders.rpc.config import RpcSignatureSubscribeConfig
+from solders.rpc.requests import SignatureSubscribe, SignatureUnsubscribe
+from solders.rpc.responses import SignatureNotification, SubscriptionResult
+from solders.signature import Signature
+
+from ..config import Config
+from .rpc_router import RpcRouter
+from .signature_tracker import (
+    SignatureStatusTracker,
+    TransactionFailedError,
+    check_commitment,
+    get_signature_tracker,
+    status_reached,
+    to_signature
+)
+
+_SOLDERS_COMMITMENT = {
+    "processed": CommitmentLevel.Processed,
+    "confirmed": CommitmentLevel.Confirmed,
+    "finalized": CommitmentLevel.Finalized
+}
+
+def to_ws_url(http_url: str) -> str:
+    """Derive the websocket URL of an RPC endpoint (QuickNode and public clusters serve both)."""
+    if http_url.startswith("https://"):
+        return "wss://" + http_url[len("https://"):]
+    if http_url.startswith("http://"):
+        return "ws://" + http_url[len("http://"):]
+    return http_url
+
+@dataclass
+class _Subscription:
+    signature: Signature
+    future: asyncio.Future
+    request_id: int
+    subscription_id: Optional[int] = None
+
+class SignatureSubscriptionService:
+    """
+    Confirm transactions over one multiplexed signatureSubscribe websocket.
+
+    Every pending signature shares a single connection and reader task. If the
+    websocket cannot be opened or drops, callers fall back to the batched
+    SignatureStatusTracker instead of polling on their own.
+    """
+
+    def __init__(self, ws_endpoint: str, router: RpcRouter, tracker: SignatureStatusTracker):
+        self.ws_endpoint = ws_endpoint
+        self.router = router
+        self.tracker = tracker
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self._request_ids = itertools.count(1)
+        self._by_request: Dict[int, _Subscription] = {}
+        self._by_subscription: Dict[int, _Subscription] = {}
+        self.websocket_confirmations = 0
+        self.polling_confirmations = 0
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self._ws is not None and self._ws.open:
+                return
+            self._ws = await connect(self.ws_endpoint)
+            self._reader = asyncio.ensure_future(self._read_loop(self._ws))
+
+    async def _read_loop(self, ws):
+        try:
+            while True:
+                try:
+                    messages = await ws.recv()
+                except SubscriptionError as e:
+                    sub = self._by_request.pop(e.subscription.id, None)
+                    if sub is not None and not sub.future.done():
+                        sub.future.set_exception(e)
+                    continue
+                except SerdeJSONError:
+                    # Unsubscribe acknowledgements ({"result": true}) don't parse; the frame is consumed
+                    continue
+                for message in messages:
+                    if isinstance(message, SubscriptionResult):
+                        sub = self._by_request.pop(message.id, None)
+                        if sub is not None:
+                            sub.subscription_id = message.result
+                            self._by_subscription[message.result] = sub
+                    elif isinstance(message, SignatureNotification):
+                        # Signature subscriptions are dropped by the node after their one notification
+                        sub = self._by_subscription.pop(message.subscription, None)
+                        if sub is not None and not sub.future.done():
+                            sub.future.set_result(message.result.value.err)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = ConnectionError(f"Signature websocket closed: {str(e)}")
+            for sub in [*self._by_request.values(), *self._by_subscription.values()]:
+                if not sub.future.done():
+                    sub.future.set_exception(error)
+            self._by_request.clear()
+            self._by_subscription.clear()
+            if self._ws is ws:
+                self._ws = None
+
+    async def _subscribe(self, signature: Signature, commitment: str) -> _Subscription:
+        await self._ensure_connected()
+        request_id = next(self._request_ids)
+        sub = _Subscription(signature, asyncio.get_running_loop().create_future(), request_id)
+        self._by_request[request_id] = sub
+        config = RpcSignatureSubscribeConfig(commitment=_SOLDERS_COMMITMENT[commitment])
+        await self._ws.send_data(SignatureSubscribe(signature, config, request_id))
+        return sub
+
+    async def _unsubscribe(self, sub: _Subscription):
+        self._by_request.pop(sub.request_id, None)
+        if sub.subscription_id is None or self._by_subscription.pop(sub.subscription_id, None) is None:
+            return
+        try:
+            await self._ws.send_data(SignatureUnsubscribe(sub.subscription_id, next(self._request_ids)))
+        except Exception:
+            pass
+
+    async def confirm(
+        self,
+        signature: Union[str, Signature],
+        commitment: str = "confirmed",
+        timeout: float = 30.0,
+        last_valid_block_height: Optional[int] = None
+    ):
+        """Wait until the signature reaches the target commitment, raising if it failed, expired or timed out."""
+        signature = to_signature(signature)
+        commitment = check_commitment(commitment)
+        deadline = time.monotonic() + timeout
+        try:
+            sub = await self._subscribe(signature, commitment)
+        except Exception as e:
+            print(f"Signature websocket unavailable, polling instead: {str(e)}")
+            self.polling_confirmations += 1
+            return await self.tracker.wait(signature, commitment, last_valid_block_height, timeout)
+
+        try:
+            # The transaction may have landed before the subscription was registered. If the
+            # check itself fails, the subscription (or the polling fallback) still answers;
+            # a transaction that already landed with an error fails right away
+            try:
+                resp = await self.router.call(lambda client: client.get_signature_statuses([signature]))
+                if status_reached(resp.value[0], commitment):
+                    self.websocket_confirmations += 1
+                    return
+            except (asyncio.CancelledError, TransactionFailedError):
+                raise
+            except Exception as e:
+                print(f"Signature status pre-check failed, waiting on the subscription: {str(e)}")
+
+            err = await asyncio.wait_for(asyncio.shield(sub.future), max(0.0, deadline - time.monotonic()))
+            if err is not None:
+                raise TransactionFailedError(f"Transaction failed: {err}")
+            self.websocket_confirmations += 1
+        except (ConnectionError, SubscriptionError, asyncio.TimeoutError) as e:
+            # Hand the signature to the batched tracker for whatever time is left
+            self.polling_confirmations += 1
+            remaining = max(0.0, deadline - time.monotonic())
+            print(f"Signature subscription did not resolve ({type(e).__name__}), polling instead")
+            await self.tracker.wait(signature, commitment, last_valid_block_height, remaining)
+        finally:
+            if not sub.future.done():
+                sub.future.cancel()
+            await self._unsubscribe(sub)
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+        self._ws = None
+        self._reader = None
+
+
+_services: Dict[str, SignatureSubscriptionService] = {}
+
+def get_confirmation_service(rpc_endpoint: str, router: RpcRouter) -> SignatureSubscriptionService:
+    """Process-wide subscription service per websocket endpoint."""
+    ws_endpoint = Config.SOLANA_WS_ENDPOINT or to_ws_url(rpc_endpoint)
+    if ws_endpoint not in _services:
+        _services[ws_endpoint] = SignatureSubscriptionService(ws_endpoint, router, get_signature_tracker(router))
+    return _services[ws_endpoint]
+
+async def close_confirmation_services():
+    for service in _services.values():
+        await service.close()
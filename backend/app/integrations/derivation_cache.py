@@ -0,0 +1,180 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.sysvar import RENT
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
+
+from ..config import Config
+from .cluster_cache import PROGRAM_IDS
+
+TOKEN_METADATA_PROGRAM_ID = PROGRAM_IDS["token_metadata"]
+# Metadata PDAs have no owner; they are stored under this placeholder
+_NO_OWNER = bytes(32)
+
+# (owner, mint, program) as raw bytes; program is the token program for ATAs
+DerivationKey = Tuple[bytes, bytes, bytes]
+
+def _derive(key: DerivationKey) -> Pubkey:
+    owner, mint, program = key
+    if program == bytes(TOKEN_METADATA_PROGRAM_ID):
+        address, _ = Pubkey.find_program_address([b"metadata", program, mint], TOKEN_METADATA_PROGRAM_ID)
+    else:
+        address, _ = Pubkey.find_program_address([owner, program, mint], ASSOCIATED_TOKEN_PROGRAM_ID)
+    return address
+
+class DerivationCache:
+    """
+    Bounded LRU of derived addresses: associated token accounts and Metaplex metadata PDAs.
+
+    A PDA search hashes seeds until it finds an off-curve point, up to 255 SHA-256 rounds,
+    and payout and holder flows derive the same ATAs for the same wallets over and over.
+    Entries are keyed by (owner, mint, program). With `path` set they are also written
+    to a local SQLite table, and the most recently derived entries are loaded back on start
+    so a restarted worker begins warm. Writes are batched: new entries are committed once
+    `flush_size` of them are pending or `flush_interval` seconds have passed, and on close(),
+    so a create_token (always a new mint) doesn't cost a SQLite commit on the event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        path: Optional[str] = None,
+        flush_size: int = 256,
+        flush_interval: float = 5.0
+    ):
+        self.max_entries = max_entries
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._entries: "OrderedDict[DerivationKey, Pubkey]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        # Derived but not yet written, and when the last write happened
+        self._unwritten: Dict[DerivationKey, Pubkey] = {}
+        self._flushed_at = time.monotonic()
+        self._written_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path)
+            # WAL with synchronous=NORMAL syncs at checkpoints rather than on every commit
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS derived_addresses ("
+                "owner BLOB NOT NULL, mint BLOB NOT NULL, program BLOB NOT NULL, address BLOB NOT NULL, "
+                "derived_at REAL NOT NULL DEFAULT 0, "
+                "PRIMARY KEY (owner, mint, program)) WITHOUT ROWID"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(derived_addresses)")}
+            if "derived_at" not in columns:
+                self._db.execute("ALTER TABLE derived_addresses ADD COLUMN derived_at REAL NOT NULL DEFAULT 0")
+            self._db.execute("CREATE INDEX IF NOT EXISTS derived_addresses_derived_at_idx ON derived_addresses(derived_at)")
+            rows = self._db.execute(
+                "SELECT owner, mint, program, address FROM derived_addresses ORDER BY derived_at DESC LIMIT ?",
+                (max_entries,)
+            ).fetchall()
+            # Oldest first, so the most recent end up at the fresh end of the LRU
+            for owner, mint, program, address in reversed(rows):
+                self._entries[(owner, mint, program)] = Pubkey(address)
+
+    def _get_many(self, keys: Sequence[DerivationKey]) -> List[Pubkey]:
+        addresses = []
+        derived: Dict[DerivationKey, Pubkey] = {}
+        for key in keys:
+            address = self._entries.get(key)
+            if address is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                address = derived.get(key)
+                if address is None:
+                    self.misses += 1
+                    address = derived[key] = _derive(key)
+                    self._entries[key] = address
+            addresses.append(address)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if derived and self._db is not None:
+            self._unwritten.update(derived)
+            if len(self._unwritten) >= self.flush_size or time.monotonic() - self._flushed_at >= self.flush_interval:
+                self.flush()
+        return addresses
+
+    def flush(self):
+        """Write pending entries to SQLite in one transaction."""
+        self._flushed_at = time.monotonic()
+        if not self._unwritten or self._db is None:
+            return
+        # Strictly increasing, so reload order follows write order even within one clock tick
+        now = self._written_at = max(time.time(), self._written_at + 1e-6)
+        self._db.executemany(
+            "INSERT OR IGNORE INTO derived_addresses (owner, mint, program, address, derived_at) VALUES (?, ?, ?, ?, ?)",
+            [(*key, bytes(address), now) for key, address in self._unwritten.items()]
+        )
+        self._db.commit()
+        self._unwritten = {}
+
+    def associated_token_address(self, owner: Pubkey, mint: Pubkey, token_program: Pubkey = TOKEN_PROGRAM_ID) -> Pubkey:
+        return self._get_many([(bytes(owner), bytes(mint), bytes(token_program))])[0]
+
+    def associated_token_addresses(self, owners: Sequence[Pubkey], mint: Pubkey, token_program: Pubkey = TOKEN_PROGRAM_ID) -> List[Pubkey]:
+        """ATAs of many wallets for one mint; cache misses are persisted in a single write."""
+        mint_bytes, program_bytes = bytes(mint), bytes(token_program)
+        return self._get_many([(bytes(owner), mint_bytes, program_bytes) for owner in owners])
+
+    def metadata_address(self, mint: Pubkey) -> Pubkey:
+        return self._get_many([(_NO_OWNER, bytes(mint), bytes(TOKEN_METADATA_PROGRAM_ID))])[0]
+
+    def metadata_addresses(self, mints: Sequence[Pubkey]) -> List[Pubkey]:
+        program_bytes = bytes(TOKEN_METADATA_PROGRAM_ID)
+        return self._get_many([(_NO_OWNER, bytes(mint), program_bytes) for mint in mints])
+
+    def create_associated_token_account(
+        self,
+        payer: Pubkey,
+        owner: Pubkey,
+        mint: Pubkey,
+        idempotent: bool = False,
+        token_program: Pubkey = TOKEN_PROGRAM_ID
+    ) -> Instruction:
+        """create_associated_token_account using the cached ATA instead of deriving it again."""
+        accounts = [
+            AccountMeta(payer, is_signer=True, is_writable=True),
+            AccountMeta(self.associated_token_address(owner, mint, token_program), is_signer=False, is_writable=True),
+            AccountMeta(owner, is_signer=False, is_writable=False),
+            AccountMeta(mint, is_signer=False, is_writable=False),
+            AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False),
+            AccountMeta(token_program, is_signer=False, is_writable=False),
+            AccountMeta(RENT, is_signer=False, is_writable=False)
+        ]
+        # Instruction 1 (CreateIdempotent) succeeds if the account already exists
+        return Instruction(ASSOCIATED_TOKEN_PROGRAM_ID, bytes([1]) if idempotent else b"", accounts)
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+
+_cache: Optional[DerivationCache] = None
+
+def get_derivation_cache() -> DerivationCache:
+    """Process-wide derivation cache, persisted when SOLANA_DERIVATION_CACHE_DB is set."""
+    global _cache
+    if _cache is None:
+        _cache = DerivationCache(Config.SOLANA_DERIVATION_CACHE_SIZE, Config.SOLANA_DERIVATION_CACHE_DB)
+    return _cache
+
+def close_derivation_cache():
+    """Write out pending entries and close the SQLite file, if the cache was ever used."""
+    if _cache is not None:
+        _cache.close()
@@ -0,0 +1,411 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from solana.rpc.core import RPCException
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.message import Message, MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+from solders.sysvar import RENT
+from solders.transaction import Transaction, VersionedTransaction
+from spl.token.constants import TOKEN_PROGRAM_ID
+from spl.token.instructions import TransferCheckedParams, transfer_checked
+
+from .derivation_cache import get_derivation_cache
+from .token_accounts import get_token_account_cache
+from .signature_tracker import TransactionExpiredError, TransactionFailedError
+
+# Maximum serialized transaction size accepted by validators
+PACKET_DATA_SIZE = 1232
+# Room for the compute budget instructions prepended at signing
+COMPUTE_BUDGET_RESERVE = [set_compute_unit_limit(0), set_compute_unit_price(0)]
+# Below this many recipients the lookup table setup costs more than it saves
+LOOKUP_TABLE_MIN_RECIPIENTS = 100
+
+def default_distribution_id(token_address: str, contract_address: str, distributions: List[Dict]) -> str:
+    """
+    Id for a distribution that was not given one: the same payout list for the same
+    contract maps to the same checkpoint, so retrying it resumes instead of paying twice,
+    while a different payout of the same mint starts a checkpoint of its own.
+    """
+    payouts = sorted((dist["wallet_address"], int(dist["amount"])) for dist in distributions)
+    digest = hashlib.sha256(json.dumps([token_address, contract_address, payouts]).encode()).hexdigest()
+    return digest[:32]
+
+def create_associated_token_account_idempotent(payer: Pubkey, owner: Pubkey, mint: Pubkey) -> Instruction:
+    """Like create_associated_token_account, but succeeds if the account already exists."""
+    return get_derivation_cache().create_associated_token_account(payer, owner, mint, idempotent=True)
+
+def transaction_size(
+    instructions: List[Instruction],
+    payer: Pubkey,
+    lookup_tables: Optional[List[AddressLookupTableAccount]] = None
+) -> int:
+    """Serialized size of a transaction carrying `instructions`, signatures included."""
+    if lookup_tables:
+        message = MessageV0.try_compile(payer, instructions, lookup_tables, Hash.default())
+        signatures = [Signature.default()] * message.header.num_required_signatures
+        return len(bytes(VersionedTransaction.populate(message, signatures)))
+    message = Message.new_with_blockhash(instructions, payer, Hash.default())
+    return len(bytes(Transaction.new_unsigned(message)))
+
+@dataclass
+class DistributionBatch:
+    # (wallet, amount, needs associated token account)
+    recipients: List[Tuple[str, int, bool]]
+
+    @property
+    def wallets(self) -> List[str]:
+        return [wallet for wallet, _, _ in self.recipients]
+
+    @property
+    def transfers(self) -> List[Tuple[str, int]]:
+        return [(wallet, amount) for wallet, amount, _ in self.recipients]
+
+class DistributionCheckpoint:
+    """
+    Append-only log of a distribution's progress.
+
+    A "sent" record with the transaction's transfers is written before each transaction is
+    submitted and a "confirmed" or "dropped" record once its outcome is known, so a restarted
+    run knows how much each wallet was paid and which transactions still have to be checked
+    before resending. Without a path the log is kept in memory only.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        # wallet -> base units paid by confirmed transactions
+        self.completed: Dict[str, int] = {}
+        # signature -> {"last_valid_block_height": int, "transfers": {wallet: amount}}
+        self.in_flight: Dict[str, Dict] = {}
+        self._file = None
+        if path is None:
+            return
+
+        torn = False
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        self._apply(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A crash can leave a partial final record; it was never acted on
+                        continue
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._file = open(path, "a")
+        if torn:
+            self._file.write("\n")
+
+    def _apply(self, record: Dict):
+        if record["event"] == "sent":
+            self.in_flight[record["signature"]] = {
+                "last_valid_block_height": record["last_valid_block_height"],
+                "transfers": dict(record["transfers"])
+            }
+        elif record["event"] == "confirmed":
+            entry = self.in_flight.pop(record["signature"], None)
+            if entry is not None:
+                for wallet, amount in entry["transfers"].items():
+                    self.completed[wallet] = self.completed.get(wallet, 0) + amount
+        elif record["event"] == "dropped":
+            self.in_flight.pop(record["signature"], None)
+
+    def _write(self, record: Dict):
+        self._apply(record)
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def sent(self, signature, last_valid_block_height: int, transfers: List[Tuple[str, int]]):
+        self._write({
+            "event": "sent",
+            "signature": str(signature),
+            "last_valid_block_height": last_valid_block_height,
+            "transfers": [[wallet, amount] for wallet, amount in transfers]
+        })
+
+    def confirmed(self, signature):
+        self._write({"event": "confirmed", "signature": str(signature)})
+
+    def dropped(self, signature):
+        self._write({"event": "dropped", "signature": str(signature)})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+class TokenDistributor:
+    """
+    Pay out an SPL token to many wallets.
+
+    Recipients' associated token accounts are checked in bulk and created where missing,
+    transfer_checked instructions are packed into as few transactions as fit in a packet,
+    and batches are submitted in parallel from every fee payer. Progress and amounts paid are
+    logged to a checkpoint so an interrupted run resumes without paying anyone twice.
+
+    With `use_lookup_tables` the transactions are built as v0 against a per-mint address
+    lookup table holding the shared accounts and, with `lookup_recipients`, every
+    recipient's token account, which roughly doubles the transfers per transaction. Adding
+    recipients costs an extend transaction per 30 of them and the table's rent is kept, so
+    it only pays off when the same holders are paid again and again.
+    """
+
+    def __init__(
+        self,
+        manager,
+        mint: Pubkey,
+        decimals: int,
+        authority: Keypair,
+        fee_payers: List[Keypair],
+        checkpoint_path: Optional[str],
+        in_flight_per_payer: int = 4,
+        commitment: str = "confirmed",
+        timeout: float = 120.0,
+        max_attempts: int = 3,
+        use_lookup_tables: bool = False,
+        lookup_recipients: bool = False
+    ):
+        if not fee_payers:
+            raise ValueError("At least one fee payer is required")
+        self.manager = manager
+        self.mint = mint
+        self.decimals = decimals
+        self.authority = authority
+        self.fee_payers = fee_payers
+        self.checkpoint_path = checkpoint_path
+        self.in_flight_per_payer = in_flight_per_payer
+        self.commitment = commitment
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.use_lookup_tables = use_lookup_tables
+        self.lookup_recipients = lookup_recipients
+        self.lookup_tables: Optional[List[AddressLookupTableAccount]] = None
+        self.addresses = get_derivation_cache()
+        self.accounts = get_token_account_cache(manager.router)
+        self.source = self.addresses.associated_token_address(authority.pubkey(), mint)
+
+        self.transfers = 0
+        self.accounts_created = 0
+        self.transactions_sent = 0
+        self.transactions_confirmed = 0
+        self.failed: Dict[str, str] = {}
+        # wallet -> signature of the transaction that paid it
+        self.signatures: Dict[str, str] = {}
+
+    async def run(self, distributions: List[Dict]) -> Dict:
+        """Distribute `amount` base units to each `wallet_address`, resuming from the checkpoint."""
+        started = time.monotonic()
+        amounts = self._aggregate(distributions)
+        checkpoint = DistributionCheckpoint(self.checkpoint_path)
+        try:
+            await self._resume(checkpoint)
+            unresolved = {wallet for entry in checkpoint.in_flight.values() for wallet in entry["transfers"]}
+            for wallet in unresolved:
+                self.failed[wallet] = "Previous transaction is still unconfirmed"
+            # Wallets are only paid what earlier runs of this distribution have not paid them yet
+            pending = {
+                wallet: amount - checkpoint.completed.get(wallet, 0) for wallet, amount in amounts.items()
+                if amount > checkpoint.completed.get(wallet, 0) and wallet not in unresolved
+            }
+            skipped = sum(1 for wallet, amount in amounts.items() if amount <= checkpoint.completed.get(wallet, 0))
+
+            missing = await self._missing_accounts(list(pending))
+            if self.use_lookup_tables and pending:
+                self.lookup_tables = await self.manager.lookup_tables.ensure(
+                    self.manager,
+                    f"distribution:{self.mint}",
+                    self._lookup_addresses(list(pending), missing)
+                )
+            batches = self._pack(pending, missing)
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for batch in batches:
+                queue.put_nowait(batch)
+            await asyncio.gather(*(
+                self._worker(fee_payer, queue, checkpoint)
+                for fee_payer in self.fee_payers
+                for _ in range(self.in_flight_per_payer)
+            ))
+        finally:
+            checkpoint.close()
+
+        elapsed = time.monotonic() - started
+        print(
+            f"Distributed {self.transfers} transfers in {self.transactions_confirmed} transactions "
+            f"over {elapsed:.1f}s ({self.transfers / elapsed if elapsed else 0:.1f} transfers/sec)"
+        )
+        return {
+            "status": "completed" if not self.failed else "partial",
+            "transfers": self.transfers,
+            "skipped": skipped,
+            "accounts_created": self.accounts_created,
+            "transactions_sent": self.transactions_sent,
+            "transactions_confirmed": self.transactions_confirmed,
+            "failed": [{"wallet_address": wallet, "error": error} for wallet, error in self.failed.items()],
+            "elapsed_seconds": elapsed,
+            "transfers_per_second": self.transfers / elapsed if elapsed else 0.0,
+            "transactions_per_second": self.transactions_confirmed / elapsed if elapsed else 0.0
+        }
+
+    def _aggregate(self, distributions: List[Dict]) -> Dict[str, int]:
+        """Sum amounts per wallet so each recipient gets a single transfer."""
+        amounts: Dict[str, int] = {}
+        for dist in distributions:
+            wallet = dist["wallet_address"]
+            amount = int(dist["amount"])
+            if amount <= 0:
+                self.failed[wallet] = f"Invalid amount: {dist['amount']}"
+                continue
+            amounts[wallet] = amounts.get(wallet, 0) + amount
+        return amounts
+
+    async def _resume(self, checkpoint: DistributionCheckpoint):
+        """Settle transactions a previous run sent but never saw confirmed."""
+        async def settle(signature: str, entry: Dict):
+            try:
+                await self.manager.tracker.wait(signature, self.commitment, entry["last_valid_block_height"], self.timeout)
+                checkpoint.confirmed(signature)
+            except (TransactionExpiredError, TransactionFailedError):
+                checkpoint.dropped(signature)
+            except Exception as e:
+                print(f"Could not settle distribution transaction {signature}: {str(e)}")
+
+        await asyncio.gather(*(settle(signature, entry) for signature, entry in list(checkpoint.in_flight.items())))
+
+    def _lookup_addresses(self, wallets: List[str], missing: Set[str]) -> List[Pubkey]:
+        """
+        Non-signer accounts shared by every transfer, plus if requested each recipient's
+        token account and, where it has to be created, the owner wallet.
+        """
+        addresses = [self.source, self.mint, SYSTEM_PROGRAM_ID, RENT]
+        if self.lookup_recipients:
+            for wallet in wallets:
+                owner = Pubkey.from_string(wallet)
+                addresses.append(self.addresses.associated_token_address(owner, self.mint))
+                if wallet in missing:
+                    addresses.append(owner)
+        return addresses
+
+    async def _missing_accounts(self, wallets: List[str]) -> Set[str]:
+        """Wallets whose associated token account for the mint does not exist yet; known accounts are not re-read."""
+        addresses = self.addresses.associated_token_addresses([Pubkey.from_string(wallet) for wallet in wallets], self.mint)
+        missing = await self.accounts.missing(addresses)
+        return {wallet for wallet, address in zip(wallets, addresses) if address in missing}
+
+    def _pack(self, amounts: Dict[str, int], missing: Set[str]) -> List[DistributionBatch]:
+        """Greedily pack each recipient's instructions into packet-sized transactions."""
+        # Size against a payer distinct from the authority, the worst case of one extra signature
+        sizing_payer = Pubkey.new_unique()
+        batches: List[DistributionBatch] = []
+        current = DistributionBatch([])
+        instructions: List[Instruction] = []
+        for wallet, amount in amounts.items():
+            recipient = (wallet, amount, wallet in missing)
+            group = self._recipient_instructions(*recipient, sizing_payer)
+            if current.recipients and transaction_size(COMPUTE_BUDGET_RESERVE + instructions + group, sizing_payer, self.lookup_tables) > PACKET_DATA_SIZE:
+                batches.append(current)
+                current = DistributionBatch([])
+                instructions = []
+            current.recipients.append(recipient)
+            instructions.extend(group)
+        if current.recipients:
+            batches.append(current)
+        return batches
+
+    def _batch_instructions(self, batch: DistributionBatch, payer: Pubkey) -> List[Instruction]:
+        return [ix for recipient in batch.recipients for ix in self._recipient_instructions(*recipient, payer)]
+
+    def _recipient_instructions(self, wallet: str, amount: int, create_account: bool, payer: Pubkey) -> List[Instruction]:
+        owner = Pubkey.from_string(wallet)
+        instructions = []
+        if create_account:
+            instructions.append(create_associated_token_account_idempotent(payer, owner, self.mint))
+        instructions.append(transfer_checked(TransferCheckedParams(
+            program_id=TOKEN_PROGRAM_ID,
+            source=self.source,
+            mint=self.mint,
+            dest=self.addresses.associated_token_address(owner, self.mint),
+            owner=self.authority.pubkey(),
+            amount=amount,
+            decimals=self.decimals,
+            signers=[]
+        )))
+        return instructions
+
+    async def _worker(self, fee_payer: Keypair, queue: asyncio.Queue, checkpoint: DistributionCheckpoint):
+        signers = [fee_payer] if fee_payer.pubkey() == self.authority.pubkey() else [fee_payer, self.authority]
+        while True:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self._submit(batch, signers, checkpoint)
+
+    async def _submit(self, batch: DistributionBatch, signers: List[Keypair], checkpoint: DistributionCheckpoint):
+        instructions = self._batch_instructions(batch, signers[0].pubkey())
+        error = "Transaction expired"
+        for _ in range(self.max_attempts):
+            tx, last_valid_block_height = await self.manager.sign_instructions(instructions, signers, self.lookup_tables, fee_policy="background")
+            signature = tx.signatures[0]
+            checkpoint.sent(signature, last_valid_block_height, batch.transfers)
+            self.transactions_sent += 1
+            try:
+                await self.manager.send_transaction(tx, last_valid_block_height)
+            except RPCException as e:
+                # The node rejected it in preflight, so it cannot land
+                checkpoint.dropped(signature)
+                error = str(e)
+                continue
+            except Exception as e:
+                # The transaction may still have reached a leader; let its status decide
+                print(f"Error sending distribution transaction {signature}: {str(e)}")
+
+            try:
+                await self.manager.confirm_sent(tx, last_valid_block_height, self.commitment, self.timeout)
+            except TransactionExpiredError as e:
+                checkpoint.dropped(signature)
+                error = str(e)
+                continue
+            except TransactionFailedError as e:
+                checkpoint.dropped(signature)
+                # A recipient may have closed a token account we assumed exists
+                self.accounts.forget(self._destinations(batch))
+                self._fail(batch, str(e))
+                return
+            except Exception as e:
+                # Outcome unknown; leave it in flight for the next run to settle
+                self._fail(batch, str(e))
+                return
+
+            checkpoint.confirmed(signature)
+            self.accounts.add(self._destinations(batch))
+            for wallet in batch.wallets:
+                self.signatures[wallet] = str(signature)
+            self.transactions_confirmed += 1
+            self.transfers += len(batch.wallets)
+            self.accounts_created += sum(1 for _, _, create in batch.recipients if create)
+            return
+
+        self._fail(batch, error)
+
+    def _destinations(self, batch: DistributionBatch) -> List[Pubkey]:
+        return self.addresses.associated_token_addresses([Pubkey.from_string(wallet) for wallet in batch.wallets], self.mint)
+
+    def _fail(self, batch: DistributionBatch, error: str):
+        for wallet in batch.wallets:
+            self.failed[wallet] = error
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import os
+import struct
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from solana.rpc.commitment import Confirmed
+from solana.rpc.core import RPCException
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.system_program import AdvanceNonceAccountParams, advance_nonce_account, create_nonce_account
+from solders.transaction import Transaction, VersionedTransaction
+
+from ..config import Config
+from .cluster_cache import NONCE_ACCOUNT_LAYOUT_SIZE
+from .rpc_router import RpcRouter
+from .signature_tracker import TransactionFailedError
+
+# getMultipleAccounts accepts at most 100 accounts per call
+MAX_ACCOUNTS_PER_CALL = 100
+# Nonce accounts created per transaction; each new account adds a signature
+NONCES_PER_CREATE = 4
+NONCE_INITIALIZED = 1
+# Preflight errors meaning the nonce the transaction was signed against is no longer current
+NONCE_USED_ERRORS = ("BlockhashNotFound", "Blockhash not found", "AlreadyProcessed", "already been processed")
+
+_NONCE = struct.Struct("<II32s32sQ")
+
+def decode_nonce_account(data) -> Tuple[Pubkey, Hash]:
+    """Authority and stored nonce of an initialized nonce account."""
+    if len(data) < NONCE_ACCOUNT_LAYOUT_SIZE:
+        raise ValueError(f"Nonce account data is {len(data)} bytes, expected {NONCE_ACCOUNT_LAYOUT_SIZE}")
+    _, state, authority, nonce, _ = _NONCE.unpack_from(data)
+    if state != NONCE_INITIALIZED:
+        raise ValueError("Nonce account is not initialized")
+    return Pubkey(authority), Hash(nonce)
+
+@dataclass
+class NonceLease:
+    """Exclusive use of one nonce account and the nonce value a transaction is signed against."""
+    account: Pubkey
+    authority: Pubkey
+    nonce: Hash
+
+    def advance_instruction(self) -> Instruction:
+        return advance_nonce_account(AdvanceNonceAccountParams(nonce_pubkey=self.account, authorized_pubkey=self.authority))
+
+class NoncePool:
+    """
+    Durable nonce accounts owned by our payer, leased one transaction at a time.
+
+    A transaction signed against an account's stored nonce instead of a recent blockhash
+    does not expire; it stays valid until the nonce is advanced, which its own
+    AdvanceNonceAccount instruction does when it lands (even if it fails). Account
+    addresses are persisted to a small JSON file so restarts reuse the pool, and nonce
+    values are re-read in bulk only for accounts that were advanced since we last looked.
+    """
+
+    def __init__(self, router: RpcRouter, path: Optional[str] = None):
+        self.router = router
+        self.path = path or Config.SOLANA_NONCE_POOL_FILE
+        self._accounts: List[Pubkey] = []
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self._accounts = [Pubkey.from_string(account) for account in json.load(f)]
+        self._free: Deque[Pubkey] = deque(self._accounts)
+        self._in_use: Set[Pubkey] = set()
+        # Last known nonce of free accounts; missing entries are re-read before use
+        self._leases: Dict[Pubkey, NonceLease] = {}
+        self._available = asyncio.Condition()
+        self._ensure_lock = asyncio.Lock()
+        self.rpc_calls = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._accounts)
+
+    @property
+    def in_use(self) -> int:
+        return len(self._in_use)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([str(account) for account in self._accounts], f)
+        os.replace(tmp_path, self.path)
+
+    async def ensure(self, sender, size: int):
+        """Create nonce accounts through `sender` (a SolanaTokenManager) until the pool holds `size`."""
+        async with self._ensure_lock:
+            payer = sender._load_payer()
+            lamports = await sender.cluster.get_rent_exemption(NONCE_ACCOUNT_LAYOUT_SIZE)
+            while len(self._accounts) < size:
+                accounts = [Keypair() for _ in range(min(NONCES_PER_CREATE, size - len(self._accounts)))]
+                instructions = [
+                    ix for account in accounts
+                    for ix in create_nonce_account(payer.pubkey(), account.pubkey(), payer.pubkey(), lamports)
+                ]
+                signature, last_valid_block_height = await sender.send_instructions(instructions, [payer] + accounts, fee_policy="background")
+                await sender.tracker.wait(signature, "confirmed", last_valid_block_height)
+                self._accounts.extend(account.pubkey() for account in accounts)
+                self._save()
+                async with self._available:
+                    self._free.extend(account.pubkey() for account in accounts)
+                    self._available.notify_all()
+            print(f"Nonce pool holds {len(self._accounts)} accounts")
+
+    async def _refresh(self, accounts: Sequence[Pubkey]):
+        for start in range(0, len(accounts), MAX_ACCOUNTS_PER_CALL):
+            chunk = list(accounts[start:start + MAX_ACCOUNTS_PER_CALL])
+            self.rpc_calls += 1
+            resp = await self.router.call(lambda client: client.get_multiple_accounts(chunk, commitment=Confirmed))
+            for account, info in zip(chunk, resp.value):
+                if info is None:
+                    raise Exception(f"Nonce account not found: {account}")
+                authority, nonce = decode_nonce_account(info.data)
+                self._leases[account] = NonceLease(account, authority, nonce)
+
+    async def acquire_many(self, count: int) -> List[NonceLease]:
+        """Lease `count` nonce accounts, waiting for busy ones to be released."""
+        if count > len(self._accounts):
+            raise Exception(f"Nonce pool has {len(self._accounts)} accounts, {count} requested")
+        accounts = []
+        async with self._available:
+            while len(accounts) < count:
+                await self._available.wait_for(lambda: self._free)
+                account = self._free.popleft()
+                self._in_use.add(account)
+                accounts.append(account)
+        try:
+            await self._refresh([account for account in accounts if account not in self._leases])
+        except Exception:
+            await self._return(accounts)
+            raise
+        return [self._leases.pop(account) for account in accounts]
+
+    async def acquire(self) -> NonceLease:
+        return (await self.acquire_many(1))[0]
+
+    async def release(self, lease: NonceLease, advanced: bool = True):
+        """
+        Return a lease. Pass advanced=False only if no transaction signed against it was
+        forwarded to the cluster, so its nonce can be reused without a re-read.
+        """
+        if not advanced:
+            self._leases[lease.account] = lease
+        await self._return([lease.account])
+
+    async def _return(self, accounts: List[Pubkey]):
+        async with self._available:
+            for account in accounts:
+                self._in_use.discard(account)
+                self._free.append(account)
+            self._available.notify_all()
+
+    def stats(self) -> Dict:
+        return {"size": self.size, "in_use": self.in_use, "free": len(self._free), "rpc_calls": self.rpc_calls}
+
+@dataclass
+class PresignedTransaction:
+    tx: Union[Transaction, VersionedTransaction]
+    lease: NonceLease
+    # prepared, sent, confirmed, failed or cancelled
+    status: str = "prepared"
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def signature(self) -> Signature:
+        return self.tx.signatures[0]
+
+class PresignedTransactionQueue:
+    """
+    Transactions signed ahead of time against durable nonces and submitted whenever we like.
+
+    prepare() signs and queues a transaction without sending it; submit_all() sends the
+    queue in a burst. Since nothing expires, a submission that times out simply stays
+    queued and the same bytes are sent again later, with no rebuild or re-sign.
+    cancel() advances the nonce so a queued transaction can never land.
+    """
+
+    def __init__(self, manager, pool: Optional[NoncePool] = None, commitment: str = "confirmed"):
+        self.manager = manager
+        self.pool = pool or manager.nonces
+        self.commitment = commitment
+        self._queue: Deque[PresignedTransaction] = deque()
+        self.confirmed = 0
+        self.failed = 0
+        self.resends = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def prepare(
+        self,
+        instructions: List[Instruction],
+        signers: List[Keypair],
+        fee_policy: str = "background",
+        lookup_tables=None
+    ) -> PresignedTransaction:
+        lease = await self.pool.acquire()
+        try:
+            tx, _ = await self.manager.sign_instructions(instructions, signers, lookup_tables, fee_policy, nonce=lease)
+        except Exception:
+            await self.pool.release(lease, advanced=False)
+            raise
+        prepared = PresignedTransaction(tx, lease)
+        self._queue.append(prepared)
+        return prepared
+
+    async def submit(self, prepared: PresignedTransaction, timeout: float = 60.0) -> PresignedTransaction:
+        """Send (or re-send) a prepared transaction and wait for it to land."""
+        if prepared.attempts:
+            self.resends += 1
+        prepared.attempts += 1
+        try:
+            await self.manager.send_transaction(prepared.tx, None)
+        except RPCException as e:
+            if prepared.attempts == 1 and not any(marker in str(e) for marker in NONCE_USED_ERRORS):
+                # Rejected in preflight on the first send, so never forwarded: the nonce is untouched and reusable
+                prepared.status, prepared.error = "failed", str(e)
+                self.failed += 1
+                await self.pool.release(prepared.lease, advanced=False)
+                return prepared
+            # An earlier send may have landed and advanced the nonce, which is what gets a
+            # resend rejected; look the signature up before deciding what the nonce holds
+            try:
+                resp = await self.pool.router.call(lambda client: client.get_signature_statuses([prepared.signature]))
+            except Exception as status_error:
+                # Unknown either way; leave it queued rather than guess
+                prepared.error = f"{str(e)} (status check failed: {str(status_error)})"
+                return prepared
+            if resp.value[0] is None:
+                # Not landed, but the nonce may have moved on: re-read it before reuse
+                prepared.status, prepared.error = "failed", str(e)
+                self.failed += 1
+                await self.pool.release(prepared.lease)
+                return prepared
+        prepared.status = "sent"
+        try:
+            await self.manager.confirm_sent(prepared.tx, None, self.commitment, timeout)
+        except TransactionFailedError as e:
+            # A durable-nonce transaction advances its nonce even when it fails
+            prepared.status, prepared.error = "failed", str(e)
+            self.failed += 1
+            await self.pool.release(prepared.lease)
+        except Exception as e:
+            # Not landed yet; the transaction is still valid and can be sent again
+            prepared.error = str(e)
+        else:
+            prepared.status = "confirmed"
+            self.confirmed += 1
+            await self.pool.release(prepared.lease)
+        return prepared
+
+    async def submit_all(self, concurrency: int = 32, timeout: float = 60.0) -> Dict:
+        """Send everything queued; transactions that have not landed stay queued for the next call."""
+        batch = list(self._queue)
+        self._queue.clear()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(prepared: PresignedTransaction) -> PresignedTransaction:
+            async with semaphore:
+                return await self.submit(prepared, timeout)
+
+        results = await asyncio.gather(*(run(prepared) for prepared in batch))
+        pending = [prepared for prepared in results if prepared.status in ("prepared", "sent")]
+        self._queue.extend(pending)
+        return {
+            "submitted": len(batch),
+            "confirmed": sum(1 for prepared in results if prepared.status == "confirmed"),
+            "failed": sum(1 for prepared in results if prepared.status == "failed"),
+            "pending": len(pending)
+        }
+
+    async def cancel(self, prepared: PresignedTransaction):
+        """Advance the nonce with a regular transaction so `prepared` can never land."""
+        payer = self.manager._load_payer()
+        signature, last_valid_block_height = await self.manager.send_instructions(
+            [prepared.lease.advance_instruction()], [payer], fee_policy="background"
+        )
+        await self.manager.tracker.wait(signature, "confirmed", last_valid_block_height)
+        if prepared in self._queue:
+            self._queue.remove(prepared)
+        prepared.status = "cancelled"
+        await self.pool.release(prepared.lease)
+
+    def stats(self) -> Dict:
+        return {"queued": len(self._queue), "confirmed": self.confirmed, "failed": self.failed, "resends": self.resends, "pool": self.pool.stats()}
+
+
+_pools: Dict[RpcRouter, NoncePool] = {}
+
+def get_nonce_pool(router: RpcRouter) -> NoncePool:
+    """Process-wide nonce pool per router, so leases are never handed out twice."""
+    if router not in _pools:
+        _pools[router] = NoncePool(router)
+    return _pools[router]
@@ -0,0 +1,222 @@
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import base58
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import DataSliceOpts, MemcmpOpts
+from solders.pubkey import Pubkey
+from spl.token.constants import TOKEN_PROGRAM_ID
+from supabase import Client
+
+from .rpc_router import RpcRouter
+from .spl_accounts import (
+    OWNER_AMOUNT_SLICE,
+    TOKEN_ACCOUNT_LAYOUT_SIZE,
+    TOKEN_ACCOUNT_MINT_OFFSET,
+    TOKEN_ACCOUNT_OWNER_OFFSET,
+    decode_mint,
+    decode_owner_amounts
+)
+
+# Tokens with more holders than this are scanned in 256 slices by the owner's first byte
+PARTITION_THRESHOLD = 10_000
+OWNER_PREFIXES = 256
+# Rows per PostgREST read page and per bulk write
+PAGE_SIZE = 1000
+WRITE_BATCH = 1000
+# Wallets per delete; they go in the URL as an in.() filter, about 45 bytes each
+DELETE_BATCH = 100
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class HolderIndexer:
+    """
+    Mirror on-chain token balances into token_holders (and token_wallets rows we already track).
+
+    Each mint is snapshotted with getProgramAccounts filtered on the mint offset and sliced
+    to owner+amount, 40 bytes per account. Tokens whose account count (read first with an
+    empty data slice) is above the threshold are scanned in 256 partitions by the owner's
+    first byte, and the stored rows of the same partition are read through the owner_prefix
+    column, so memory stays bounded by the largest partition rather than the holder count.
+    Only rows whose balance changed are written, plus rows still missing their owner_prefix.
+    """
+
+    def __init__(self, router: RpcRouter, supabase: Client, partition_threshold: int = PARTITION_THRESHOLD):
+        self.router = router
+        self.supabase = supabase
+        self.partition_threshold = partition_threshold
+        self.rpc_calls = 0
+
+    async def _decimals(self, mint: Pubkey) -> int:
+        resp = await self.router.call(lambda client: client.get_account_info(mint, commitment=Confirmed))
+        if resp.value is None:
+            raise ValueError(f"Mint account not found: {mint}")
+        return decode_mint(resp.value.data).decimals
+
+    async def count_accounts(self, mint: Pubkey) -> int:
+        """Token accounts holding `mint`, fetched with an empty data slice so only keys come back."""
+        self.rpc_calls += 1
+        resp = await self.router.call(lambda client: client.get_program_accounts(
+            TOKEN_PROGRAM_ID,
+            commitment=Confirmed,
+            encoding="base64",
+            data_slice=DataSliceOpts(offset=0, length=0),
+            filters=[TOKEN_ACCOUNT_LAYOUT_SIZE, MemcmpOpts(offset=TOKEN_ACCOUNT_MINT_OFFSET, bytes=str(mint))]
+        ))
+        return len(resp.value)
+
+    async def fetch_balances(self, mint: Pubkey, prefix: Optional[int] = None) -> Dict[str, int]:
+        """Raw balance per owner holding `mint`, optionally only owners whose first byte is `prefix`."""
+        filters = [TOKEN_ACCOUNT_LAYOUT_SIZE, MemcmpOpts(offset=TOKEN_ACCOUNT_MINT_OFFSET, bytes=str(mint))]
+        if prefix is not None:
+            filters.append(MemcmpOpts(offset=TOKEN_ACCOUNT_OWNER_OFFSET, bytes=base58.b58encode(bytes([prefix])).decode()))
+        offset, length = OWNER_AMOUNT_SLICE
+        self.rpc_calls += 1
+        resp = await self.router.call(lambda client: client.get_program_accounts(
+            TOKEN_PROGRAM_ID,
+            commitment=Confirmed,
+            encoding="base64",
+            data_slice=DataSliceOpts(offset=offset, length=length),
+            filters=filters
+        ))
+
+        # An owner can hold the mint in several token accounts
+        balances: Dict[str, int] = defaultdict(int)
+        for owner, amount in decode_owner_amounts(keyed.account.data for keyed in resp.value):
+            if amount:
+                balances[str(owner)] += amount
+        return balances
+
+    def _select_all(self, table: str, columns: str, token_id, prefix: Optional[int] = None, unprefixed: bool = False) -> List[Dict]:
+        rows = []
+        start = 0
+        while True:
+            query = self.supabase.table(table).select(columns).eq("token_id", token_id)
+            if prefix is not None:
+                query = query.eq("owner_prefix", prefix)
+            if unprefixed:
+                query = query.is_("owner_prefix", "null")
+            page = query.order("wallet_address").range(start, start + PAGE_SIZE - 1).execute().data
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    def _stored_balances(self, token_id, prefix: Optional[int]) -> Tuple[Dict[str, Decimal], Set[str]]:
+        """Stored balance per wallet, and the wallets whose row has no owner_prefix yet."""
+        # Cast to text so large NUMERIC balances don't round-trip through floats
+        rows = self._select_all("token_holders", "wallet_address,balance::text,owner_prefix", token_id, prefix)
+        stored = {row["wallet_address"]: Decimal(row["balance"]) for row in rows}
+        return stored, {row["wallet_address"] for row in rows if row["owner_prefix"] is None}
+
+    def _unprefixed_balances(self, token_id) -> Dict[int, Dict[str, Decimal]]:
+        """
+        Rows written before owner_prefix existed, grouped by their owner's first byte, so
+        partitioned runs diff them too. They are rewritten with a prefix on the first run.
+        """
+        partitions: Dict[int, Dict[str, Decimal]] = defaultdict(dict)
+        for row in self._select_all("token_holders", "wallet_address,balance::text", token_id, unprefixed=True):
+            prefix = bytes(Pubkey.from_string(row["wallet_address"]))[0]
+            partitions[prefix][row["wallet_address"]] = Decimal(row["balance"])
+        return partitions
+
+    def _write(self, token_id, changed: Dict[str, Decimal], removed: List[str], tracked_wallets: set, now: str):
+        holder_rows = [
+            {
+                "token_id": token_id,
+                "wallet_address": wallet,
+                "balance": format(balance, "f"),
+                "owner_prefix": bytes(Pubkey.from_string(wallet))[0],
+                "last_updated": now
+            }
+            for wallet, balance in changed.items()
+        ]
+        for rows in _chunks(holder_rows, WRITE_BATCH):
+            self.supabase.table("token_holders").upsert(rows, on_conflict="token_id,wallet_address", returning="minimal").execute()
+        for wallets in _chunks(removed, DELETE_BATCH):
+            self.supabase.table("token_holders").delete(returning="minimal").eq("token_id", token_id).in_("wallet_address", wallets).execute()
+
+        # token_wallets holds platform allocations; only keep balances of wallets it already tracks in sync
+        wallet_rows = [
+            {"token_id": token_id, "wallet_address": wallet, "balance": format(balance, "f"), "last_updated": now}
+            for wallet, balance in list(changed.items()) + [(wallet, Decimal(0)) for wallet in removed]
+            if wallet in tracked_wallets
+        ]
+        for rows in _chunks(wallet_rows, WRITE_BATCH):
+            self.supabase.table("token_wallets").upsert(rows, on_conflict="token_id,wallet_address", returning="minimal").execute()
+
+    async def index_token(self, token: Dict) -> Dict:
+        """
+        Bring the holders of one token row (id, token_address) in line with chain.
+        Safe to re-run at any time; a run that changes nothing writes nothing.
+        """
+        started = time.monotonic()
+        token_id = token["id"]
+        mint = Pubkey.from_string(token["token_address"])
+        decimals = await self._decimals(mint)
+        # Count on chain rather than trusting the stored holder_count, which is unset on the first run
+        partitioned = await self.count_accounts(mint) > self.partition_threshold
+        prefixes = range(OWNER_PREFIXES) if partitioned else [None]
+        legacy = self._unprefixed_balances(token_id) if partitioned else {}
+        tracked_wallets = {row["wallet_address"] for row in self._select_all("token_wallets", "wallet_address", token_id)}
+        now = datetime.now(timezone.utc).isoformat()
+
+        holders = upserted = removed_count = unchanged = 0
+        for prefix in prefixes:
+            balances = await self.fetch_balances(mint, prefix)
+            stored, unprefixed = self._stored_balances(token_id, prefix)
+            if prefix in legacy:
+                stored.update(legacy[prefix])
+                unprefixed.update(legacy[prefix])
+            changed: Dict[str, Decimal] = {}
+            for wallet, raw in balances.items():
+                balance = Decimal(raw).scaleb(-decimals)
+                if stored.pop(wallet, None) == balance and wallet not in unprefixed:
+                    unchanged += 1
+                else:
+                    changed[wallet] = balance
+            # Whatever is left in `stored` no longer holds the token
+            removed = list(stored)
+            self._write(token_id, changed, removed, tracked_wallets, now)
+            holders += len(balances)
+            upserted += len(changed)
+            removed_count += len(removed)
+
+        self.supabase.table("tokens").update({"holder_count": holders, "holders_indexed_at": now}).eq("id", token_id).execute()
+        elapsed = time.monotonic() - started
+        print(f"Indexed {holders} holders of {mint}: {upserted} updated, {removed_count} removed in {elapsed:.1f}s")
+        return {
+            "token_id": token_id,
+            "token_address": str(mint),
+            "holders": holders,
+            "updated": upserted,
+            "removed": removed_count,
+            "unchanged": unchanged,
+            "partitions": len(prefixes),
+            "elapsed_seconds": elapsed
+        }
+
+    async def index_due(self, limit: int = 20) -> List[Dict]:
+        """Index the `limit` least recently indexed tokens; meant to run on a schedule."""
+        tokens = (
+            self.supabase.table("tokens")
+            .select("id,token_address")
+            .not_.is_("token_address", "null")
+            .order("holders_indexed_at", nullsfirst=True)
+            .limit(limit)
+            .execute()
+            .data
+        )
+        results = []
+        for token in tokens:
+            try:
+                results.append(await self.index_token(token))
+            except Exception as e:
+                print(f"Error indexing holders of {token['token_address']}: {str(e)}")
+                results.append({"token_id": token["id"], "token_address": token["token_address"], "error": str(e)})
+        return results
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from solana.rpc.commitment import Confirmed, Finalized
+from solders.address_lookup_table_account import (
+    ID as LOOKUP_TABLE_PROGRAM_ID,
+    LOOKUP_TABLE_MAX_ADDRESSES,
+    AddressLookupTable,
+    AddressLookupTableAccount,
+    derive_lookup_table_address
+)
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYSTEM_PROGRAM_ID
+
+from ..config import Config
+from .rpc_router import RpcRouter
+
+# Addresses per extend transaction; 30 keeps a single-signer extend under the packet limit
+MAX_ADDRESSES_PER_EXTEND = 30
+
+def create_lookup_table(authority: Pubkey, payer: Pubkey, recent_slot: int) -> Tuple[Instruction, Pubkey]:
+    """CreateLookupTable instruction and the derived table address."""
+    table, bump = derive_lookup_table_address(authority, recent_slot)
+    data = struct.pack("<IQB", 0, recent_slot, bump)
+    accounts = [
+        AccountMeta(table, is_signer=False, is_writable=True),
+        AccountMeta(authority, is_signer=True, is_writable=False),
+        AccountMeta(payer, is_signer=True, is_writable=True),
+        AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False)
+    ]
+    return Instruction(LOOKUP_TABLE_PROGRAM_ID, data, accounts), table
+
+def extend_lookup_table(table: Pubkey, authority: Pubkey, payer: Pubkey, addresses: Sequence[Pubkey]) -> Instruction:
+    data = struct.pack("<IQ", 2, len(addresses)) + b"".join(bytes(address) for address in addresses)
+    accounts = [
+        AccountMeta(table, is_signer=False, is_writable=True),
+        AccountMeta(authority, is_signer=True, is_writable=False),
+        AccountMeta(payer, is_signer=True, is_writable=True),
+        AccountMeta(SYSTEM_PROGRAM_ID, is_signer=False, is_writable=False)
+    ]
+    return Instruction(LOOKUP_TABLE_PROGRAM_ID, data, accounts)
+
+class LookupTableManager:
+    """
+    Create, extend and cache address lookup tables for accounts we reuse constantly.
+
+    Tables are keyed by name. A name maps to one or more tables of up to 256 addresses,
+    and the mapping is persisted to a small JSON file so restarts reuse existing tables
+    instead of paying rent for new ones. Table contents are cached in memory and only
+    re-fetched after we extend them.
+    """
+
+    def __init__(self, router: RpcRouter, path: Optional[str] = None):
+        self.router = router
+        self.path = path or Config.SOLANA_LOOKUP_TABLE_FILE
+        self._tables: Dict[str, List[str]] = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self._tables = json.load(f)
+        self._accounts: Dict[Pubkey, AddressLookupTableAccount] = {}
+        self._last_extended_slots: Dict[Pubkey, int] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._tables, f)
+        os.replace(tmp_path, self.path)
+
+    async def fetch(self, table: Pubkey, refresh: bool = False) -> AddressLookupTableAccount:
+        if not refresh and table in self._accounts:
+            return self._accounts[table]
+        resp = await self.router.call(lambda client: client.get_account_info(table, commitment=Confirmed))
+        if resp.value is None:
+            raise Exception(f"Lookup table not found: {table}")
+        state = AddressLookupTable.deserialize(bytes(resp.value.data))
+        self._accounts[table] = AddressLookupTableAccount(key=table, addresses=state.addresses)
+        self._last_extended_slots[table] = state.meta.last_extended_slot
+        return self._accounts[table]
+
+    async def ensure(self, sender, name: str, addresses: Sequence[Pubkey]) -> List[AddressLookupTableAccount]:
+        """
+        Tables under `name` that together hold every address, creating and extending
+        them through `sender` (a SolanaTokenManager) as needed.
+        """
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            tables = [await self.fetch(Pubkey.from_string(table)) for table in self._tables.get(name, [])]
+            present = {address for table in tables for address in table.addresses}
+            missing = list(dict.fromkeys(address for address in addresses if address not in present))
+            if not missing:
+                return tables
+
+            extended = False
+            for table in tables:
+                room = LOOKUP_TABLE_MAX_ADDRESSES - len(table.addresses)
+                if room > 0 and missing:
+                    await self._extend(sender, table.key, missing[:room])
+                    missing = missing[room:]
+                    extended = True
+            while missing:
+                table = await self._create(sender)
+                self._tables.setdefault(name, []).append(str(table))
+                self._save()
+                await self._extend(sender, table, missing[:LOOKUP_TABLE_MAX_ADDRESSES])
+                missing = missing[LOOKUP_TABLE_MAX_ADDRESSES:]
+                extended = True
+
+            tables = [await self.fetch(Pubkey.from_string(table), refresh=extended) for table in self._tables[name]]
+            await self._wait_until_active(tables)
+            return tables
+
+    async def _create(self, sender) -> Pubkey:
+        payer = sender._load_payer()
+        # The derivation slot must still be in SlotHashes, so use a recent finalized slot
+        slot = (await self.router.call(lambda client: client.get_slot(Finalized))).value
+        ix, table = create_lookup_table(payer.pubkey(), payer.pubkey(), slot)
+        signature, last_valid_block_height = await sender.send_instructions([ix], [payer], fee_policy="background")
+        await sender.tracker.wait(signature, "confirmed", last_valid_block_height)
+        print(f"Created lookup table {table}")
+        return table
+
+    async def _extend(self, sender, table: Pubkey, addresses: List[Pubkey]):
+        payer = sender._load_payer()
+
+        async def extend(chunk: List[Pubkey]):
+            ix = extend_lookup_table(table, payer.pubkey(), payer.pubkey(), chunk)
+            signature, last_valid_block_height = await sender.send_instructions([ix], [payer], fee_policy="background")
+            await sender.tracker.wait(signature, "confirmed", last_valid_block_height)
+
+        # Extends append, so they can land in any order; sending them together lets the
+        # write-locked table take them back to back instead of one confirmation at a time
+        await asyncio.gather(*(
+            extend(addresses[start:start + MAX_ADDRESSES_PER_EXTEND])
+            for start in range(0, len(addresses), MAX_ADDRESSES_PER_EXTEND)
+        ))
+
+    async def _wait_until_active(self, tables: List[AddressLookupTableAccount], poll_interval: float = 0.4):
+        """New addresses are only usable from the slot after the table was last extended."""
+        last_extended = max(self._last_extended_slots[table.key] for table in tables)
+        while (await self.router.call(lambda client: client.get_slot(Confirmed))).value <= last_extended:
+            await asyncio.sleep(poll_interval)
+
+
+_managers: Dict[RpcRouter, LookupTableManager] = {}
+
+def get_lookup_table_manager(router: RpcRouter) -> LookupTableManager:
+    """Process-wide lookup table cache per router."""
+    if router not in _managers:
+        _managers[router] = LookupTableManager(router)
+    return _managers[router]
@@ -0,0 +1,197 @@
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from solana.rpc.async_api import AsyncClient
+from solders.compute_budget import ID as COMPUTE_BUDGET_PROGRAM_ID, set_compute_unit_price
+from solders.instruction import Instruction
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+from ..config import Config
+from .rpc_router import RpcRouter
+from .signature_tracker import SignatureStatusTracker, TransactionExpiredError
+
+# Percentile of recent prioritization fees each policy bids
+FEE_POLICIES = {"background": 50, "standard": 75, "user": 90}
+# getRecentPrioritizationFees accepts at most 128 accounts
+MAX_FEE_ACCOUNTS = 128
+# Compute budget instruction discriminator for SetComputeUnitPrice
+SET_COMPUTE_UNIT_PRICE = 3
+
+async def get_recent_prioritization_fees(client: AsyncClient, accounts: Sequence[Pubkey]) -> List[int]:
+    """getRecentPrioritizationFees over the client's pooled HTTP session; solana-py has no wrapper for it."""
+    provider = client._provider
+    body = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "getRecentPrioritizationFees",
+        "params": [[str(account) for account in accounts]]
+    }
+    resp = await provider.session.post(provider.endpoint_uri, json=body)
+    resp.raise_for_status()
+    data = resp.json()
+    if "error" in data:
+        raise Exception(f"getRecentPrioritizationFees failed: {data['error']}")
+    return [entry["prioritizationFee"] for entry in data["result"]]
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def writable_accounts(instructions: Sequence[Instruction]) -> List[Pubkey]:
+    """Accounts the instructions write-lock; prioritization fees are local to these."""
+    accounts = dict.fromkeys(meta.pubkey for ix in instructions for meta in ix.accounts if meta.is_writable)
+    return list(accounts)[:MAX_FEE_ACCOUNTS]
+
+def fee_cache_key(instructions: Sequence[Instruction]) -> Tuple[str, ...]:
+    """
+    Transactions of one shape share fee samples: the programs they call, not the exact
+    accounts. Mints and token accounts created per transaction are never contended, and
+    keying on them would make every create_token miss the cache.
+    """
+    return tuple(sorted({str(ix.program_id) for ix in instructions}))
+
+def has_compute_unit_price(instructions: Sequence[Instruction]) -> bool:
+    return any(ix.program_id == COMPUTE_BUDGET_PROGRAM_ID and ix.data[:1] == bytes([SET_COMPUTE_UNIT_PRICE]) for ix in instructions)
+
+@dataclass
+class LandingStats:
+    sent: int = 0
+    landed: int = 0
+    expired: int = 0
+    failed: int = 0
+    # Compute-unit price (micro-lamports) and seconds to land for recently landed transactions
+    prices: Deque[int] = field(default_factory=lambda: deque(maxlen=500))
+    times_to_land: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+    def to_json(self) -> Dict:
+        return {
+            "sent": self.sent,
+            "landed": self.landed,
+            "expired": self.expired,
+            "failed": self.failed,
+            "landing_rate": self.landed / (self.landed + self.expired) if self.landed + self.expired else None,
+            "price_p50": percentile(self.prices, 50) if self.prices else None,
+            "price_p90": percentile(self.prices, 90) if self.prices else None,
+            "time_to_land_p50": percentile(self.times_to_land, 50) if self.times_to_land else None,
+            "time_to_land_p90": percentile(self.times_to_land, 90) if self.times_to_land else None
+        }
+
+class PriorityFeeOracle:
+    """
+    Estimate compute-unit prices from getRecentPrioritizationFees.
+
+    Fees are sampled for the accounts a transaction write-locks and cached for a few
+    slots per transaction shape. Each policy bids a percentile of the recent fees, clamped to the configured
+    floor and ceiling. Sent transactions are followed through the signature tracker so
+    the price paid can be compared against time-to-land per policy.
+    """
+
+    def __init__(
+        self,
+        router: RpcRouter,
+        tracker: SignatureStatusTracker,
+        cache_ttl: float = 2.0,
+        min_price: int = Config.SOLANA_PRIORITY_FEE_MIN,
+        max_price: int = Config.SOLANA_PRIORITY_FEE_MAX,
+        max_cached: int = 1024,
+        max_signed: int = 10_000
+    ):
+        self.router = router
+        self.tracker = tracker
+        self.cache_ttl = cache_ttl
+        self.min_price = min_price
+        self.max_price = max_price
+        self.max_cached = max_cached
+        self.max_signed = max_signed
+        self._cache: Dict[Tuple[str, ...], Tuple[float, List[int]]] = {}
+        # Signed but not yet sent, oldest first
+        self._signed: "OrderedDict[Signature, Tuple[str, int]]" = OrderedDict()
+        self.policies: Dict[str, LandingStats] = {name: LandingStats() for name in FEE_POLICIES}
+        self.rpc_calls = 0
+
+    async def recent_fees(self, accounts: Sequence[Pubkey], key: Optional[Tuple[str, ...]] = None) -> List[int]:
+        """Recent fees for `accounts`, cached under `key` (by default the accounts themselves)."""
+        if key is None:
+            key = tuple(sorted(str(account) for account in accounts))
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and now - cached[0] < self.cache_ttl:
+            return cached[1]
+
+        self.rpc_calls += 1
+        fees = await self.router.call(lambda client: get_recent_prioritization_fees(client, accounts))
+        if len(self._cache) >= self.max_cached:
+            self._cache = {k: v for k, v in self._cache.items() if now - v[0] < self.cache_ttl}
+        self._cache[key] = (now, fees)
+        return fees
+
+    async def estimate(self, instructions: Sequence[Instruction], policy: str = "user") -> int:
+        """Compute-unit price in micro-lamports for a transaction carrying `instructions`."""
+        if policy not in FEE_POLICIES:
+            raise ValueError(f"Unknown fee policy: {policy}")
+        try:
+            fees = await self.recent_fees(writable_accounts(instructions), fee_cache_key(instructions))
+        except Exception as e:
+            print(f"Error fetching prioritization fees: {str(e)}")
+            fees = []
+        price = int(percentile(fees, FEE_POLICIES[policy])) if fees else self.min_price
+        return max(self.min_price, min(self.max_price, price))
+
+    async def with_compute_unit_price(self, instructions: List[Instruction], policy: str = "user") -> Tuple[List[Instruction], Optional[int]]:
+        """Prepend SetComputeUnitPrice unless the caller already set one."""
+        if has_compute_unit_price(instructions):
+            return instructions, None
+        price = await self.estimate(instructions, policy)
+        return [set_compute_unit_price(price)] + list(instructions), price
+
+    def signed(self, signature: Signature, policy: str, price: Optional[int]):
+        if price is not None:
+            self._signed[signature] = (policy, price)
+            # Transactions signed but never handed to sent()/discard() must not pile up
+            while len(self._signed) > self.max_signed:
+                self._signed.popitem(last=False)
+
+    def discard(self, signature: Signature):
+        """Forget a signed transaction whose send failed."""
+        self._signed.pop(signature, None)
+
+    def sent(self, signature: Signature, last_valid_block_height: Optional[int]):
+        """Follow a sent transaction until it lands or expires and record the outcome."""
+        entry = self._signed.pop(signature, None)
+        # Durable-nonce transactions never expire, so there is no landing window to measure
+        if entry is None or last_valid_block_height is None:
+            return
+        policy, price = entry
+        stats = self.policies[policy]
+        stats.sent += 1
+        sent_at = time.monotonic()
+
+        def record(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                stats.landed += 1
+                stats.prices.append(price)
+                stats.times_to_land.append(time.monotonic() - sent_at)
+            elif isinstance(error, TransactionExpiredError):
+                stats.expired += 1
+            else:
+                stats.failed += 1
+
+        self.tracker.track(signature, "confirmed", last_valid_block_height).add_done_callback(record)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {policy: stats.to_json() for policy, stats in self.policies.items()}
+
+
+_oracles: Dict[RpcRouter, PriorityFeeOracle] = {}
+
+def get_priority_fee_oracle(router: RpcRouter, tracker: SignatureStatusTracker) -> PriorityFeeOracle:
+    """Process-wide fee oracle per router, so fee samples and landing stats are shared."""
+    if router not in _oracles:
+        _oracles[router] = PriorityFeeOracle(router, tracker)
+    return _oracles[router]
@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Optional, Union
+
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+from solders.transaction import Transaction, VersionedTransaction
+
+from ..config import Config
+from .priority_fees import percentile
+from .rpc_guard import TokenBucket, get_rpc_guard
+from .rpc_pool import get_rpc_pool
+from .signature_tracker import SignatureStatusTracker, TransactionExpiredError, TransactionFailedError
+
+# Landed transactions kept for the resend percentiles
+RESEND_HISTORY = 1000
+
+class RebroadcastSender:
+    """
+    Keep re-sending in-flight transactions until they land or expire.
+
+    RPC nodes forward a transaction to the upcoming leaders a few times and then drop it,
+    so under load a single send is often lost. While a confirmation is pending, the same
+    signed bytes are sent again every `interval` seconds with preflight skipped and node
+    retries disabled. The signature is unchanged, so a duplicate can never land twice.
+    Resends have their own per-second budget instead of taking tokens from the endpoint's
+    RpcGuard, so they never queue ahead of reads and first sends; a resend that finds the
+    budget empty, or the endpoint backing off a 429, is dropped rather than delayed.
+    Resending stops as soon as the confirmation resolves, which for blockhash transactions
+    is at the latest when the status tracker sees lastValidBlockHeight pass.
+    """
+
+    def __init__(self, url: str, client: Optional[AsyncClient] = None, interval: float = 0.3, rate: float = Config.SOLANA_REBROADCAST_RATE_LIMIT):
+        self.url = url
+        self.client = client
+        self.interval = interval
+        self.bucket = TokenBucket(rate, max(1.0, rate))
+        self.landed = 0
+        self.expired = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.resends = 0
+        self.send_errors = 0
+        self.dropped = 0
+        self._resends_per_landed: Deque[int] = deque(maxlen=RESEND_HISTORY)
+
+    async def _resend(self, raw: bytes) -> bool:
+        """Send `raw` once if the resend budget allows; returns whether it was sent."""
+        if get_rpc_guard(self.url).bucket.paused or not self.bucket.try_acquire():
+            self.dropped += 1
+            return False
+        try:
+            # Borrowed per send: a client held from creation outlives RpcPool.close()
+            client = self.client or get_rpc_pool().get_client(self.url)
+            await client.send_raw_transaction(raw, opts=TxOpts(skip_preflight=True, max_retries=0))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Best effort; the confirmation decides the outcome
+            self.send_errors += 1
+            print(f"Error rebroadcasting transaction: {str(e)}")
+        return True
+
+    async def rebroadcast(self, tx: Union[Transaction, VersionedTransaction], confirmation: Awaitable) -> Any:
+        """
+        Await `confirmation` (already sent `tx` reaching its commitment), re-sending `tx`
+        every interval until it resolves. Its result or exception is passed through.
+        """
+        raw = bytes(tx)
+        waiter = asyncio.ensure_future(confirmation)
+        resends = 0
+        try:
+            while True:
+                done, _ = await asyncio.wait({waiter}, timeout=self.interval)
+                if done:
+                    break
+                if await self._resend(raw):
+                    resends += 1
+            result = waiter.result()
+        except TransactionExpiredError:
+            self.expired += 1
+            raise
+        except TransactionFailedError:
+            self.failed += 1
+            raise
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.timed_out += 1
+            raise
+        else:
+            self.landed += 1
+            self._resends_per_landed.append(resends)
+            return result
+        finally:
+            waiter.cancel()
+            self.resends += resends
+
+    async def confirm(
+        self,
+        tracker: SignatureStatusTracker,
+        tx: Union[Transaction, VersionedTransaction],
+        last_valid_block_height: Optional[int],
+        commitment: str = "confirmed",
+        timeout: Optional[float] = None
+    ):
+        """Rebroadcast `tx` while the batched status tracker waits for it."""
+        await self.rebroadcast(tx, tracker.wait(tx.signatures[0], commitment, last_valid_block_height, timeout))
+
+    def stats(self) -> Dict:
+        history = self._resends_per_landed
+        return {
+            "landed": self.landed,
+            "expired": self.expired,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "resends": self.resends,
+            "send_errors": self.send_errors,
+            "dropped": self.dropped,
+            "resends_per_landed_p50": percentile(history, 50) if history else None,
+            "resends_per_landed_p90": percentile(history, 90) if history else None,
+            "resends_per_landed_max": max(history) if history else None
+        }
+
+
+_senders: Dict[str, RebroadcastSender] = {}
+
+def get_rebroadcast_sender(url: str) -> RebroadcastSender:
+    """Process-wide rebroadcast sender per send endpoint, sending on the pooled client for that URL."""
+    if url not in _senders:
+        _senders[url] = RebroadcastSender(url, interval=Config.SOLANA_REBROADCAST_INTERVAL)
+    return _senders[url]
+
+def rebroadcast_stats() -> Dict[str, Dict]:
+    return {url: sender.stats() for url, sender in _senders.items()}
@@ -0,0 +1,240 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+
+from ..config import Config
+
+T = TypeVar("T")
+
+class CircuitOpenError(Exception):
+    """The endpoint's circuit breaker is open; the call was rejected without being sent."""
+
+class TokenBucket:
+    """
+    Process-wide request budget for one endpoint.
+
+    Tokens refill at `rate` per second up to `capacity`. Callers queue FIFO for a token,
+    and pause() holds every caller at once, e.g. for a 429's Retry-After, so the retries
+    that follow are metered out instead of firing in lockstep.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._tokens
+
+    @property
+    def paused(self) -> bool:
+        return time.monotonic() < self._paused_until
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available right now, without waiting."""
+        if self.paused:
+            return False
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` and restart from an empty bucket."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._refill()
+        self._tokens = 0.0
+
+class CircuitBreaker:
+    """
+    Fail fast while an endpoint is unhealthy.
+
+    After `failure_threshold` consecutive failures the breaker opens and rejects calls.
+    Once `reset_timeout` has passed a single probe is let through (half-open); its
+    success closes the breaker again and its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.OPEN:
+            return False
+        if state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._state = self.HALF_OPEN
+            self._probing = True
+        return True
+
+    def record_success(self):
+        self._state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self):
+        """End a call that says nothing about the endpoint's health."""
+        self._probing = False
+
+def _http_error(e: BaseException) -> Tuple[Optional[int], Optional[float], bool]:
+    """
+    (HTTP status, Retry-After seconds, transport failure) for an exception or the
+    httpx error it wraps; solana-py re-raises httpx errors as SolanaRpcException.
+    """
+    seen = e
+    while seen is not None:
+        if isinstance(seen, httpx.HTTPStatusError):
+            retry_after = seen.response.headers.get("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            return seen.response.status_code, retry_after, False
+        if isinstance(seen, (httpx.TransportError, asyncio.TimeoutError)):
+            return None, None, True
+        seen = seen.__cause__ or seen.__context__
+    return None, None, False
+
+class RpcGuard:
+    """
+    Rate limiting, retries and circuit breaking for every call to one endpoint.
+
+    Calls take a token from the endpoint's bucket and are rejected immediately while
+    its breaker is open. 429s pause the whole bucket for Retry-After; transport errors
+    and 5xx count against the breaker and are retried with full-jitter backoff. Other
+    errors, like JSON-RPC errors from the node, are raised without a retry.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        rate: float = Config.SOLANA_RPC_RATE_LIMIT,
+        burst: float = Config.SOLANA_RPC_BURST,
+        max_retries: int = Config.SOLANA_RPC_MAX_RETRIES,
+        base_delay: float = 0.25,
+        max_delay: float = 8.0,
+        failure_threshold: int = Config.SOLANA_RPC_BREAKER_FAILURES,
+        reset_timeout: float = Config.SOLANA_RPC_BREAKER_RESET
+    ):
+        self.url = url
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.rejected = 0
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {self.url}")
+            await self.bucket.acquire()
+            self.calls += 1
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                status, retry_after, transport_error = _http_error(e)
+                if status == 429:
+                    self.throttled += 1
+                    self.breaker.release()
+                    self.bucket.pause(retry_after if retry_after is not None else self.base_delay * 2 ** attempt)
+                    # The bucket holds everyone for Retry-After; jitter spreads the restart
+                    delay = random.uniform(0, self.base_delay)
+                elif transport_error or (status is not None and status >= 500):
+                    self.breaker.record_failure()
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                else:
+                    self.breaker.release()
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.url,
+            "bucket_level": self.bucket.level,
+            "bucket_capacity": self.bucket.capacity,
+            "rate_limit": self.bucket.rate,
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "rejected": self.rejected
+        }
+
+
+_guards: Dict[str, RpcGuard] = {}
+
+def get_rpc_guard(url: str) -> RpcGuard:
+    """Process-wide guard per endpoint, shared by reads, writes and every manager instance."""
+    if url not in _guards:
+        _guards[url] = RpcGuard(url)
+    return _guards[url]
+
+def rpc_guard_stats() -> Dict[str, Dict]:
+    return {url: guard.stats() for url, guard in _guards.items()}
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Dict, List, Optional, Set
+
+import httpx
+from solana.rpc.async_api import AsyncClient
+
+from ..config import Config
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class RpcClientPool:
+    """
+    Process-wide pool of Solana RPC clients.
+
+    Every AsyncClient handed out shares a single keep-alive httpx session, so
+    concurrent SolanaTokenManager instances reuse warm connections instead of
+    paying DNS + TLS setup per request. Connection limits on the session bound
+    how many RPC calls can be in flight at once.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = Config.SOLANA_RPC_MAX_CONNECTIONS,
+        max_keepalive_connections: int = Config.SOLANA_RPC_MAX_KEEPALIVE,
+        keepalive_expiry: float = Config.SOLANA_RPC_KEEPALIVE_EXPIRY,
+        timeout: float = Config.SOLANA_RPC_TIMEOUT,
+        http2: bool = Config.SOLANA_RPC_HTTP2
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        # Fall back to HTTP/1.1 keep-alive when h2 is not installed
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._session: Optional[httpx.AsyncClient] = None
+        self._clients: Dict[str, AsyncClient] = {}
+        # Provider sessions replaced by the shared one, and their pending closes
+        self._discarded: List[httpx.AsyncClient] = []
+        self._closing: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        """The shared httpx session, created on first use."""
+        if self._session is None or self._session.is_closed:
+            self._session = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+            # Clients bound to a closed session must be rebuilt
+            self._clients = {}
+        return self._session
+
+    def get_client(self, endpoint: str) -> AsyncClient:
+        """Borrow the shared AsyncClient for an RPC endpoint."""
+        session = self.session
+        client = self._clients.get(endpoint)
+        if client is None:
+            client = AsyncClient(endpoint, timeout=self.timeout)
+            # AsyncHTTPProvider creates its own session; swap in the pooled one
+            self._discard_session(client._provider.session)
+            client._provider.session = session
+            self._clients[endpoint] = client
+        return client
+
+    def _discard_session(self, session: httpx.AsyncClient):
+        """Close a provider's own session. It never opened a connection, but it holds a pool."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Built outside the event loop (e.g. at import); close() picks it up
+            self._discarded.append(session)
+            return
+        task = loop.create_task(session.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def start(self):
+        """Open the shared session ahead of the first request."""
+        async with self._lock:
+            _ = self.session
+
+    async def close(self):
+        """Close the shared session and every client borrowed from it."""
+        async with self._lock:
+            if self._session is not None and not self._session.is_closed:
+                await self._session.aclose()
+            for session in self._discarded:
+                await session.aclose()
+            self._discarded = []
+            # Closes scheduled on an earlier event loop can't be awaited from this one
+            loop = asyncio.get_running_loop()
+            pending = [task for task in self._closing if task.get_loop() is loop]
+            if pending:
+                await asyncio.gather(*pending)
+            self._closing = set()
+            self._session = None
+            self._clients = {}
+
+
+rpc_pool = RpcClientPool()
+
+def get_rpc_pool() -> RpcClientPool:
+    return rpc_pool
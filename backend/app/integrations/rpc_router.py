@@ -0,0 +1,176 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from solana.rpc.async_api import AsyncClient
+
+from ..config import Config
+from .rpc_guard import CircuitBreaker, get_rpc_guard
+from .rpc_pool import RpcClientPool, get_rpc_pool
+
+T = TypeVar("T")
+
+@dataclass
+class EndpointStats:
+    url: str
+    latency_ewma: Optional[float] = None  # Seconds
+    error_ewma: float = 0.0  # Fraction of recent calls that failed
+    last_error_at: float = 0.0
+    requests: int = 0
+    errors: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_json(self) -> Dict:
+        return {
+            "url": self.url,
+            "latency_ewma": self.latency_ewma,
+            "error_ewma": self.error_ewma,
+            "p95": self.quantile(0.95),
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+class RpcRouter:
+    """
+    Route read-only RPC calls across several endpoints.
+
+    Each endpoint keeps an EWMA of latency and error rate. Reads go to the fastest
+    healthy endpoint; when hedging is enabled and the call has not answered by that
+    endpoint's p95 latency, the same call is fired at the next-best endpoint and
+    whichever answers first wins. Every call goes through the endpoint's RpcGuard, so
+    endpoints whose circuit breaker is open are skipped until they cool down.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        pool: Optional[RpcClientPool] = None,
+        alpha: float = 0.2,
+        hedge: bool = Config.SOLANA_RPC_HEDGE,
+        hedge_quantile: float = 0.95,
+        default_hedge_delay: float = 0.5,
+        min_hedge_delay: float = 0.02,
+        unhealthy_error_rate: float = 0.5,
+        unhealthy_cooldown: float = 30.0
+    ):
+        if not endpoints:
+            raise ValueError("RpcRouter requires at least one endpoint")
+        self.endpoints = [EndpointStats(url) for url in dict.fromkeys(endpoints)]
+        self.guards = {stats.url: get_rpc_guard(stats.url) for stats in self.endpoints}
+        self.pool = pool or get_rpc_pool()
+        self.alpha = alpha
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.unhealthy_cooldown = unhealthy_cooldown
+        self.hedged_requests = 0
+
+    def is_healthy(self, stats: EndpointStats) -> bool:
+        if self.guards[stats.url].breaker.state == CircuitBreaker.OPEN:
+            return False
+        if stats.error_ewma < self.unhealthy_error_rate:
+            return True
+        # Let an unhealthy endpoint take traffic again once it has cooled down
+        return time.monotonic() - stats.last_error_at > self.unhealthy_cooldown
+
+    def ranked(self) -> List[EndpointStats]:
+        """
+        Endpoints ordered healthy-first, then by latency EWMA. Unmeasured endpoints go
+        after the measured ones in their configured order, so a fallback such as the
+        public cluster URL is not preferred before any call has reached it.
+        """
+        def sort_key(stats: EndpointStats) -> Tuple[bool, bool, float]:
+            unmeasured = stats.latency_ewma is None
+            return (not self.is_healthy(stats), unmeasured, 0.0 if unmeasured else stats.latency_ewma)
+        return sorted(self.endpoints, key=sort_key)
+
+    def record(self, stats: EndpointStats, latency: float, error: bool):
+        stats.requests += 1
+        stats.error_ewma = self.alpha * float(error) + (1 - self.alpha) * stats.error_ewma
+        if error:
+            stats.errors += 1
+            stats.last_error_at = time.monotonic()
+            return
+        stats.latencies.append(latency)
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma = self.alpha * latency + (1 - self.alpha) * stats.latency_ewma
+
+    def hedge_delay(self, stats: EndpointStats) -> float:
+        if len(stats.latencies) < 20:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, stats.quantile(self.hedge_quantile))
+
+    def client_for(self, stats: EndpointStats) -> AsyncClient:
+        return self.pool.get_client(stats.url)
+
+    @property
+    def primary(self) -> AsyncClient:
+        """Client for the current best endpoint, for calls that must not be duplicated."""
+        return self.client_for(self.ranked()[0])
+
+    async def _timed(self, stats: EndpointStats, fn: Callable[[AsyncClient], Awaitable[T]]) -> T:
+        started = time.monotonic()
+        try:
+            result = await self.guards[stats.url].call(lambda: fn(self.client_for(stats)))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.record(stats, time.monotonic() - started, error=True)
+            raise
+        self.record(stats, time.monotonic() - started, error=False)
+        return result
+
+    async def call(self, fn: Callable[[AsyncClient], Awaitable[T]], hedge: Optional[bool] = None) -> T:
+        """
+        Run a read-only call against the best endpoint, hedging to the runner-up if slow.
+        `fn` receives an AsyncClient and must be safe to execute more than once.
+        """
+        ranked = self.ranked()
+        should_hedge = (self.hedge if hedge is None else hedge) and len(ranked) > 1
+        primary = asyncio.ensure_future(self._timed(ranked[0], fn))
+        if not should_hedge:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(ranked[0]))
+        if primary in done and primary.exception() is None:
+            return primary.result()
+
+        self.hedged_requests += 1
+        pending = {primary, asyncio.ensure_future(self._timed(ranked[1], fn))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> List[Dict]:
+        return [{**stats.to_json(), **self.guards[stats.url].stats()} for stats in self.endpoints]
+
+
+_routers: Dict[Tuple[str, ...], RpcRouter] = {}
+
+def get_rpc_router(endpoints: List[str]) -> RpcRouter:
+    """Process-wide router per endpoint list, so latency stats survive across manager instances."""
+    key = tuple(endpoints)
+    if key not in _routers:
+        _routers[key] = RpcRouter(endpoints)
+    return _routers[key]
@@ -0,0 +1,217 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+from solders.signature import Signature
+
+from .rpc_router import RpcRouter
+
+# getSignatureStatuses accepts at most 256 signatures per call
+MAX_SIGNATURES_PER_CALL = 256
+
+# Ordered so that a status at or above the target commitment satisfies it
+COMMITMENT_LEVELS = {"processed": 0, "confirmed": 1, "finalized": 2}
+
+class TransactionFailedError(Exception):
+    """The transaction landed on chain with an error."""
+
+def to_signature(signature: Union[str, Signature]) -> Signature:
+    return signature if isinstance(signature, Signature) else Signature.from_string(signature)
+
+def check_commitment(commitment: str) -> str:
+    if commitment not in COMMITMENT_LEVELS:
+        raise ValueError(f"Unsupported commitment: {commitment}")
+    return commitment
+
+def status_reached(status, commitment: str) -> bool:
+    """
+    Whether a TransactionStatus from getSignatureStatuses has reached the target commitment.
+    Raises if the transaction landed with an error.
+    """
+    if status is None:
+        return False
+    if status.err is not None:
+        raise TransactionFailedError(f"Transaction failed: {status.err}")
+    if status.confirmation_status is None:
+        return False
+    return int(status.confirmation_status) >= COMMITMENT_LEVELS[commitment]
+
+class TransactionExpiredError(Exception):
+    """The transaction's blockhash expired before it reached the target commitment."""
+
+@dataclass
+class _Pending:
+    future: asyncio.Future
+    commitment: str
+    last_valid_block_height: Optional[int] = None
+
+class SignatureStatusTracker:
+    """
+    Track every in-flight signature from one background polling loop.
+
+    Each tick asks getSignatureStatuses about all pending signatures in batches of
+    up to 256 and resolves the per-signature futures. Signatures registered with a
+    lastValidBlockHeight fail with TransactionExpiredError once the chain passes it.
+    """
+
+    def __init__(
+        self,
+        router: RpcRouter,
+        poll_interval: float = 0.4,
+        batch_size: int = MAX_SIGNATURES_PER_CALL
+    ):
+        self.router = router
+        self.poll_interval = poll_interval
+        self.batch_size = min(batch_size, MAX_SIGNATURES_PER_CALL)
+        self._pending: Dict[Signature, List[_Pending]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.rpc_calls = 0
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def track(
+        self,
+        signature: Union[str, Signature],
+        commitment: str = "confirmed",
+        last_valid_block_height: Optional[int] = None
+    ) -> asyncio.Future:
+        """Register a signature and return a future resolved once it reaches the commitment."""
+        signature = to_signature(signature)
+        entry = _Pending(
+            asyncio.get_running_loop().create_future(),
+            check_commitment(commitment),
+            last_valid_block_height
+        )
+        self._pending.setdefault(signature, []).append(entry)
+        self._ensure_running()
+        self._wakeup.set()
+        return entry.future
+
+    def untrack(self, signature: Union[str, Signature], future: asyncio.Future):
+        signature = to_signature(signature)
+        entries = [entry for entry in self._pending.get(signature, []) if entry.future is not future]
+        if entries:
+            self._pending[signature] = entries
+        else:
+            self._pending.pop(signature, None)
+
+    async def wait(
+        self,
+        signature: Union[str, Signature],
+        commitment: str = "confirmed",
+        last_valid_block_height: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        """Wait until the signature reaches the commitment, raising if it failed, expired or timed out."""
+        future = self.track(signature, commitment, last_valid_block_height)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            raise Exception("Transaction confirmation timeout")
+        finally:
+            self.untrack(signature, future)
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error polling signature statuses: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def poll_once(self):
+        """Check every pending signature once, resolving the ones that are done."""
+        signatures = list(self._pending)
+        # Read the block height before the statuses: a signature still missing from statuses
+        # fetched afterwards cannot have landed while the height was already past its blockhash
+        block_height = None
+        if any(entry.last_valid_block_height is not None for signature in signatures for entry in self._pending[signature]):
+            self.rpc_calls += 1
+            block_height = (await self.router.call(lambda client: client.get_block_height())).value
+
+        for start in range(0, len(signatures), self.batch_size):
+            batch = signatures[start:start + self.batch_size]
+            self.rpc_calls += 1
+            resp = await self.router.call(lambda client: client.get_signature_statuses(batch))
+            for signature, status in zip(batch, resp.value):
+                self._resolve(signature, status)
+
+        if block_height is not None:
+            self._expire(block_height, signatures)
+
+    def _resolve(self, signature: Signature, status):
+        remaining = []
+        for entry in self._pending.get(signature, []):
+            if entry.future.done():
+                continue
+            try:
+                if status_reached(status, entry.commitment):
+                    entry.future.set_result(status)
+                    continue
+            except TransactionFailedError as e:
+                entry.future.set_exception(e)
+                continue
+            remaining.append(entry)
+        if remaining:
+            self._pending[signature] = remaining
+        else:
+            self._pending.pop(signature, None)
+
+    def _expire(self, block_height: int, signatures: List[Signature]):
+        """Expire entries of `signatures` (all checked after `block_height` was read) past their last valid height."""
+        for signature in signatures:
+            if signature not in self._pending:
+                continue
+            remaining = []
+            for entry in self._pending[signature]:
+                if entry.future.done():
+                    continue
+                if entry.last_valid_block_height is not None and block_height > entry.last_valid_block_height:
+                    entry.future.set_exception(TransactionExpiredError(
+                        f"Transaction {signature} expired at block height {entry.last_valid_block_height}"
+                    ))
+                else:
+                    remaining.append(entry)
+            if remaining:
+                self._pending[signature] = remaining
+            else:
+                del self._pending[signature]
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        for entries in self._pending.values():
+            for entry in entries:
+                if not entry.future.done():
+                    entry.future.cancel()
+        self._pending.clear()
+
+
+_trackers: Dict[RpcRouter, SignatureStatusTracker] = {}
+
+def get_signature_tracker(router: RpcRouter) -> SignatureStatusTracker:
+    """Process-wide tracker per router, so every caller shares one polling loop."""
+    if router not in _trackers:
+        _trackers[router] = SignatureStatusTracker(router)
+    return _trackers[router]
+
+async def close_signature_trackers():
+    for tracker in _trackers.values():
+        await tracker.close()
@@ -8,9 +8,6 @@ from solders.pubkey import Pubkey
 from solders.transaction import Transaction
 from solders.instruction import AccountMeta, Instruction
 from solders.sysvar import RENT
-from solana.rpc.async_api import AsyncClient
-from solana.rpc.commitment import Confirmed
-from solana.rpc.types import TxOpts
 from spl.token.constants import TOKEN_PROGRAM_ID, ASSOCIATED_TOKEN_PROGRAM_ID
 from spl.token.instructions import (
     initialize_mint, 
@@ -23,6 +20,9 @@ import json
 from base64 import b64encode
 from typing import Optional, Dict, List
 from ..config import Config
+from .rpc_pool import get_rpc_pool
+from .rpc_guard import get_rpc_guard
+from .derivation_cache import get_derivation_cache
 
 # Constants
 MINT_LAYOUT_SIZE = 82
@@ -63,7 +63,8 @@ class TokenMetadata:
 class SolanaTokenManager:
     def __init__(self, network: Optional[str] = None):
         self.network = network or Config.SOLANA_NETWORK
-        self.client = AsyncClient(Config.SOLANA_RPC_ENDPOINT)
+        self._pooled_client = get_rpc_pool().get_client(Config.SOLANA_RPC_ENDPOINT)
+        self.client = self._pooled_client
         self.payer = self._load_payer()
 
     def _load_payer(self) -> Keypair:
@@ -105,7 +106,9 @@ class SolanaTokenManager:
         }
 
     async def close(self):
-        await self.client.close()
+        # Pooled clients are owned by the RpcClientPool; only close a client swapped in by the caller
+        if self.client is not self._pooled_client:
+            await self.client.close()
 
     async def __aenter__(self):
         return self
@@ -133,35 +136,9 @@ class SolanaTokenManager:
         except Exception:
             return False
 
-    async def _retry_rpc(self, func, max_retries=5, initial_delay=2):
-        """Helper method to retry RPC calls with exponential backoff"""
-        delay = initial_delay
-        last_exception = None
-        
-        for attempt in range(max_retries):
-            try:
-                return await func()
-            except Exception as e:
-                last_exception = e
-                if attempt == max_retries - 1:
-                    raise
-
-                # Check for rate limit response
-                retry_after = None
-                if hasattr(e, 'response') and hasattr(e.response, 'headers'):
-                    retry_after = e.response.headers.get('Retry-After')
-                    if retry_after:
-                        try:
-                            delay = int(retry_after)
-                        except ValueError:
-                            pass
-                
-                print(f"RPC call failed, retrying after {delay} seconds (attempt {attempt + 1}/{max_retries})...")
-                print(f"Error: {str(e)}")
-                await asyncio.sleep(delay)
-                delay = min(delay * 2, 30)  # Double the delay but cap at 30 seconds
-        
-        raise last_exception
+    async def _retry_rpc(self, func):
+        """Run an RPC call through the endpoint's shared rate limiter, retry policy and circuit breaker"""
+        return await get_rpc_guard(Config.SOLANA_RPC_ENDPOINT).call(func)
 
     async def _create_metadata_instruction(
         self,
@@ -172,16 +149,8 @@ class SolanaTokenManager:
         """
         Create a token metadata instruction
         """
-        # Calculate metadata account address (PDA)
-        metadata_seeds = [
-            b"metadata",
-            bytes(TOKEN_METADATA_PROGRAM_ID),
-            bytes(Pubkey.from_string(mint_pubkey))
-        ]
-        metadata_address, _ = Pubkey.find_program_address(
-            metadata_seeds,
-            TOKEN_METADATA_PROGRAM_ID
-        )
+        # Metadata account address (PDA), cached per mint
+        metadata_address = get_derivation_cache().metadata_address(Pubkey.from_string(mint_pubkey))
 
         # Create metadata instruction data
         # Format: [u8 instruction, string name, string symbol, string uri, u16 seller_fee_basis_points]
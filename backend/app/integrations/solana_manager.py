@@ -4,26 +4,49 @@ from solders.system_program import create_account, CreateAccountParams
 from solders.keypair import Keypair
 from solders.system_program import TransferParams, transfer, ID as SystemProgram
 from solders.pubkey import Pubkey
-from solders.transaction import Transaction
+from solders.transaction import Transaction, VersionedTransaction
+from solders.message import Message, MessageV0
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.signature import Signature
+from solders.hash import Hash
 from solders.instruction import AccountMeta, Instruction
 from solders.sysvar import RENT
-from solana.rpc.async_api import AsyncClient
 from solana.rpc.commitment import Confirmed
 from solana.rpc.types import TxOpts
 from spl.token.constants import TOKEN_PROGRAM_ID, ASSOCIATED_TOKEN_PROGRAM_ID
 from spl.token.instructions import (
     initialize_mint, 
-    create_associated_token_account,
     mint_to,
-    get_associated_token_address
+    set_authority,
+    AuthorityType,
+    InitializeMintParams,
+    MintToParams,
+    SetAuthorityParams
 )
 import base58
 import asyncio
 import json
+from decimal import Decimal
 from base64 import b64encode
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Union
 import os
 from ..config import Config
+from .rpc_pool import get_rpc_pool
+from .rpc_router import get_rpc_router
+from .confirmation import get_confirmation_service
+from .blockhash_cache import get_blockhash_cache
+from .cluster_cache import get_cluster_cache
+from .signature_tracker import get_signature_tracker
+from .distribution import LOOKUP_TABLE_MIN_RECIPIENTS, TokenDistributor, default_distribution_id
+from .lookup_tables import get_lookup_table_manager
+from .priority_fees import get_priority_fee_oracle
+from .compute_units import get_compute_unit_estimator
+from .rpc_guard import get_rpc_guard
+from .token_info import get_token_info_cache
+from .derivation_cache import get_derivation_cache
+from .durable_nonce import NonceLease, get_nonce_pool
+from .rebroadcast import get_rebroadcast_sender
+from .token_accounts import get_token_account_cache
 
 # Constants
 MINT_LAYOUT_SIZE = 82
@@ -69,7 +92,22 @@ class SolanaTokenManager:
             self.network = network
 
         self.rpc_endpoint = self._get_network_url()
-        self.client = AsyncClient(self.rpc_endpoint)
+        self._pooled_client = get_rpc_pool().get_client(self.rpc_endpoint)
+        self.client = self._pooled_client
+        # Read-only calls are routed across every known endpoint; writes stay on self.client
+        self.router = get_rpc_router(self._get_read_endpoints())
+        self.confirmations = get_confirmation_service(self.rpc_endpoint, self.router)
+        self.tracker = get_signature_tracker(self.router)
+        self.blockhashes = get_blockhash_cache(self.router)
+        self.cluster = get_cluster_cache(self.router)
+        self.lookup_tables = get_lookup_table_manager(self.router)
+        self.fees = get_priority_fee_oracle(self.router, self.tracker)
+        self.compute_units = get_compute_unit_estimator(self.router)
+        self.token_infos = get_token_info_cache(self.rpc_endpoint, self.router)
+        self.nonces = get_nonce_pool(self.router)
+        self.token_accounts = get_token_account_cache(self.router)
+        # Resends of in-flight transactions go to the leader-facing endpoint when one is configured
+        self.rebroadcaster = get_rebroadcast_sender(Config.SOLANA_SEND_ENDPOINT or self.rpc_endpoint)
 
     def _load_payer(self) -> Keypair:
         """Load the payer keypair from the SOLANA_PAYER_KEY environment variable."""
@@ -77,28 +115,82 @@ class SolanaTokenManager:
         if not payer_secret:
             raise Exception("SOLANA_PAYER_KEY environment variable is not set")
         secret_bytes = base58.b58decode(payer_secret)
-        return Keypair.from_secret_key(secret_bytes)
-
-    async def create_token(self, name: str, symbol: str, initial_supply: int, creator_wallet: str, features: dict, decimals: Optional[int] = 0, uri: Optional[str] = None) -> dict:
-        """Creates a new token on the Solana blockchain using SPL token instructions."""
+        return Keypair.from_bytes(secret_bytes)
+
+    def _load_fee_payers(self, payer: Keypair) -> List[Keypair]:
+        """The main payer plus any extra fee payers configured for parallel submission."""
+        fee_payers = [payer]
+        for secret in Config.SOLANA_FEE_PAYER_KEYS:
+            keypair = Keypair.from_bytes(base58.b58decode(secret))
+            if keypair.pubkey() not in [fee_payer.pubkey() for fee_payer in fee_payers]:
+                fee_payers.append(keypair)
+        return fee_payers
+
+    async def create_token(self, name: str, symbol: str, initial_supply: int, creator_wallet: str, features: dict, decimals: Optional[int] = 0, uri: Optional[str] = None, keep_mint_authority: bool = False) -> dict:
+        """
+        Creates a new token on the Solana blockchain using SPL token instructions.
+        The mint authority is handed to the creator once the initial supply is minted, unless
+        `keep_mint_authority` is set, in which case the payer keeps it (e.g. to revoke it later).
+        """
         # Load the payer keypair
         payer = self._load_payer()
 
         # Generate a new mint keypair for the token
         new_mint = Keypair()
 
-        # Get the minimum balance for rent exemption for a mint account
-        resp = await self.client.get_minimum_balance_for_rent_exemption(MINT_LAYOUT_SIZE)
-        lamports = resp.value if hasattr(resp, "value") else resp
+        # Get the minimum balance for rent exemption for a mint account (cached per epoch)
+        lamports = await self.cluster.get_rent_exemption(MINT_LAYOUT_SIZE)
+
+        instructions = self._build_create_token_instructions(payer, new_mint, lamports, initial_supply, creator_wallet, decimals, keep_mint_authority)
 
+        # Sign with the cached blockhash and send the transaction
+        signers = [payer, new_mint]
+        tx, last_valid_block_height = await self.sign_instructions(instructions, signers)
+        signature = await self.send_transaction(tx, last_valid_block_height)
+
+        # Wait for transaction confirmation, re-sending it until it lands or expires
+        confirmation = self._confirm_transaction(signature, commitment="confirmed", last_valid_block_height=last_valid_block_height)
+        if Config.SOLANA_REBROADCAST:
+            await self.rebroadcaster.rebroadcast(tx, confirmation)
+        else:
+            await confirmation
+
+        return {
+            "token_address": str(new_mint.pubkey()),
+            "transaction_signature": str(signature),
+            "name": name,
+            "symbol": symbol,
+            "initial_supply": initial_supply,
+            "creator_wallet": creator_wallet,
+            "features": features,
+            "decimals": decimals,
+            "uri": uri
+        }
+
+    def _build_create_token_instructions(
+        self,
+        payer: Keypair,
+        new_mint: Keypair,
+        lamports: int,
+        initial_supply: int,
+        creator_wallet: str,
+        decimals: int,
+        keep_mint_authority: bool = False
+    ) -> List[Instruction]:
+        """
+        Instructions to create and initialize a mint, create the creator's ATA, mint the initial
+        supply and hand the mint authority to the creator. The creator doesn't sign, so the payer
+        is the mint authority until the supply is minted.
+        """
+        creator = Pubkey.from_string(creator_wallet)
         # Build transaction instructions
         instructions = []
 
         # 1. Create the mint account
         create_mint_ix = create_account(
             CreateAccountParams(
-                from_pubkey=payer.public_key,
-                new_account_pubkey=new_mint.public_key,
+                from_pubkey=payer.pubkey(),
+                to_pubkey=new_mint.pubkey(),
                 lamports=lamports,
                 space=MINT_LAYOUT_SIZE,
                 owner=TOKEN_PROGRAM_ID
@@ -106,71 +198,294 @@ class SolanaTokenManager:
         )
         instructions.append(create_mint_ix)
 
-        # 2. Initialize the mint account with specified decimals and mint authority set to creator_wallet
+        # 2. Initialize the mint account with specified decimals, the payer as mint authority and
+        # creator_wallet as freeze authority (setting an authority needs no signature from it)
         init_mint_ix = initialize_mint(
-            mint=new_mint.public_key,
-            decimals=decimals,
-            mint_authority=Pubkey.from_string(creator_wallet),
-            freeze_authority=Pubkey.from_string(creator_wallet)
+            InitializeMintParams(
+                decimals=decimals,
+                program_id=TOKEN_PROGRAM_ID,
+                mint=new_mint.pubkey(),
+                mint_authority=payer.pubkey(),
+                freeze_authority=creator
+            )
         )
         instructions.append(init_mint_ix)
 
         # 3. Create an associated token account for the creator wallet
-        ata_ix = create_associated_token_account(
-            payer=payer.public_key,
-            owner=Pubkey.from_string(creator_wallet),
-            mint=new_mint.public_key
+        addresses = get_derivation_cache()
+        ata_ix = addresses.create_associated_token_account(
+            payer=payer.pubkey(),
+            owner=creator,
+            mint=new_mint.pubkey()
         )
         instructions.append(ata_ix)
 
         # 4. Mint the initial supply to the associated token account
-        associated_token_address = get_associated_token_address(Pubkey.from_string(creator_wallet), new_mint.public_key)
+        associated_token_address = addresses.associated_token_address(creator, new_mint.pubkey())
         mint_to_ix = mint_to(
-            mint=new_mint.public_key,
-            dest=associated_token_address,
-            authority=Pubkey.from_string(creator_wallet),
-            amount=initial_supply
+            MintToParams(
+                program_id=TOKEN_PROGRAM_ID,
+                mint=new_mint.pubkey(),
+                dest=associated_token_address,
+                mint_authority=payer.pubkey(),
+                amount=initial_supply
+            )
         )
         instructions.append(mint_to_ix)
 
-        # Build and send the transaction
-        tx = Transaction()
-        for ix in instructions:
-            tx.add(ix)
+        # 5. Hand the mint authority to creator_wallet
+        if not keep_mint_authority and creator != payer.pubkey():
+            set_authority_ix = set_authority(
+                SetAuthorityParams(
+                    program_id=TOKEN_PROGRAM_ID,
+                    account=new_mint.pubkey(),
+                    authority=AuthorityType.MINT_TOKENS,
+                    current_authority=payer.pubkey(),
+                    new_authority=creator
+                )
+            )
+            instructions.append(set_authority_ix)
+
+        return instructions
 
-        signers = [payer, new_mint]
-        tx_result = await self.client.send_transaction(tx, *signers)
+    async def create_tokens_batch(
+        self,
+        tokens: List[Dict],
+        concurrency: int = 8,
+        commitment: str = "confirmed",
+        timeout: float = 60.0
+    ) -> List[Dict]:
+        """
+        Create many tokens at once. Each item takes the same keys as create_token.
+        All instructions are built up front, at most `concurrency` transactions are in flight
+        and every signature is confirmed through the shared status tracker.
+        Returns one result per item, in order, with status "success" or "failed".
+        """
+        payer = self._load_payer()
+        lamports = await self.cluster.get_rent_exemption(MINT_LAYOUT_SIZE)
 
-        # Wait for transaction confirmation
-        await self._confirm_transaction(tx_result.value)
+        results: List[Optional[Dict]] = [None] * len(tokens)
+        pending = []
+        for index, token in enumerate(tokens):
+            try:
+                new_mint = Keypair()
+                instructions = self._build_create_token_instructions(
+                    payer,
+                    new_mint,
+                    lamports,
+                    token["initial_supply"],
+                    token["creator_wallet"],
+                    token.get("decimals", 0)
+                )
+                pending.append((index, token, new_mint, instructions))
+            except Exception as e:
+                results[index] = {"index": index, "status": "failed", "error": str(e)}
 
-        return {
-            "token_address": str(new_mint.public_key),
-            "transaction_signature": tx_result.value,
-            "name": name,
-            "symbol": symbol,
-            "initial_supply": initial_supply,
-            "creator_wallet": creator_wallet,
-            "features": features,
-            "decimals": decimals,
-            "uri": uri
-        }
+        window = asyncio.Semaphore(concurrency)
+
+        async def submit(index: int, token: Dict, new_mint: Keypair, instructions: List[Instruction]):
+            try:
+                async with window:
+                    tx, last_valid_block_height = await self.sign_instructions(instructions, [payer, new_mint])
+                    signature = await self.send_transaction(tx, last_valid_block_height)
+                await self.confirm_sent(tx, last_valid_block_height, commitment, timeout)
+                results[index] = {
+                    "index": index,
+                    "status": "success",
+                    "token": {
+                        "token_address": str(new_mint.pubkey()),
+                        "transaction_signature": str(signature),
+                        "name": token["name"],
+                        "symbol": token["symbol"],
+                        "initial_supply": token["initial_supply"],
+                        "creator_wallet": token["creator_wallet"],
+                        "features": token.get("features", {}),
+                        "decimals": token.get("decimals", 0),
+                        "uri": token.get("uri")
+                    }
+                }
+            except Exception as e:
+                results[index] = {"index": index, "status": "failed", "error": str(e)}
+
+        await asyncio.gather(*(submit(*item) for item in pending))
+        return results
 
     async def transfer_token(self, token_address: str, from_wallet: str, to_wallet: str, amount: float) -> dict:
-        """Simulate a token transfer on the Solana blockchain."""
-        await asyncio.sleep(1)  # simulate network delay
-        dummy_signature = "tx_" + token_address[-6:] + "_" + str(amount)
+        """
+        Transfer `amount` whole tokens from the payer's wallet to `to_wallet`, creating the
+        recipient's associated token account in the same transaction if it does not exist yet.
+        """
+        result = (await self.transfer_tokens_batch(token_address, from_wallet, [{"wallet_address": to_wallet, "amount": amount}]))[0]
+        if result["status"] != "transferred":
+            raise Exception(f"Failed to transfer tokens: {result['error']}")
         return {
             "token_address": token_address,
             "from": from_wallet,
             "to": to_wallet,
             "amount": amount,
-            "transaction_signature": dummy_signature,
+            "transaction_signature": result["transaction_signature"],
             "status": "transferred"
         }
 
+    async def transfer_tokens_batch(self, token_address: str, from_wallet: str, transfers: List[Dict]) -> List[Dict]:
+        """
+        Transfer one token from the payer's wallet to many recipients. Each transfer is
+        {"wallet_address", "amount"} in whole tokens. Recipients are packed into as few
+        transactions as fit in a packet, missing associated token accounts are created
+        idempotently alongside their transfer, and with several recipients the transactions
+        are sent in parallel from every fee payer.
+        Returns one result per transfer, in order, with status "transferred" or "failed".
+        """
+        payer = self._load_payer()
+        if from_wallet != str(payer.pubkey()):
+            raise ValueError(f"Transfers can only be sent from the payer wallet {payer.pubkey()}, not {from_wallet}")
+        mint = Pubkey.from_string(token_address)
+        decimals = await self._get_mint_decimals(mint)
+
+        results: List[Optional[Dict]] = [None] * len(transfers)
+        distributions = []
+        for index, item in enumerate(transfers):
+            try:
+                if not self._validate_wallet(item["wallet_address"]):
+                    raise ValueError(f"Invalid wallet address: {item['wallet_address']}")
+                distributions.append({"wallet_address": item["wallet_address"], "amount": self._to_base_units(item["amount"], decimals)})
+            except Exception as e:
+                results[index] = {"index": index, "to": item.get("wallet_address"), "amount": item.get("amount"), "status": "failed", "error": str(e)}
+
+        distributor = TokenDistributor(
+            self,
+            mint,
+            decimals,
+            payer,
+            self._load_fee_payers(payer) if len(distributions) > 1 else [payer],
+            # Unlike a one-off distribution, the same wallet may be paid again later
+            checkpoint_path=None
+        )
+        if distributions:
+            await distributor.run(distributions)
+
+        for index, item in enumerate(transfers):
+            if results[index] is not None:
+                continue
+            wallet = item["wallet_address"]
+            result = {"index": index, "to": wallet, "amount": item["amount"]}
+            if wallet in distributor.signatures:
+                result.update(status="transferred", transaction_signature=distributor.signatures[wallet])
+            else:
+                result.update(status="failed", error=distributor.failed.get(wallet, "Transfer was not confirmed"))
+            results[index] = result
+        return results
+
+    def _to_base_units(self, amount, decimals: int) -> int:
+        """Whole-token amount in the mint's base units, refusing anything the mint can't represent."""
+        base_units = Decimal(str(amount)).scaleb(decimals)
+        if base_units <= 0 or base_units != base_units.to_integral_value():
+            raise ValueError(f"Invalid amount {amount} for a token with {decimals} decimals")
+        return int(base_units)
+
+    async def warm_up(self):
+        """Load cluster constants and a recent blockhash so the first write pays no extra round trips."""
+        await self.cluster.load()
+        await self.blockhashes.start()
+
+    async def sign_instructions(
+        self,
+        instructions: List[Instruction],
+        signers: List[Keypair],
+        lookup_tables: Optional[List[AddressLookupTableAccount]] = None,
+        fee_policy: str = "user",
+        nonce: Optional[NonceLease] = None
+    ) -> Tuple[Union[Transaction, VersionedTransaction], Optional[int]]:
+        """
+        Sign instructions with the cached recent blockhash; the first signer pays fees.
+        A SetComputeUnitPrice priced by `fee_policy` and a SetComputeUnitLimit sized from
+        simulation are prepended, and with lookup tables the transaction is built as v0,
+        otherwise as legacy. Returns the transaction and the blockhash's lastValidBlockHeight.
+        With a `nonce` lease the transaction is signed against the durable nonce instead and
+        never expires, so the returned lastValidBlockHeight is None.
+        """
+        price = None
+        if Config.SOLANA_PRIORITY_FEES:
+            instructions, price = await self.fees.with_compute_unit_price(instructions, fee_policy)
+
+        if nonce is not None:
+            blockhash, last_valid_block_height = nonce.nonce, None
+            # AdvanceNonceAccount has to be the transaction's first instruction
+            advance = nonce.advance_instruction()
+            build = lambda ixs: self._compile([advance] + ixs, signers, lookup_tables, blockhash)
+        else:
+            latest = await self.blockhashes.get()
+            last_valid_block_height = latest.last_valid_block_height
+            build = lambda ixs: self._compile(ixs, signers, lookup_tables, latest.blockhash)
+        if Config.SOLANA_COMPUTE_UNIT_LIMITS:
+            instructions = await self.compute_units.with_compute_unit_limit(instructions, build)
+        tx = build(instructions)
+        self.fees.signed(tx.signatures[0], fee_policy, price)
+        return tx, last_valid_block_height
+
+    def _compile(
+        self,
+        instructions: List[Instruction],
+        signers: List[Keypair],
+        lookup_tables: Optional[List[AddressLookupTableAccount]],
+        blockhash: Hash
+    ) -> Union[Transaction, VersionedTransaction]:
+        if lookup_tables:
+            message = MessageV0.try_compile(signers[0].pubkey(), instructions, lookup_tables, blockhash)
+            return VersionedTransaction(message, signers)
+        message = Message.new_with_blockhash(instructions, signers[0].pubkey(), blockhash)
+        return Transaction(signers, message, blockhash)
+
+    async def send_transaction(self, tx: Union[Transaction, VersionedTransaction], last_valid_block_height: Optional[int]) -> Signature:
+        # Resending the same signed bytes is idempotent, so the guard may retry it
+        sent = False
+        try:
+            resp = await get_rpc_guard(self.rpc_endpoint).call(lambda: self.client.send_raw_transaction(
+                bytes(tx),
+                opts=TxOpts(preflight_commitment=Confirmed, last_valid_block_height=last_valid_block_height)
+            ))
+            sent = True
+            return resp.value
+        finally:
+            if sent:
+                self.fees.sent(tx.signatures[0], last_valid_block_height)
+            else:
+                self.fees.discard(tx.signatures[0])
+
+    async def confirm_sent(
+        self,
+        tx: Union[Transaction, VersionedTransaction],
+        last_valid_block_height: Optional[int],
+        commitment: str = "confirmed",
+        timeout: Optional[float] = None
+    ):
+        """
+        Wait on the batched status tracker for a transaction already sent with send_transaction,
+        rebroadcasting its bytes meanwhile unless SOLANA_REBROADCAST is off.
+        """
+        if Config.SOLANA_REBROADCAST:
+            await self.rebroadcaster.confirm(self.tracker, tx, last_valid_block_height, commitment, timeout)
+        else:
+            await self.tracker.wait(tx.signatures[0], commitment, last_valid_block_height, timeout)
+
+    async def send_instructions(
+        self,
+        instructions: List[Instruction],
+        signers: List[Keypair],
+        lookup_tables: Optional[List[AddressLookupTableAccount]] = None,
+        fee_policy: str = "user"
+    ) -> Tuple[Signature, int]:
+        """
+        Sign instructions with the cached recent blockhash and submit them; the first signer pays fees.
+        Returns the signature and the blockhash's lastValidBlockHeight.
+        """
+        tx, last_valid_block_height = await self.sign_instructions(instructions, signers, lookup_tables, fee_policy)
+        return await self.send_transaction(tx, last_valid_block_height), last_valid_block_height
+
     async def close(self):
-        await self.client.close()
+        # Pooled clients are owned by the RpcClientPool; only close a client swapped in by the caller
+        if self.client is not self._pooled_client:
+            await self.client.close()
 
     async def __aenter__(self):
         return self
@@ -184,15 +499,24 @@ class SolanaTokenManager:
             print(f"Using Quicknode RPC endpoint: {quicknode}")
             return quicknode
 
+        return self._get_cluster_url()
+
+    def _get_cluster_url(self) -> str:
         if self.network == "mainnet":
             return "https://api.mainnet-beta.solana.com"
         elif self.network == "devnet":
             return "https://api.devnet.solana.com"
         elif self.network == "testnet":
             return "https://api.testnet.solana.com"
+        elif self.network == "localnet":
+            return Config.SOLANA_LOCALNET_URL
         else:
             raise ValueError(f"Unsupported network: {self.network}")
 
+    def _get_read_endpoints(self) -> List[str]:
+        """Primary endpoint first, then SOLANA_RPC_ENDPOINTS, then the public cluster URL as a last resort."""
+        return list(dict.fromkeys([self.rpc_endpoint, *Config.SOLANA_RPC_ENDPOINTS, self._get_cluster_url()]))
+
     def _validate_wallet(self, wallet_address: str) -> bool:
         """
         Validate Solana wallet address format
@@ -203,36 +527,6 @@ class SolanaTokenManager:
         except Exception:
             return False
 
-    async def _retry_rpc(self, func, max_retries=5, initial_delay=2):
-        """Helper method to retry RPC calls with exponential backoff"""
-        delay = initial_delay
-        last_exception = None
-        
-        for attempt in range(max_retries):
-            try:
-                return await func()
-            except Exception as e:
-                last_exception = e
-                if attempt == max_retries - 1:
-                    raise
-
-                # Check for rate limit response
-                retry_after = None
-                if hasattr(e, 'response') and hasattr(e.response, 'headers'):
-                    retry_after = e.response.headers.get('Retry-After')
-                    if retry_after:
-                        try:
-                            delay = int(retry_after)
-                        except ValueError:
-                            pass
-                
-                print(f"RPC call failed, retrying after {delay} seconds (attempt {attempt + 1}/{max_retries})...")
-                print(f"Error: {str(e)}")
-                await asyncio.sleep(delay)
-                delay = min(delay * 2, 30)  # Double the delay but cap at 30 seconds
-        
-        raise last_exception
-
     async def _create_metadata_instruction(
         self,
         mint_pubkey: str,
@@ -242,16 +536,8 @@ class SolanaTokenManager:
         """
         Create a token metadata instruction
         """
-        # Calculate metadata account address (PDA)
-        metadata_seeds = [
-            b"metadata",
-            bytes(TOKEN_METADATA_PROGRAM_ID),
-            bytes(Pubkey.from_string(mint_pubkey))
-        ]
-        metadata_address, _ = Pubkey.find_program_address(
-            metadata_seeds,
-            TOKEN_METADATA_PROGRAM_ID
-        )
+        # Metadata account address (PDA), cached per mint
+        metadata_address = get_derivation_cache().metadata_address(Pubkey.from_string(mint_pubkey))
 
         # Create metadata instruction data
         # Format: [u8 instruction, string name, string symbol, string uri, u16 seller_fee_basis_points]
@@ -281,38 +567,24 @@ class SolanaTokenManager:
             data=bytes(instruction_data)
         )
 
-    async def _confirm_transaction(self, signature: str, max_retries: int = 30, retry_delay: int = 1):
+    async def _confirm_transaction(
+        self,
+        signature: str,
+        commitment: str = "confirmed",
+        timeout: float = 30.0,
+        last_valid_block_height: Optional[int] = None
+    ):
         """
-        Wait for transaction confirmation with retry logic
+        Wait for the transaction to reach the target commitment (processed/confirmed/finalized).
+        Uses the shared signatureSubscribe websocket and falls back to the batched status tracker,
+        which also fails fast once last_valid_block_height has passed.
         """
-        async def check_status():
-            response = await self.client.get_signature_statuses([signature])
-            if "error" in response:
-                raise Exception(f"Failed to get signature status: {response['error']}")
-            return response
-            
-        for _ in range(max_retries):
-            try:
-                response = await self._retry_rpc(check_status)
-                status = response.get("result", {}).get("value", [{}])[0]
-                
-                if status is None:
-                    await asyncio.sleep(retry_delay)
-                    continue
-                    
-                if status.get("err"):
-                    raise Exception(f"Transaction failed: {status['err']}")
-                    
-                if status.get("confirmationStatus") == "finalized":
-                    return
-                    
-                await asyncio.sleep(retry_delay)
-                
-            except Exception as e:
-                print(f"Error checking transaction status: {str(e)}")
-                await asyncio.sleep(retry_delay)
-            
-        raise Exception("Transaction confirmation timeout")
+        await self.confirmations.confirm(
+            signature,
+            commitment=commitment,
+            timeout=timeout,
+            last_valid_block_height=last_valid_block_height
+        )
 
     async def _create_mint_account(
         self,
@@ -326,18 +598,8 @@ class SolanaTokenManager:
         # Calculate space required for mint account
         space = 82  # Standard mint account size
         
-        # Get minimum balance for rent exemption with retry
-        async def get_rent_exemption():
-            resp = await self.client.get_minimum_balance_for_rent_exemption(space)
-            if hasattr(resp, "error") and resp.error is not None:
-                raise Exception(f"Failed to get rent exemption: {resp.error}")
-            if hasattr(resp, "value") and resp.value is not None:
-                return resp.value
-            if hasattr(resp, "result") and resp.result is not None:
-                return resp.result
-            raise Exception("Invalid response from get_minimum_balance_for_rent_exemption")
-        
-        lamports = await self._retry_rpc(get_rent_exemption)
+        # Rent minimums are cached per epoch; misses are rate limited and retried by the RPC guard
+        lamports = await self.cluster.get_rent_exemption(space)
         
         # Create system account instruction
         return transfer(
@@ -404,10 +666,25 @@ class SolanaTokenManager:
         self,
         token_address: str,
         contract_address: str,
-        distributions: List[Dict]
+        distributions: List[Dict],
+        decimals: Optional[int] = None,
+        fee_payers: Optional[List[Keypair]] = None,
+        checkpoint_path: Optional[str] = None,
+        use_lookup_tables: Optional[bool] = None,
+        lookup_recipients: bool = False,
+        distribution_id: Optional[str] = None
     ) -> Dict:
         """
-        Distribute tokens to contributors' wallets after successful fundraising
+        Distribute tokens to contributors' wallets after successful fundraising.
+
+        Each distribution is {"wallet_address", "amount"} with the amount in base units, paid
+        from the payer's associated token account. Progress is checkpointed per
+        `distribution_id`, so calling this again with the same id after a crash only pays
+        what was not paid yet. Without an id, one is derived from the contract and the
+        payout list; pass an explicit id to pay the same list out twice.
+        For repeat payouts to the same holders, `lookup_recipients` puts their token accounts
+        in a per-mint lookup table, reused across payouts, and large distributions are then
+        sent as v0 transactions against it. One-off payouts stay legacy by default.
         """
         try:
             # Validate all wallet addresses
@@ -415,35 +692,52 @@ class SolanaTokenManager:
                 if not self._validate_wallet(dist["wallet_address"]):
                     raise ValueError(f"Invalid wallet address: {dist['wallet_address']}")
 
-            # TODO: Implement token distribution
-            # 1. Get contributor list with wallets
-            # 2. Calculate token amounts
-            # 3. Transfer tokens to each wallet
-            
-            return {
-                "distribution_id": "sample_id",  # Replace with actual ID
-                "status": "completed",
-                "distributions": distributions
-            }
+            mint = Pubkey.from_string(token_address)
+            if decimals is None:
+                decimals = await self._get_mint_decimals(mint)
+            payer = self._load_payer()
+            distribution_id = distribution_id or default_distribution_id(token_address, contract_address, distributions)
+            distributor = TokenDistributor(
+                self,
+                mint,
+                decimals,
+                payer,
+                fee_payers or self._load_fee_payers(payer),
+                checkpoint_path or os.path.join(Config.DISTRIBUTION_CHECKPOINT_DIR, token_address, f"{distribution_id}.jsonl"),
+                use_lookup_tables=(
+                    lookup_recipients and len(distributions) >= LOOKUP_TABLE_MIN_RECIPIENTS
+                    if use_lookup_tables is None else use_lookup_tables
+                ),
+                lookup_recipients=lookup_recipients
+            )
+            result = await distributor.run(distributions)
+            return {"distribution_id": distribution_id, **result}
         except Exception as e:
             raise Exception(f"Failed to distribute tokens: {str(e)}")
 
+    async def _get_mint_decimals(self, mint: Pubkey) -> int:
+        # Decimals never change after a mint is initialized, so this is read once per mint
+        return await self.token_accounts.decimals(mint)
+
+    async def get_token_infos(self, token_addresses: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        On-chain supply, decimals, authorities and Metaplex metadata for many tokens.
+        Uncached tokens are fetched 50 per getMultipleAccounts call; None for addresses
+        that are not mints.
+        """
+        try:
+            return await self.token_infos.get_many(token_addresses)
+        except Exception as e:
+            raise Exception(f"Failed to get token infos: {str(e)}")
+
     async def get_token_info(self, token_address: str) -> Dict:
         """
         Get token information and status
         """
         try:
-            # TODO: Implement token info retrieval
-            # 1. Get token metadata
-            # 2. Get fundraising status
-            # 3. Get trading status
-            # 4. Get contributor wallets
-            
-            return {
-                "token_address": token_address,
-                "status": "active",
-                "metadata": {},  # Add actual metadata
-                "contributors": []  # Add actual contributor list
-            }
+            info = (await self.get_token_infos([token_address]))[token_address]
+            if info is None:
+                raise ValueError(f"Mint account not found: {token_address}")
+            return info
         except Exception as e:
             raise Exception(f"Failed to get token info: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,156 @@
+import struct
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from solders.pubkey import Pubkey
+
+MINT_LAYOUT_SIZE = 82
+TOKEN_ACCOUNT_LAYOUT_SIZE = 165
+# Token account offsets, for getProgramAccounts memcmp filters and data slices
+TOKEN_ACCOUNT_MINT_OFFSET = 0
+TOKEN_ACCOUNT_OWNER_OFFSET = 32
+TOKEN_ACCOUNT_AMOUNT_OFFSET = 64
+# dataSlice of a token account holding just owner and amount
+OWNER_AMOUNT_SLICE = (TOKEN_ACCOUNT_OWNER_OFFSET, 40)
+
+# Token account states
+UNINITIALIZED = 0
+INITIALIZED = 1
+FROZEN = 2
+
+_MINT = struct.Struct("<I32sQB?I32s")
+_TOKEN_ACCOUNT = struct.Struct("<32s32sQI32sBIQQI32s")
+_OWNER_AMOUNT = struct.Struct("<32sQ")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+@dataclass
+class Mint:
+    mint_authority: Optional[Pubkey]
+    supply: int
+    decimals: int
+    is_initialized: bool
+    freeze_authority: Optional[Pubkey]
+
+@dataclass
+class TokenAccount:
+    mint: Pubkey
+    owner: Pubkey
+    amount: int
+    delegate: Optional[Pubkey]
+    state: int
+    # Rent-exempt reserve for wrapped SOL accounts, None otherwise
+    is_native: Optional[int]
+    delegated_amount: int
+    close_authority: Optional[Pubkey]
+
+def _check_size(data: Buffer, size: int, kind: str):
+    if len(data) < size:
+        raise ValueError(f"{kind} account data is {len(data)} bytes, expected {size}")
+
+def _mint_from_fields(fields) -> Mint:
+    mint_authority_option, mint_authority, supply, decimals, is_initialized, freeze_authority_option, freeze_authority = fields
+    return Mint(
+        Pubkey(mint_authority) if mint_authority_option else None,
+        supply,
+        decimals,
+        is_initialized,
+        Pubkey(freeze_authority) if freeze_authority_option else None
+    )
+
+def _token_account_from_fields(fields) -> TokenAccount:
+    (
+        mint, owner, amount,
+        delegate_option, delegate,
+        state,
+        is_native_option, is_native,
+        delegated_amount,
+        close_authority_option, close_authority
+    ) = fields
+    return TokenAccount(
+        Pubkey(mint),
+        Pubkey(owner),
+        amount,
+        Pubkey(delegate) if delegate_option else None,
+        state,
+        is_native if is_native_option else None,
+        delegated_amount,
+        Pubkey(close_authority) if close_authority_option else None
+    )
+
+def decode_mint(data: Buffer) -> Mint:
+    """Decode an SPL Mint account; `data` may be a memoryview into a larger buffer."""
+    _check_size(data, MINT_LAYOUT_SIZE, "Mint")
+    return _mint_from_fields(_MINT.unpack_from(data))
+
+def decode_token_account(data: Buffer) -> TokenAccount:
+    """Decode an SPL Token account; `data` may be a memoryview into a larger buffer."""
+    _check_size(data, TOKEN_ACCOUNT_LAYOUT_SIZE, "Token")
+    return _token_account_from_fields(_TOKEN_ACCOUNT.unpack_from(data))
+
+def decode_owner_amount(data: Buffer) -> Tuple[Pubkey, int]:
+    """Owner and amount from a token account fetched with the OWNER_AMOUNT_SLICE data slice."""
+    _check_size(data, _OWNER_AMOUNT.size, "Token account slice")
+    owner, amount = _OWNER_AMOUNT.unpack_from(data)
+    return Pubkey(owner), amount
+
+def _join(buffers: Iterable[Buffer], size: int, kind: str) -> bytes:
+    """
+    Copy fixed-size records into one contiguous buffer so they can be decoded in one pass.
+    This is one copy of every record; only the single-account decoders read in place.
+    """
+    buffers = list(buffers)
+    for data in buffers:
+        if len(data) != size:
+            raise ValueError(f"{kind} account data is {len(data)} bytes, expected {size}")
+    return b"".join(buffers)
+
+def decode_mints(buffers: Iterable[Buffer]) -> List[Mint]:
+    return [_mint_from_fields(fields) for fields in _MINT.iter_unpack(_join(buffers, MINT_LAYOUT_SIZE, "Mint"))]
+
+def decode_token_accounts(buffers: Iterable[Buffer]) -> List[TokenAccount]:
+    """Decode many token accounts, e.g. one getProgramAccounts response, in a single unpack pass over one joined copy."""
+    joined = _join(buffers, TOKEN_ACCOUNT_LAYOUT_SIZE, "Token")
+    return [_token_account_from_fields(fields) for fields in _TOKEN_ACCOUNT.iter_unpack(joined)]
+
+def decode_owner_amounts(buffers: Iterable[Buffer]) -> List[Tuple[Pubkey, int]]:
+    joined = _join(buffers, _OWNER_AMOUNT.size, "Token account slice")
+    return [(Pubkey(owner), amount) for owner, amount in _OWNER_AMOUNT.iter_unpack(joined)]
+
+_PUBKEY = (np.uint8, 32)
+MINT_DTYPE = np.dtype([
+    ("mint_authority_option", "<u4"),
+    ("mint_authority", _PUBKEY),
+    ("supply", "<u8"),
+    ("decimals", "u1"),
+    ("is_initialized", "?"),
+    ("freeze_authority_option", "<u4"),
+    ("freeze_authority", _PUBKEY)
+])
+TOKEN_ACCOUNT_DTYPE = np.dtype([
+    ("mint", _PUBKEY),
+    ("owner", _PUBKEY),
+    ("amount", "<u8"),
+    ("delegate_option", "<u4"),
+    ("delegate", _PUBKEY),
+    ("state", "u1"),
+    ("is_native_option", "<u4"),
+    ("is_native", "<u8"),
+    ("delegated_amount", "<u8"),
+    ("close_authority_option", "<u4"),
+    ("close_authority", _PUBKEY)
+])
+OWNER_AMOUNT_DTYPE = np.dtype([("owner", _PUBKEY), ("amount", "<u8")])
+
+def decode_array(buffers: Sequence[Buffer], dtype) -> "np.ndarray":
+    """
+    Decode fixed-size account records into a NumPy structured array in one vectorized
+    pass, e.g. decode_array(datas, TOKEN_ACCOUNT_DTYPE)["amount"].sum(). The records are
+    joined into one buffer first (one copy); the array is a view of that buffer. Pubkey
+    fields are (n, 32) uint8 views; convert only the rows you need with pubkey_at().
+    """
+    return np.frombuffer(_join(buffers, dtype.itemsize, "Encoded"), dtype=dtype)
+
+def pubkey_at(array: "np.ndarray", field: str, index: int) -> Pubkey:
+    return Pubkey(array[field][index].tobytes())
@@ -0,0 +1,87 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Sequence, Set
+
+from solders.pubkey import Pubkey
+
+from .rpc_router import RpcRouter
+from .spl_accounts import decode_mint
+
+# getMultipleAccounts accepts at most 100 accounts per call
+MAX_ACCOUNTS_PER_CALL = 100
+
+class TokenAccountCache:
+    """
+    What we have already learned about token accounts and mints, so transfers don't re-read it.
+
+    A mint's decimals are fixed when it is initialized and cached forever. Associated
+    token accounts seen to exist are kept in a bounded LRU, so repeat transfers to a
+    wallet skip the existence check. An owner can close a token account, so a caller
+    whose transfer fails calls forget() and the next attempt checks the chain again.
+    """
+
+    def __init__(self, router: RpcRouter, max_entries: int = 100_000):
+        self.router = router
+        self.max_entries = max_entries
+        self._existing: "OrderedDict[Pubkey, None]" = OrderedDict()
+        self._decimals: Dict[Pubkey, int] = {}
+        self.rpc_calls = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def missing(self, addresses: Sequence[Pubkey]) -> Set[Pubkey]:
+        """The accounts among `addresses` that do not exist; only unknown ones are fetched."""
+        unknown = []
+        for address in dict.fromkeys(addresses):
+            if address in self._existing:
+                self._existing.move_to_end(address)
+                self.hits += 1
+            else:
+                unknown.append(address)
+        self.misses += len(unknown)
+
+        async def fetch(chunk: List[Pubkey]) -> List[Pubkey]:
+            self.rpc_calls += 1
+            resp = await self.router.call(lambda client: client.get_multiple_accounts(chunk))
+            return [address for address, account in zip(chunk, resp.value) if account is not None]
+
+        chunks = await asyncio.gather(*(
+            fetch(unknown[start:start + MAX_ACCOUNTS_PER_CALL])
+            for start in range(0, len(unknown), MAX_ACCOUNTS_PER_CALL)
+        ))
+        existing = [address for chunk in chunks for address in chunk]
+        self.add(existing)
+        return set(unknown) - set(existing)
+
+    def add(self, addresses: Iterable[Pubkey]):
+        """Record accounts known to exist, e.g. once a transaction creating them is confirmed."""
+        for address in addresses:
+            self._existing[address] = None
+            self._existing.move_to_end(address)
+        while len(self._existing) > self.max_entries:
+            self._existing.popitem(last=False)
+
+    def forget(self, addresses: Iterable[Pubkey]):
+        for address in addresses:
+            self._existing.pop(address, None)
+
+    async def decimals(self, mint: Pubkey) -> int:
+        if mint not in self._decimals:
+            self.rpc_calls += 1
+            resp = await self.router.call(lambda client: client.get_account_info(mint))
+            if resp.value is None:
+                raise ValueError(f"Mint account not found: {mint}")
+            self._decimals[mint] = decode_mint(resp.value.data).decimals
+        return self._decimals[mint]
+
+    def stats(self) -> Dict:
+        return {"accounts": len(self._existing), "mints": len(self._decimals), "hits": self.hits, "misses": self.misses, "rpc_calls": self.rpc_calls}
+
+
+_caches: Dict[RpcRouter, TokenAccountCache] = {}
+
+def get_token_account_cache(router: RpcRouter) -> TokenAccountCache:
+    """Process-wide token account cache per router."""
+    if router not in _caches:
+        _caches[router] = TokenAccountCache(router)
+    return _caches[router]
@@ -0,0 +1,306 @@
+import asyncio
+import itertools
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from solana.rpc.commitment import Confirmed
+from solana.rpc.websocket_api import SubscriptionError, connect
+from solders.account_decoder import UiAccountEncoding
+from solders.commitment_config import CommitmentLevel
+from solders.errors import SerdeJSONError
+from solders.pubkey import Pubkey
+from solders.rpc.config import RpcAccountInfoConfig
+from solders.rpc.requests import AccountSubscribe, AccountUnsubscribe
+from solders.rpc.responses import AccountNotification, SubscriptionResult
+from spl.token.constants import TOKEN_PROGRAM_ID
+
+from ..config import Config
+from .cluster_cache import PROGRAM_IDS
+from .confirmation import to_ws_url
+from .derivation_cache import get_derivation_cache
+from .rpc_router import RpcRouter
+from .spl_accounts import MINT_LAYOUT_SIZE, TOKEN_ACCOUNT_LAYOUT_SIZE, decode_mint as decode_mint_account
+
+# getMultipleAccounts accepts at most 100 accounts per call: 50 mints with their metadata
+MINTS_PER_CALL = 50
+TOKEN_2022_PROGRAM_ID = PROGRAM_IDS["token_2022"]
+# Token-2022 accounts with extensions are padded past the token account layout to an account type byte
+TOKEN_2022_ACCOUNT_TYPE_MINT = 1
+
+def decode_mint(data: bytes) -> Dict:
+    """Decode an SPL Mint account into JSON-friendly fields."""
+    mint = decode_mint_account(data)
+    return {
+        "mint_authority": str(mint.mint_authority) if mint.mint_authority else None,
+        "supply": mint.supply,
+        "decimals": mint.decimals,
+        "is_initialized": mint.is_initialized,
+        "freeze_authority": str(mint.freeze_authority) if mint.freeze_authority else None
+    }
+
+def decode_metadata(data: bytes) -> Dict:
+    """Decode the name, symbol, uri and royalty of a Metaplex metadata account."""
+    # key (1) + update_authority (32) + mint (32)
+    offset = 65
+    strings = []
+    for _ in range(3):
+        (length,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        # Metaplex pads strings to a fixed length with NUL bytes
+        strings.append(bytes(data[offset:offset + length]).decode("utf-8", "replace").rstrip("\x00"))
+        offset += length
+    (seller_fee_basis_points,) = struct.unpack_from("<H", data, offset)
+    name, symbol, uri = strings
+    return {
+        "name": name,
+        "symbol": symbol,
+        "uri": uri,
+        "seller_fee_basis_points": seller_fee_basis_points,
+        "update_authority": str(Pubkey(bytes(data[1:33])))
+    }
+
+def is_mint_account(account) -> bool:
+    """Whether an account is laid out as an SPL Token or Token-2022 mint, judged by owner and size."""
+    data = account.data
+    if account.owner == TOKEN_PROGRAM_ID:
+        return len(data) == MINT_LAYOUT_SIZE
+    if account.owner == TOKEN_2022_PROGRAM_ID:
+        return len(data) == MINT_LAYOUT_SIZE or (
+            len(data) > TOKEN_ACCOUNT_LAYOUT_SIZE and data[TOKEN_ACCOUNT_LAYOUT_SIZE] == TOKEN_2022_ACCOUNT_TYPE_MINT
+        )
+    return False
+
+def decode_token_info(mint: Pubkey, mint_account, metadata_account) -> Optional[Dict]:
+    """Mint and metadata fields, or None if the address is not an initialized mint."""
+    if mint_account is None or not is_mint_account(mint_account):
+        return None
+    info = {"token_address": str(mint), **decode_mint(memoryview(mint_account.data))}
+    if not info["is_initialized"]:
+        return None
+    info["metadata"] = decode_metadata(memoryview(metadata_account.data)) if metadata_account is not None else None
+    return info
+
+@dataclass
+class _CacheEntry:
+    info: Optional[Dict]
+    fetched_at: float
+    # accountSubscribe ids for the mint and its metadata once the node has acknowledged them
+    subscription_ids: List[int] = field(default_factory=list)
+
+class TokenInfoCache:
+    """
+    Decoded mint and metadata per token, fetched in bulk and kept until the chain changes.
+
+    Misses are fetched with getMultipleAccounts, the mint and its metadata PDA for up to
+    50 tokens per call. Each cached token is watched with accountSubscribe on one shared
+    websocket and evicted when either account changes. Entries that are not (yet) watched,
+    for example because the websocket is down, expire after `ttl` seconds instead.
+    """
+
+    def __init__(self, ws_endpoint: str, router: RpcRouter, max_entries: int = 2000, ttl: float = 30.0):
+        self.ws_endpoint = ws_endpoint
+        self.router = router
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        # Bumped on every change notification, so a fetch racing a change is not cached
+        self._generations: Dict[str, int] = {}
+        self._ws = None
+        self._ws_failed_at: Optional[float] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+        self._request_ids = itertools.count(1)
+        self._by_request: Dict[int, str] = {}
+        self._by_subscription: Dict[int, str] = {}
+        # Subscriptions acknowledged while their token's fetch is still in flight
+        self._pending: Dict[str, List[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.rpc_calls = 0
+        self.invalidations = 0
+
+    def _fresh(self, entry: _CacheEntry) -> bool:
+        return bool(entry.subscription_ids) or time.monotonic() - entry.fetched_at < self.ttl
+
+    async def get_many(self, mints: Sequence[str]) -> Dict[str, Optional[Dict]]:
+        """Token info per mint address; None for addresses that are invalid or not mints."""
+        result: Dict[str, Optional[Dict]] = {}
+        missing: List[Pubkey] = []
+        for address in dict.fromkeys(mints):
+            entry = self._entries.get(address)
+            if entry is not None and self._fresh(entry):
+                self._entries.move_to_end(address)
+                self.hits += 1
+                result[address] = entry.info
+                continue
+            try:
+                missing.append(Pubkey.from_string(address))
+            except ValueError:
+                result[address] = None
+        if not missing:
+            return result
+
+        self.misses += len(missing)
+        for mint in missing:
+            self._pending.setdefault(str(mint), [])
+        await self._subscribe_all(missing)
+        chunks = await asyncio.gather(*(
+            self._fetch(missing[start:start + MINTS_PER_CALL])
+            for start in range(0, len(missing), MINTS_PER_CALL)
+        ))
+        for chunk in chunks:
+            result.update(chunk)
+        return result
+
+    async def get(self, mint: str) -> Optional[Dict]:
+        return (await self.get_many([mint]))[mint]
+
+    async def _fetch(self, mints: List[Pubkey]) -> Dict[str, Optional[Dict]]:
+        generations = {str(mint): self._generations.get(str(mint), 0) for mint in mints}
+        metadata = get_derivation_cache().metadata_addresses(mints)
+        accounts = [address for pair in zip(mints, metadata) for address in pair]
+        self.rpc_calls += 1
+        try:
+            resp = await self.router.call(lambda client: client.get_multiple_accounts(accounts, commitment=Confirmed))
+        except Exception:
+            for mint in mints:
+                self._unsubscribe(self._pending.pop(str(mint), []))
+            raise
+
+        fetched = {}
+        now = time.monotonic()
+        for i, mint in enumerate(mints):
+            address = str(mint)
+            info = decode_token_info(mint, resp.value[2 * i], resp.value[2 * i + 1])
+            fetched[address] = info
+            subscription_ids = self._pending.pop(address, [])
+            if self._generations.get(address, 0) != generations[address]:
+                # Changed while we were reading it; don't cache, the next read refetches
+                self._unsubscribe(subscription_ids)
+                continue
+            entry = self._entries.get(address)
+            if entry is None:
+                entry = self._entries[address] = _CacheEntry(info, now)
+            else:
+                entry.info, entry.fetched_at = info, now
+            entry.subscription_ids.extend(subscription_ids)
+            self._entries.move_to_end(address)
+        self._evict_overflow()
+        return fetched
+
+    def _unsubscribe(self, subscription_ids: List[int]):
+        for subscription_id in subscription_ids:
+            self._by_subscription.pop(subscription_id, None)
+            asyncio.ensure_future(self._send_unsubscribe(subscription_id))
+
+    def _evict_overflow(self):
+        while len(self._entries) > self.max_entries:
+            _, entry = self._entries.popitem(last=False)
+            self._unsubscribe(entry.subscription_ids)
+
+    def invalidate(self, mint: str):
+        self._generations[mint] = self._generations.get(mint, 0) + 1
+        entry = self._entries.pop(mint, None)
+        if entry is None:
+            return
+        self.invalidations += 1
+        self._unsubscribe(entry.subscription_ids)
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self._ws is not None and self._ws.open:
+                return
+            self._ws = await connect(self.ws_endpoint)
+            self._reader = asyncio.ensure_future(self._read_loop(self._ws))
+
+    async def _subscribe_all(self, mints: List[Pubkey]):
+        """Watch the mint and metadata accounts; subscribing before the fetch means no change is missed."""
+        # Don't retry a failed websocket on every miss; TTL expiry covers the gap
+        if self._ws_failed_at is not None and time.monotonic() - self._ws_failed_at < self.ttl:
+            return
+        try:
+            await self._ensure_connected()
+            config = RpcAccountInfoConfig(encoding=UiAccountEncoding.Base64, commitment=CommitmentLevel.Confirmed)
+            for mint, metadata in zip(mints, get_derivation_cache().metadata_addresses(mints)):
+                for account in (mint, metadata):
+                    request_id = next(self._request_ids)
+                    self._by_request[request_id] = str(mint)
+                    await self._ws.send_data(AccountSubscribe(account, config, request_id))
+        except Exception as e:
+            self._ws_failed_at = time.monotonic()
+            print(f"Account websocket unavailable, token info will expire after {self.ttl}s: {str(e)}")
+
+    async def _send_unsubscribe(self, subscription_id: int):
+        try:
+            await self._ws.send_data(AccountUnsubscribe(subscription_id, next(self._request_ids)))
+        except Exception:
+            pass
+
+    async def _read_loop(self, ws):
+        try:
+            while True:
+                try:
+                    messages = await ws.recv()
+                except SubscriptionError as e:
+                    self._by_request.pop(e.subscription.id, None)
+                    continue
+                except SerdeJSONError:
+                    # Unsubscribe acknowledgements ({"result": true}) don't parse; the frame is consumed
+                    continue
+                for message in messages:
+                    if isinstance(message, SubscriptionResult):
+                        mint = self._by_request.pop(message.id, None)
+                        if mint in self._pending:
+                            self._pending[mint].append(message.result)
+                        elif mint in self._entries:
+                            self._entries[mint].subscription_ids.append(message.result)
+                        else:
+                            # Evicted before the node acknowledged the subscription
+                            asyncio.ensure_future(self._send_unsubscribe(message.result))
+                            continue
+                        self._by_subscription[message.result] = mint
+                    elif isinstance(message, AccountNotification):
+                        mint = self._by_subscription.get(message.subscription)
+                        if mint is not None:
+                            self.invalidate(mint)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Account websocket closed: {str(e)}")
+            # Nothing is watched any more; fall back to the TTL from now on
+            now = time.monotonic()
+            for entry in self._entries.values():
+                if entry.subscription_ids:
+                    entry.subscription_ids = []
+                    entry.fetched_at = min(entry.fetched_at, now)
+            for subscription_ids in self._pending.values():
+                subscription_ids.clear()
+            self._by_request.clear()
+            self._by_subscription.clear()
+            if self._ws is ws:
+                self._ws = None
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+        if self._ws is not None:
+            await self._ws.close()
+        self._ws = None
+        self._reader = None
+
+
+_caches: Dict[str, TokenInfoCache] = {}
+
+def get_token_info_cache(rpc_endpoint: str, router: RpcRouter) -> TokenInfoCache:
+    """Process-wide token info cache per websocket endpoint."""
+    ws_endpoint = Config.SOLANA_WS_ENDPOINT or to_ws_url(rpc_endpoint)
+    if ws_endpoint not in _caches:
+        _caches[ws_endpoint] = TokenInfoCache(ws_endpoint, router)
+    return _caches[ws_endpoint]
+
+async def close_token_info_caches():
+    for cache in _caches.values():
+        await cache.close()
@@ -10,7 +10,8 @@ from spl.token.client import Token
 from spl.token.instructions import (
     initialize_mint, create_associated_token_account,
     mint_to, get_associated_token_address,
-    approve, revoke, set_authority
+    approve, revoke, set_authority,
+    SetAuthorityParams, AuthorityType
 )
 import base58
 import asyncio
@@ -38,7 +39,9 @@ class TokenSaleManager:
             initial_supply=config.initial_supply,
             creator_wallet=creator_wallet,
             features={"burnable": False, "mintable": False},  # Lock token features for Raydium compatibility
-            decimals=config.decimals
+            decimals=config.decimals,
+            # The payer keeps the mint authority so setup_raydium_pool can revoke it
+            keep_mint_authority=True
         )
         
         # Store sale configuration in database (to be implemented)
@@ -66,21 +69,21 @@ class TokenSaleManager:
         # 3. Add initial liquidity
         
         try:
-            # Revoke mint authority to make token immutable
-            token = Token(
-                self.solana_manager.client,
-                Pubkey.from_string(token_address),
-                TOKEN_PROGRAM_ID,
-                Keypair.from_secret_key(base58.b58decode(os.getenv("SOLANA_PAYER_KEY")))
+            # Revoke mint authority to make token immutable. Sale tokens are created with the
+            # payer as mint authority, so the payer can sign the revocation
+            payer = self.solana_manager._load_payer()
+            revoke_ix = set_authority(
+                SetAuthorityParams(
+                    program_id=TOKEN_PROGRAM_ID,
+                    account=Pubkey.from_string(token_address),
+                    authority=AuthorityType.MINT_TOKENS,
+                    current_authority=payer.pubkey(),
+                    new_authority=None  # New authority is None (revoked)
+                )
             )
             
-            await token.set_authority(
-                token_address,
-                None,  # New authority is None (revoked)
-                "MintTokens",
-                Pubkey.from_string(creator_wallet),
-                [Keypair.from_secret_key(base58.b58decode(os.getenv("SOLANA_PAYER_KEY")))]
-            )
+            # Signed with the manager's cached blockhash rather than a fresh fetch
+            await self.solana_manager.send_instructions([revoke_ix], [payer])
             
             # TODO: Implement actual Raydium pool creation
             # For now, return mock response
@@ -9,19 +9,51 @@ TREASURY_WALLET = os.getenv('NEXT_PUBLIC_TREASURY_WALLET')
 if not TREASURY_WALLET:
     raise ValueError("NEXT_PUBLIC_TREASURY_WALLET environment variable is not configured")
 
-from fastapi import FastAPI, HTTPException, Depends, Query
-from pydantic import BaseModel, validator, constr
-from typing import Optional, List
-from supabase import Client
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
+from pydantic import BaseModel, validator, constr, conlist
+from typing import Optional, List, Dict
+from postgrest.exceptions import APIError
 import base58
 from datetime import datetime
 from enum import Enum
 
-from .db.supabase import get_supabase
+from .db.postgrest import get_postgrest_pool
+from .db.repository import TokenRepository, get_token_repository
 from .integrations.solana import SolanaTokenManager
+from .integrations.rpc_pool import get_rpc_pool
+from .integrations.confirmation import close_confirmation_services
+from .integrations.signature_tracker import close_signature_trackers
+from .integrations.blockhash_cache import close_blockhash_caches
+from .integrations.token_info import close_token_info_caches
+from .integrations.derivation_cache import close_derivation_cache
+from .integrations import solana_manager
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared Solana RPC connections on startup and release them on shutdown"""
+    rpc_pool = get_rpc_pool()
+    await rpc_pool.start()
+    try:
+        await solana_manager.SolanaTokenManager().warm_up()
+    except Exception as e:
+        # Caches fill lazily on first use if the cluster is unreachable at startup
+        print(f"Failed to warm up Solana caches: {str(e)}")
+    try:
+        yield
+    finally:
+        await close_confirmation_services()
+        await close_signature_trackers()
+        await close_blockhash_caches()
+        await close_token_info_caches()
+        close_derivation_cache()
+        await rpc_pool.close()
+        await get_postgrest_pool().close()
+        if get_token_repository().cache is not None:
+            await get_token_repository().cache.close()
 
 # Create FastAPI app
-app = FastAPI(title="TokenX API")
+app = FastAPI(title="TokenX API", lifespan=lifespan)
 
 class TokenStatus(str, Enum):
     PENDING = "pending"
@@ -30,6 +62,16 @@ class TokenStatus(str, Enum):
     TRADING = "trading"
     FAILED = "failed"
 
+# Response header carrying the cursor of the next page of a list endpoint
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# HTTP status for errors raised by the contribute_to_token procedure, by SQLSTATE
+CONTRIBUTION_ERROR_STATUS = {
+    "P0002": 404,  # Token not found
+    "P0001": 400,  # Token is not in fundraising stage
+    "22023": 400   # Invalid amount
+}
+
 # Models
 class TokenCreate(BaseModel):
     name: constr(min_length=1, max_length=50)
@@ -93,6 +135,17 @@ class TokenResponse(BaseModel):
     created_at: str
     is_burnable: bool
     is_mintable: bool
+    onchain: Optional[Dict] = None
+
+class TokenBatchCreate(BaseModel):
+    tokens: conlist(TokenCreate, min_length=1, max_length=100)
+
+class TokenBatchItemResponse(BaseModel):
+    index: int
+    status: str  # "success" or "failed"
+    token: Optional[TokenResponse] = None
+    token_address: Optional[str] = None  # Set on failures where the mint exists on chain but wasn't stored
+    error: Optional[str] = None
 
 class ContributionResponse(BaseModel):
     id: int
@@ -104,9 +157,27 @@ class ContributionResponse(BaseModel):
     transaction_hash: Optional[str]
     created_at: str
 
+def token_record(token_data: TokenCreate, token_address: str) -> dict:
+    """Row for the tokens table from a creation request and its on-chain address"""
+    return {
+        "token_address": token_address,
+        "name": token_data.name,
+        "symbol": token_data.symbol,
+        "description": token_data.description,
+        "initial_supply": token_data.initial_supply,
+        "target_raise": token_data.target_raise,
+        "price_per_token": token_data.price_per_token,
+        "creator_wallet": token_data.creator_wallet,
+        "treasury_wallet": TREASURY_WALLET,
+        "is_burnable": token_data.features["burnable"],
+        "is_mintable": token_data.features["mintable"],
+        "status": TokenStatus.PENDING.value,
+        "amount_raised": 0
+    }
+
 # Token Management Endpoints
 @app.post("/api/tokens")
-async def create_token(token_data: TokenCreate, supabase: Client = Depends(get_supabase)):
+async def create_token(token_data: TokenCreate, db: TokenRepository = Depends(get_token_repository)):
     """Create a new token"""
     try:
         solana = SolanaTokenManager()
@@ -118,126 +189,175 @@ async def create_token(token_data: TokenCreate, supabase: Client = Depends(get_s
             features=token_data.features
         )
 
-        token_data_dict = {
-            "token_address": token_result["token_address"],
-            "name": token_data.name,
-            "symbol": token_data.symbol,
-            "description": token_data.description,
-            "initial_supply": token_data.initial_supply,
-            "target_raise": token_data.target_raise,
-            "price_per_token": token_data.price_per_token,
-            "creator_wallet": token_data.creator_wallet,
-            "treasury_wallet": TREASURY_WALLET,
-            "is_burnable": token_data.features["burnable"],
-            "is_mintable": token_data.features["mintable"],
-            "status": TokenStatus.PENDING.value,
-            "amount_raised": 0
-        }
-        
-        result = supabase.table("tokens").insert(token_data_dict).execute()
-        if len(result.data) == 0:
+        token_data_dict = token_record(token_data, token_result["token_address"])
+
+        rows = await db.insert_tokens([token_data_dict])
+        if len(rows) == 0:
             raise HTTPException(status_code=500, detail="Failed to create token record")
             
-        return TokenResponse(**result.data[0])
+        return TokenResponse(**rows[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/tokens/batch")
+async def create_tokens_batch(batch: TokenBatchCreate, db: TokenRepository = Depends(get_token_repository)):
+    """Create up to 100 tokens in one call, reporting success or failure per token"""
+    try:
+        results: List[Optional[TokenBatchItemResponse]] = [None] * len(batch.tokens)
+
+        # Symbols are unique, so reject taken or repeated ones before minting anything
+        symbols = [token.symbol for token in batch.tokens]
+        taken = await db.existing_symbols(symbols)
+        to_create = []
+        for index, token in enumerate(batch.tokens):
+            if token.symbol in taken:
+                results[index] = TokenBatchItemResponse(index=index, status="failed", error=f"Symbol {token.symbol} already exists")
+            else:
+                taken.add(token.symbol)
+                to_create.append(index)
+
+        solana = solana_manager.SolanaTokenManager()
+        chain_results = await solana.create_tokens_batch([
+            {
+                "name": batch.tokens[index].name,
+                "symbol": batch.tokens[index].symbol,
+                "initial_supply": batch.tokens[index].initial_supply,
+                "creator_wallet": batch.tokens[index].creator_wallet,
+                "features": batch.tokens[index].features
+            }
+            for index in to_create
+        ])
+
+        rows, row_indexes = [], []
+        for index, chain_result in zip(to_create, chain_results):
+            if chain_result["status"] != "success":
+                results[index] = TokenBatchItemResponse(index=index, status="failed", error=chain_result["error"])
+                continue
+            rows.append(token_record(batch.tokens[index], chain_result["token"]["token_address"]))
+            row_indexes.append(index)
+
+        # One insert for every token that landed on chain
+        if rows:
+            try:
+                inserted, insert_error = await db.insert_tokens(rows), "Token record missing from insert result"
+            except Exception as e:
+                inserted, insert_error = [], str(e)
+            stored = {row["token_address"]: row for row in inserted}
+            for index, row in zip(row_indexes, rows):
+                if row["token_address"] in stored:
+                    results[index] = TokenBatchItemResponse(index=index, status="success", token=TokenResponse(**stored[row["token_address"]]))
+                    continue
+                # The mint exists on chain; report its address so the record can be restored
+                print(f"Token {row['symbol']} minted at {row['token_address']} but not stored: {insert_error}")
+                results[index] = TokenBatchItemResponse(
+                    index=index,
+                    status="failed",
+                    token_address=row["token_address"],
+                    error=f"Token was created on chain but its record was not stored: {insert_error}"
+                )
+
+        return results
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/tokens")
 async def list_tokens(
-    supabase: Client = Depends(get_supabase),
+    response: Response,
+    db: TokenRepository = Depends(get_token_repository),
     status: Optional[TokenStatus] = None,
     creator_wallet: Optional[str] = None,
     page: int = Query(1, gt=0),
-    limit: int = Query(10, gt=0, le=100)
+    limit: int = Query(10, gt=0, le=100),
+    cursor: Optional[str] = None,
+    onchain: bool = False
 ):
-    """List tokens with optional filters"""
-    query = supabase.table("tokens").select("*")
-    
-    if status:
-        query = query.eq("status", status)
-    if creator_wallet:
-        query = query.eq("creator_wallet", creator_wallet)
-        
-    start = (page - 1) * limit
-    result = query.order("created_at", desc=True).range(start, start + limit - 1).execute()
-    return [TokenResponse(**token) for token in result.data]
+    """
+    List tokens newest first with optional filters; `onchain` adds live supply and metadata from the chain.
+
+    Pass the X-Next-Cursor header of one page as `cursor` to get the next; `page` still
+    works but gets slower the deeper it goes.
+    """
+    try:
+        rows, next_cursor = await db.list_tokens(
+            status=status.value if status else None,
+            creator_wallet=creator_wallet,
+            page=page,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    tokens = [TokenResponse(**token) for token in rows]
+    if onchain:
+        addresses = [token.token_address for token in tokens if token.token_address]
+        try:
+            infos = await solana_manager.SolanaTokenManager().get_token_infos(addresses) if addresses else {}
+        except Exception as e:
+            print(f"Error fetching on-chain token info: {str(e)}")
+            infos = {}
+        for token in tokens:
+            token.onchain = infos.get(token.token_address)
+    return tokens
 
 @app.get("/api/tokens/{token_id}")
-async def get_token(token_id: int, supabase: Client = Depends(get_supabase)):
+async def get_token(token_id: int, db: TokenRepository = Depends(get_token_repository)):
     """Get token details by ID"""
-    result = supabase.table("tokens").select("*").eq("id", token_id).execute()
-    if len(result.data) == 0:
+    token = await db.get_token(token_id)
+    if token is None:
         raise HTTPException(status_code=404, detail="Token not found")
-    return TokenResponse(**result.data[0])
+    return TokenResponse(**token)
 
 @app.post("/api/tokens/{token_id}/contribute")
 async def contribute_to_token(
     token_id: int,
     contribution: ContributionCreate,
-    supabase: Client = Depends(get_supabase)
+    db: TokenRepository = Depends(get_token_repository)
 ):
     """Contribute USDC to a token's fundraising round"""
+    # One call to the contribute_to_token procedure: it checks the status, records the
+    # contribution and adds the amount to one of the token's amount_raised shards
     try:
-        # Get token details
-        token_result = supabase.table("tokens").select("*").eq("id", token_id).execute()
-        if len(token_result.data) == 0:
-            raise HTTPException(status_code=404, detail="Token not found")
-        
-        token = token_result.data[0]
-        if token["status"] != TokenStatus.FUNDRAISING.value:
-            raise HTTPException(status_code=400, detail="Token is not in fundraising stage")
-            
-        # Calculate token amount
-        token_amount = contribution.amount / token["price_per_token"]
-        
-        # Create contribution record
-        contribution_data = {
-            "token_id": token_id,
-            "contributor_wallet": contribution.wallet_address,
-            "amount": contribution.amount,
-            "token_amount": token_amount,
-            "status": "pending"
-        }
-        
-        contribution_result = supabase.table("contributions").insert(contribution_data).execute()
-        if len(contribution_result.data) == 0:
-            raise HTTPException(status_code=500, detail="Failed to record contribution")
-            
-        # Update token's amount raised
-        new_amount_raised = token["amount_raised"] + contribution.amount
-        supabase.table("tokens").update({
-            "amount_raised": new_amount_raised,
-            "status": TokenStatus.COMPLETED.value if new_amount_raised >= token["target_raise"] else TokenStatus.FUNDRAISING.value
-        }).eq("id", token_id).execute()
-        
-        return ContributionResponse(**contribution_result.data[0])
+        result = await db.contribute(token_id, contribution.wallet_address, contribution.amount)
+    except APIError as e:
+        raise HTTPException(status_code=CONTRIBUTION_ERROR_STATUS.get(e.code, 500), detail=e.message)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return ContributionResponse(**result["contribution"])
 
 @app.get("/api/tokens/{token_id}/contributions")
 async def get_token_contributions(
     token_id: int,
-    supabase: Client = Depends(get_supabase),
+    response: Response,
+    db: TokenRepository = Depends(get_token_repository),
     page: int = Query(1, gt=0),
-    limit: int = Query(10, gt=0, le=100)
+    limit: int = Query(10, gt=0, le=100),
+    cursor: Optional[str] = None
 ):
-    """Get list of contributions for a token"""
-    start = (page - 1) * limit
-    result = supabase.table("contributions").select("*").eq("token_id", token_id).range(start, start + limit - 1).execute()
-    return [ContributionResponse(**contribution) for contribution in result.data]
+    """Get contributions for a token, newest first; paginate with `cursor` as in list_tokens"""
+    try:
+        rows, next_cursor = await db.list_contributions(token_id, page=page, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [ContributionResponse(**contribution) for contribution in rows]
 
 @app.patch("/api/tokens/{token_id}/status")
 async def update_token_status(
     token_id: int,
     status: TokenStatus,
-    supabase: Client = Depends(get_supabase)
+    db: TokenRepository = Depends(get_token_repository)
 ):
     """Update token status (admin only)"""
     try:
-        result = supabase.table("tokens").update({"status": status}).eq("id", token_id).execute()
-        if len(result.data) == 0:
+        token = await db.update_token_status(token_id, status.value)
+        if token is None:
             raise HTTPException(status_code=404, detail="Token not found")
-        return TokenResponse(**result.data[0])
+        return TokenResponse(**token)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
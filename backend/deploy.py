@@ -13,6 +13,7 @@ import jwt
 from jwt import PyJWKClient
 from jwt.exceptions import InvalidTokenError
 from supabase import Client, create_client
+from postgrest.exceptions import APIError
 import ssl
 import uuid
 from app.integrations.solana import SolanaTokenManager
@@ -52,12 +53,13 @@ base_image = (modal.Image.debian_slim()
         "python-dotenv==1.0.0",
         "solders>=0.19.0",
         "solana>=0.30.2",
+        "numpy==1.26.4",
         "anchorpy>=0.18.0",
         "coinbase-advanced-py",
         "supabase==1.0.3",
         "pytest==7.4.3",
         "pytest-asyncio==0.23.5",
-        "httpx<0.24.1",
+        "httpx[http2]<0.24.1",
         "python-jose[cryptography]==3.3.0",
         "base58==2.1.1",
         "PyJWT[crypto]>=2.8.0",  # Add JWT support
@@ -231,7 +233,8 @@ async def list_tokens(request: Request) -> List[Dict]:
     limit = int(params.get("limit", 10))
     
     supabase = get_supabase()
-    query = supabase.table("tokens").select("*")
+    # tokens_live adds the contributions still in amount_raised shards
+    query = supabase.table("tokens_live").select("*")
     
     if status:
         query = query.eq("status", status)
@@ -240,6 +243,8 @@ async def list_tokens(request: Request) -> List[Dict]:
         
     start = (page - 1) * limit
     result = query.order("created_at", desc=True).range(start, start + limit - 1).execute()
+    for row in result.data:
+        row["amount_raised"] = row.pop("live_amount_raised")
     return result.data
 
 @app.function(
@@ -258,10 +263,12 @@ async def get_token(request: Request) -> Dict:
         raise HTTPException(status_code=400, detail="Missing token_id parameter")
     
     supabase = get_supabase()
-    result = supabase.table("tokens").select("*").eq("id", token_id).execute()
+    result = supabase.table("tokens_live").select("*").eq("id", token_id).execute()
     if not result.data:
         raise HTTPException(status_code=404, detail="Token not found")
-    return result.data[0]
+    token = result.data[0]
+    token["amount_raised"] = token.pop("live_amount_raised")
+    return token
 
 @app.function(
     image=image,
@@ -279,40 +286,22 @@ def contribute_to_token(
         raise ValueError("Invalid amount")
 
     supabase = get_supabase()
-    
-    # Get token details
-    token_result = supabase.table("tokens").select("*").eq("id", token_id).execute()
-    if not token_result.data:
-        raise ValueError("Token not found")
-    
-    token = token_result.data[0]
-    if token["status"] != TokenStatus.FUNDRAISING.value:
-        raise ValueError("Token is not in fundraising stage")
-        
-    # Calculate token amount
-    token_amount = amount / token["price_per_token"]
-    
-    # Create contribution record
-    contribution_data = {
-        "token_id": token_id,
-        "contributor_wallet": wallet_address,
-        "amount": amount,
-        "token_amount": token_amount,
-        "status": "pending"
-    }
-    
-    contribution_result = supabase.table("contributions").insert(contribution_data).execute()
-    if not contribution_result.data:
+
+    # Status check, contribution insert and sharded amount_raised increment in one atomic call
+    try:
+        result = supabase.rpc("contribute_to_token", {
+            "token_id_param": token_id,
+            "contributor_wallet_param": wallet_address,
+            "amount_param": amount
+        }).execute()
+    except APIError as e:
+        raise ValueError(e.message)
+    if not result.data:
         raise ValueError("Failed to record contribution")
-        
-    # Update token's amount raised
-    new_amount_raised = token["amount_raised"] + amount
-    new_status = TokenStatus.COMPLETED.value if new_amount_raised >= token["target_raise"] else TokenStatus.FUNDRAISING.value
-    
-    supabase.table("tokens").update({
-        "amount_raised": new_amount_raised,
-        "status": new_status
-    }).eq("id", token_id).execute()
+
+    contribution = result.data[0]["contribution"]
+    token = result.data[0]["token"]
+    new_status = token["status"]
 
     # If funding target is reached, automatically create Uniswap pool and update status
     if new_status == TokenStatus.COMPLETED.value:
@@ -384,7 +373,7 @@ def contribute_to_token(
             # Don't raise the error - we still want to return the contribution result
             # Just log it and keep the status as COMPLETED
 
-    return contribution_result.data[0]
+    return contribution
 
 @app.function(
     image=image,
@@ -416,6 +405,33 @@ def update_token_status(token_id: int, status: str) -> Dict:
         raise ValueError("Token not found")
     return result.data[0]
 
+@app.function(
+    image=image,
+    secrets=[modal.Secret.from_name("tokenx-secrets")],
+    schedule=modal.Period(minutes=15),
+    timeout=900
+)
+async def index_token_holders(limit: int = 20) -> List[Dict]:
+    """Sync token_holders with on-chain balances for the least recently indexed tokens"""
+    from app.integrations import solana_manager
+    from app.integrations.holder_indexer import HolderIndexer
+
+    indexer = HolderIndexer(solana_manager.SolanaTokenManager().router, get_supabase())
+    return await indexer.index_due(limit)
+
+@app.function(
+    image=image,
+    secrets=[modal.Secret.from_name("tokenx-secrets")],
+    schedule=modal.Period(minutes=1)
+)
+async def fold_amount_raised() -> Dict[str, List[Dict]]:
+    """Fold sharded contribution counters into tokens.amount_raised and settle ended raises"""
+    from app.db.repository import get_token_repository
+
+    result = await get_token_repository().settle_raises()
+    print(f"Folded amount_raised for {len(result['folded'])} tokens, settled {len(result['settled'])} raises")
+    return result
+
 @app.function(image=image)
 @modal.web_endpoint()
 def api():
@@ -0,0 +1,161 @@
+"""
+Benchmark concurrent API throughput with the old synchronous supabase client against
+the async PostgREST repository, with and without the token read cache.
+
+Both variants serve get_token and list_tokens in process over ASGI against the local
+fake PostgREST server (run as a separate process), with a fixed per-query latency
+standing in for the database.
+The sync client blocks the event loop for every query, so concurrent requests run
+one at a time; the async repository overlaps them. Also reports the longest stall
+of the event loop seen during each run.
+
+    python scripts/benchmark_data_layer.py --count 500 --concurrency 50 --latency 0.02
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable
+
+import httpx
+from fastapi import FastAPI, HTTPException, Query
+
+# Add backend root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.benchmark_solana_manager import run
+
+# supabase.create_client only accepts keys shaped like a JWT
+API_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.benchmark"
+
+def configure(url: str):
+    """Point the app at the fake server; must run before anything imports app.config."""
+    os.environ.update({
+        "SUPABASE_URL": url,
+        "SUPABASE_KEY": API_KEY,
+        "NEXT_PUBLIC_TREASURY_WALLET": "11111111111111111111111111111111"
+    })
+
+def legacy_app(url: str) -> FastAPI:
+    """The token read endpoints as they were: async handlers calling the sync client."""
+    from supabase import create_client
+
+    supabase = create_client(url, API_KEY)
+    app = FastAPI()
+
+    @app.get("/api/tokens/{token_id}")
+    async def get_token(token_id: int):
+        result = supabase.table("tokens").select("*").eq("id", token_id).execute()
+        if len(result.data) == 0:
+            raise HTTPException(status_code=404, detail="Token not found")
+        return result.data[0]
+
+    @app.get("/api/tokens")
+    async def list_tokens(page: int = Query(1, gt=0), limit: int = Query(10, gt=0, le=100)):
+        start = (page - 1) * limit
+        return supabase.table("tokens").select("*").order("created_at", desc=True).range(start, start + limit).execute().data
+
+    return app
+
+def start_server(args) -> subprocess.Popen:
+    """Run the fake server in its own process, as the database would be, and wait for it."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([
+        sys.executable, os.path.join(os.path.dirname(__file__), "fake_postgrest_server.py"),
+        "--port", str(port),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--tokens", str(args.tokens),
+        "--seed", str(args.seed)
+    ], stdout=subprocess.DEVNULL)
+    process.url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            httpx.get(f"{process.url}/rest/v1/tokens", params={"limit": 1})
+            return process
+        except httpx.TransportError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                raise Exception("Fake PostgREST server did not start")
+            time.sleep(0.1)
+
+async def with_stall_monitor(op: Callable[[], Awaitable]) -> float:
+    """Run `op` while measuring the longest the event loop went without running a 1ms timer."""
+    worst = 0.0
+    done = asyncio.Event()
+
+    async def monitor():
+        nonlocal worst
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            worst = max(worst, time.perf_counter() - start - 0.001)
+
+    task = asyncio.ensure_future(monitor())
+    try:
+        await op()
+    finally:
+        done.set()
+        await task
+    return worst
+
+async def main(args):
+    server = start_server(args)
+    url = server.url
+    configure(url)
+
+    from app import main as api
+    from app.db.cache import get_token_cache
+    from app.db.postgrest import get_postgrest_pool
+    from app.db.repository import TokenRepository, get_token_repository
+
+    uncached = TokenRepository(get_postgrest_pool())
+    cached = TokenRepository(get_postgrest_pool(), get_token_cache())
+    print(f"Fake PostgREST at {url}: latency {args.latency}s, jitter {args.jitter}s\n")
+    try:
+        for label, app, repository in (
+            ("sync client", legacy_app(url), None),
+            ("async repository", api.app, uncached),
+            ("async + cache", api.app, cached)
+        ):
+            if repository is not None:
+                api.app.dependency_overrides[get_token_repository] = lambda: repository
+            async with httpx.AsyncClient(app=app, base_url="http://benchmark") as client:
+                async def get_token(index: int):
+                    resp = await client.get(f"/api/tokens/{index % args.tokens + 1}")
+                    resp.raise_for_status()
+
+                async def list_tokens(index: int):
+                    resp = await client.get("/api/tokens", params={"page": index % 5 + 1, "limit": 20})
+                    resp.raise_for_status()
+
+                # One unmeasured pass over every token and page: connections are open and,
+                # with the cache, the runs below measure the steady state
+                for index in range(max(args.tokens, 5)):
+                    await get_token(index)
+                    await list_tokens(index)
+
+                for name, op in (("get_token", get_token), ("list_tokens", list_tokens)):
+                    stall = await with_stall_monitor(lambda: run(f"{label}: {name}", args.count, args.concurrency, op))
+                    print(f"{'':<28} longest event loop stall {stall * 1000:.1f} ms")
+        print(f"\nToken cache: {get_token_cache().stats()}")
+    finally:
+        await get_postgrest_pool().close()
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sync supabase client against the async repository")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,192 @@
+"""
+Benchmark SolanaTokenManager against the local fake RPC server instead of devnet.
+
+Drives create_token, confirmation (websocket and batched status polling) and token
+distribution, reporting ops/s and p50/p99 latency for each. Injected latency, errors,
+429s and dropped sends are reproducible through --seed.
+
+    python scripts/benchmark_solana_manager.py --count 200 --concurrency 32 --latency 0.01 --drop-rate 0.1
+"""
+import argparse
+import asyncio
+import os
+import struct
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, List
+
+import base58
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.system_program import TransferParams, transfer
+
+# Add backend root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.fake_rpc_server import FakeRpcConfig, FakeRpcServer
+
+TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+def configure(url: str, payer: Keypair, checkpoint_dir: str):
+    """Point the app at the fake server; must run before anything imports app.config."""
+    for name in ("QUICKNODE_RPC_ENDPOINT", "SOLANA_RPC_ENDPOINTS", "SOLANA_WS_ENDPOINT", "SOLANA_SEND_ENDPOINT", "SOLANA_FEE_PAYER_KEYS"):
+        os.environ.pop(name, None)
+    os.environ.update({
+        "SOLANA_NETWORK": "localnet",
+        "SOLANA_LOCALNET_URL": url,
+        "SOLANA_PAYER_KEY": base58.b58encode(bytes(payer)).decode(),
+        "DISTRIBUTION_CHECKPOINT_DIR": checkpoint_dir,
+        "SOLANA_NONCE_POOL_FILE": os.path.join(checkpoint_dir, "nonce_accounts.json"),
+        # One local endpoint: no hedging, and the client-side rate limit is not what we measure
+        "SOLANA_RPC_HEDGE": "false",
+        "SOLANA_RPC_RATE_LIMIT": os.environ.get("SOLANA_RPC_RATE_LIMIT", "100000"),
+        "SOLANA_RPC_BURST": os.environ.get("SOLANA_RPC_BURST", "100000")
+    })
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+async def run(name: str, count: int, concurrency: int, op: Callable[[int], Awaitable]):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(index: int):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await op(index)
+            except Exception as e:
+                failures += 1
+                if failures <= 3:
+                    print(f"  {name} failed: {str(e)}")
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(count)))
+    elapsed = time.perf_counter() - start
+    if latencies:
+        print(
+            f"{name:<28} {len(latencies) / elapsed:9.1f} ops/s  "
+            f"p50 {percentile(latencies, 50) * 1000:8.1f} ms  p99 {percentile(latencies, 99) * 1000:8.1f} ms  "
+            f"failed {failures}"
+        )
+    else:
+        print(f"{name:<28} all {failures} operations failed")
+
+async def main(args):
+    server = FakeRpcServer(FakeRpcConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        drop_rate=args.drop_rate,
+        slot_time=args.slot_time,
+        seed=args.seed
+    ))
+    url = await server.start()
+    payer = Keypair()
+    checkpoint_dir = tempfile.mkdtemp(prefix="benchmark_")
+    configure(url, payer, checkpoint_dir)
+
+    from app.integrations.blockhash_cache import close_blockhash_caches
+    from app.integrations.confirmation import close_confirmation_services
+    from app.integrations.rpc_pool import get_rpc_pool
+    from app.integrations.signature_tracker import close_signature_trackers
+    from app.integrations.solana_manager import SolanaTokenManager
+
+    await get_rpc_pool().start()
+    manager = SolanaTokenManager()
+    await manager.warm_up()
+    # Tokens are created for someone other than the payer; transfers are sent from the payer
+    creator = str(Keypair().pubkey())
+    print(f"Fake RPC at {url}: latency {args.latency}s, errors {args.error_rate}, 429s {args.rate_limit_rate}, drops {args.drop_rate}\n")
+
+    try:
+        await run(
+            "create_token",
+            args.count,
+            args.concurrency,
+            lambda i: manager.create_token(f"Bench {i}", f"B{i}", 1_000_000, creator, {}, decimals=6)
+        )
+
+        async def send_transfer() -> tuple:
+            ix = transfer(TransferParams(from_pubkey=payer.pubkey(), to_pubkey=Pubkey.new_unique(), lamports=1))
+            tx, last_valid_block_height = await manager.sign_instructions([ix], [payer])
+            await manager.send_transaction(tx, last_valid_block_height)
+            return tx, last_valid_block_height
+
+        async def confirm_websocket(_):
+            tx, last_valid_block_height = await send_transfer()
+            # Rebroadcast around the websocket confirmation, as create_token does
+            confirmation = manager._confirm_transaction(tx.signatures[0], last_valid_block_height=last_valid_block_height)
+            await manager.rebroadcaster.rebroadcast(tx, confirmation)
+
+        async def confirm_polling(_):
+            tx, last_valid_block_height = await send_transfer()
+            await manager.confirm_sent(tx, last_valid_block_height, timeout=30.0)
+
+        await run("send + confirm (websocket)", args.count, args.concurrency, confirm_websocket)
+        await run("send + confirm (polling)", args.count, args.concurrency, confirm_polling)
+
+        def add_mint() -> str:
+            mint = Pubkey.new_unique()
+            server.state.add_account(str(mint), struct.pack("<I32sQB?I32s", 0, bytes(32), 0, 6, True, 0, bytes(32)), TOKEN_PROGRAM)
+            return str(mint)
+
+        # Repeat recipients, as in payouts: after the first round their accounts are known to exist
+        transfer_mint = add_mint()
+        recipients = [str(Pubkey.new_unique()) for _ in range(max(1, args.count // 4))]
+        await run(
+            "transfer_token",
+            args.count,
+            args.concurrency,
+            lambda i: manager.transfer_token(transfer_mint, str(payer.pubkey()), recipients[i % len(recipients)], 1)
+        )
+
+        async def transfer_batch(_):
+            transfers = [{"wallet_address": str(Pubkey.new_unique()), "amount": 1} for _ in range(args.recipients)]
+            results = await manager.transfer_tokens_batch(transfer_mint, str(payer.pubkey()), transfers)
+            failed = [result for result in results if result["status"] != "transferred"]
+            if failed:
+                raise Exception(f"{len(failed)} transfers failed")
+
+        await run(f"transfer_tokens_batch ({args.recipients})", args.distributions, max(1, args.concurrency // 8), transfer_batch)
+
+        async def distribute(_):
+            mint = add_mint()
+            distributions = [{"wallet_address": str(Pubkey.new_unique()), "amount": 1000} for _ in range(args.recipients)]
+            result = await manager.distribute_tokens(mint, mint, distributions, use_lookup_tables=False)
+            if result.get("failed"):
+                raise Exception(f"{len(result['failed'])} transfers failed")
+
+        await run(f"distribute ({args.recipients} wallets)", args.distributions, max(1, args.concurrency // 8), distribute)
+    finally:
+        await close_confirmation_services()
+        await close_signature_trackers()
+        await close_blockhash_caches()
+        await get_rpc_pool().close()
+        await server.stop()
+
+    print(f"\nRebroadcast: {manager.rebroadcaster.stats()}")
+    print(f"Token accounts: {manager.token_accounts.stats()}")
+    print(f"Server: {server.state.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SolanaTokenManager against a fake RPC server")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--distributions", type=int, default=10)
+    parser.add_argument("--recipients", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--slot-time", type=float, default=0.4)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+import os
+import struct
+import sys
+import time
+
+from solders.pubkey import Pubkey
+
+# Add backend root to Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.integrations.spl_accounts import (
+    OWNER_AMOUNT_DTYPE,
+    TOKEN_ACCOUNT_DTYPE,
+    decode_array,
+    decode_owner_amounts,
+    decode_token_account,
+    decode_token_accounts
+)
+
+def make_token_accounts(count: int):
+    mint = os.urandom(32)
+    return [
+        struct.pack("<32s32sQI32sBIQQI32s", mint, os.urandom(32), i, 0, bytes(32), 1, 0, 0, 0, 0, bytes(32))
+        for i in range(count)
+    ]
+
+def parse_per_account(data: bytes):
+    """Ad-hoc slicing, one account at a time: the baseline."""
+    return {
+        "mint": Pubkey(data[0:32]),
+        "owner": Pubkey(data[32:64]),
+        "amount": int.from_bytes(data[64:72], "little"),
+        "delegate": Pubkey(data[76:108]) if int.from_bytes(data[72:76], "little") else None,
+        "state": data[108],
+        "is_native": int.from_bytes(data[113:121], "little") if int.from_bytes(data[109:113], "little") else None,
+        "delegated_amount": int.from_bytes(data[121:129], "little"),
+        "close_authority": Pubkey(data[133:165]) if int.from_bytes(data[129:133], "little") else None
+    }
+
+def bench(name: str, fn, count: int, repeat: int = 5):
+    best = min(_time(fn) for _ in range(repeat))
+    print(f"{name:<40} {best * 1000:9.2f} ms  {count / best:>12,.0f} accounts/s")
+    return best
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main(count: int = 100_000):
+    accounts = make_token_accounts(count)
+    slices = [data[32:72] for data in accounts]
+    print(f"Decoding {count:,} token accounts\n")
+
+    baseline = bench("per-account slicing", lambda: [parse_per_account(data) for data in accounts], count)
+    bench("decode_token_account (memoryview)", lambda: [decode_token_account(memoryview(data)) for data in accounts], count)
+    bench("decode_token_accounts (one pass)", lambda: decode_token_accounts(accounts), count)
+    bench("decode_owner_amounts (40-byte slice)", lambda: decode_owner_amounts(slices), count)
+    vectorized = bench("numpy TOKEN_ACCOUNT_DTYPE", lambda: decode_array(accounts, TOKEN_ACCOUNT_DTYPE), count)
+    bench("numpy OWNER_AMOUNT_DTYPE", lambda: decode_array(slices, OWNER_AMOUNT_DTYPE), count)
+    bench("numpy total supply held", lambda: int(decode_array(accounts, TOKEN_ACCOUNT_DTYPE)["amount"].sum()), count)
+    print(f"\nVectorized decode is {baseline / vectorized:.0f}x faster than per-account slicing")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
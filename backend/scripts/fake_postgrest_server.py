@@ -0,0 +1,362 @@
+"""
+Local stand-in for the Supabase REST API (PostgREST), for API tests and benchmarks.
+
+Keeps the tokens and contributions tables and the amount_raised shards in memory and
+implements the subset of PostgREST the backend uses: select with eq/neq/in/gt/gte/lt/
+lte/is filters and or/and groups, order, limit/offset and Range headers, insert and
+update returning the rows, the tokens_live view, and the contribute_to_token,
+fold_amount_raised and settle_fundraising procedures. Every request can be delayed to stand in for query time.
+
+Run standalone:
+    python scripts/fake_postgrest_server.py --port 54321 --latency 0.02
+"""
+import argparse
+import asyncio
+import itertools
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Query parameters that are not column filters
+RESERVED_PARAMS = {"select", "order", "limit", "offset"}
+# Procedures served under /rpc, by name
+RPC_FUNCTIONS = {"contribute_to_token", "fold_amount_raised", "settle_fundraising"}
+
+@dataclass
+class FakePostgrestConfig:
+    # Seconds added to every request, plus up to `jitter` more
+    latency: float = 0.0
+    jitter: float = 0.0
+    seed: int = 0
+
+class PostgrestError(Exception):
+    def __init__(self, code: str, message: str, status: int = 400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+    def response(self) -> JSONResponse:
+        return JSONResponse({"code": self.code, "message": self.message, "details": None, "hint": None}, status_code=self.status)
+
+def _coerce(value: Any, text: str) -> Any:
+    """A filter argument as the type of the column value it is compared with."""
+    if text == "null":
+        return None
+    if isinstance(value, bool):
+        return text == "true"
+    if isinstance(value, (int, float)):
+        return float(text)
+    return text
+
+def _split_list(text: str) -> List[str]:
+    return [item.strip('"') for item in _split_terms(text[1:-1] if text.startswith("(") else text)]
+
+def _split_terms(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes."""
+    terms, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in "()":
+            depth += 1 if char == "(" else -1
+        elif not quoted and depth == 0 and char == ",":
+            terms.append(current)
+            current = ""
+            continue
+        current += char
+    if current:
+        terms.append(current)
+    return terms
+
+def _logic(op: str, text: str) -> Callable[[Dict], bool]:
+    """or=(a.lt.1,and(b.eq.2,c.gt.3)) style conditions."""
+    checks = []
+    for term in _split_terms(text[1:-1]):
+        if term.startswith(("and(", "or(")):
+            name, _, rest = term.partition("(")
+            checks.append(_logic(name, "(" + rest))
+        else:
+            column, _, expression = term.partition(".")
+            checks.append(_filter(column, expression))
+    combine = any if op == "or" else all
+    return lambda row: combine(check(row) for check in checks)
+
+def _condition(column: str, value: str) -> Callable[[Dict], bool]:
+    return _logic(column, value) if column in ("or", "and") else _filter(column, value)
+
+def _filter(column: str, expression: str) -> Callable[[Dict], bool]:
+    op, _, arg = expression.partition(".")
+    negate = op == "not"
+    if negate:
+        op, _, arg = arg.partition(".")
+    if op != "in":
+        arg = arg.strip('"')
+
+    def check(row: Dict) -> bool:
+        value = row.get(column)
+        if op == "is":
+            result = value is None if arg == "null" else value is _coerce(True, arg)
+        elif op == "in":
+            result = value is not None and value in [_coerce(value, item) for item in _split_list(arg)]
+        elif value is None:
+            result = False
+        else:
+            other = _coerce(value, arg)
+            result = {
+                "eq": value == other,
+                "neq": value != other,
+                "gt": value > other,
+                "gte": value >= other,
+                "lt": value < other,
+                "lte": value <= other
+            }[op]
+        return not result if negate else result
+    return check
+
+class FakePostgrestState:
+    def __init__(self, config: FakePostgrestConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.tables: Dict[str, List[Dict]] = {"tokens": [], "contributions": [], "token_transfers": []}
+        self._ids = {table: itertools.count(1) for table in self.tables}
+        # (token_id, shard) -> amount not yet folded into tokens.amount_raised
+        self.shards: Dict[Tuple[int, int], float] = {}
+        # Rows inserted in the same instant still get distinct, increasing timestamps
+        self._clock = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.requests: Dict[str, int] = {}
+
+    def _now(self) -> str:
+        self._clock = max(self._clock + timedelta(microseconds=1), datetime.now(timezone.utc))
+        return self._clock.isoformat()
+
+    def insert(self, table: str, row: Dict) -> Dict:
+        stored = {"id": next(self._ids[table]), "created_at": self._now()}
+        if table == "tokens":
+            stored.update({"amount_raised": 0, "raise_shards": 16, "status": "pending", "token_address": None, "description": None})
+        if table == "contributions":
+            stored.update({"status": "pending", "transaction_hash": None})
+        stored.update(row)
+        self.tables[table].append(stored)
+        return dict(stored)
+
+    def add_token(self, **fields) -> Dict:
+        """Seed a token row with working defaults for everything not given."""
+        token_id = len(self.tables["tokens"]) + 1
+        row = {
+            "name": f"Token {token_id}",
+            "symbol": f"T{token_id}",
+            "initial_supply": 1_000_000,
+            "target_raise": 1000.0,
+            "price_per_token": 1.0,
+            "creator_wallet": "11111111111111111111111111111111",
+            "treasury_wallet": "11111111111111111111111111111111",
+            "is_burnable": False,
+            "is_mintable": False,
+            "status": "fundraising"
+        }
+        row.update(fields)
+        return self.insert("tokens", row)
+
+    def token_amount_raised(self, token_id: int) -> float:
+        token = next(row for row in self.tables["tokens"] if row["id"] == token_id)
+        return token["amount_raised"] + sum(amount for (shard_token, _), amount in self.shards.items() if shard_token == token_id)
+
+    def _rows(self, table: str) -> List[Dict]:
+        if table == "tokens_live":
+            return [dict(row, live_amount_raised=self.token_amount_raised(row["id"])) for row in self.tables["tokens"]]
+        if table not in self.tables:
+            raise PostgrestError("42P01", f'relation "public.{table}" does not exist', 404)
+        return self.tables[table]
+
+    def select(self, table: str, params: List, headers: Mapping[str, str]) -> List[Dict]:
+        checks = [_condition(column, value) for column, value in params if column not in RESERVED_PARAMS]
+        rows = [row for row in self._rows(table) if all(check(row) for check in checks)]
+
+        query = dict(params)
+        for term in reversed([term for term in query.get("order", "").split(",") if term]):
+            column, *modifiers = term.split(".")
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse="desc" in modifiers)
+
+        start, end = int(query.get("offset", 0)), None
+        if "limit" in query:
+            end = start + int(query["limit"])
+        if headers.get("range"):
+            first, _, last = headers["range"].partition("-")
+            start, end = int(first), int(last) + 1 if last else None
+        rows = rows[start:end]
+
+        columns = query.get("select", "*")
+        if columns != "*":
+            rows = [{column: row.get(column) for column in columns.split(",")} for row in rows]
+        return [dict(row) for row in rows]
+
+    def update(self, table: str, params: List, values: Dict) -> List[Dict]:
+        checks = [_condition(column, value) for column, value in params if column not in RESERVED_PARAMS]
+        updated = []
+        for row in self.tables[table]:
+            if all(check(row) for check in checks):
+                row.update(values)
+                updated.append(dict(row))
+        return updated
+
+    def contribute_to_token(self, token_id_param: int, contributor_wallet_param: str, amount_param: float) -> List[Dict]:
+        """The contribute_to_token procedure from supabase/migrations."""
+        if amount_param is None or amount_param <= 0:
+            raise PostgrestError("22023", "Invalid amount")
+        token = next((row for row in self.tables["tokens"] if row["id"] == token_id_param), None)
+        if token is None:
+            raise PostgrestError("P0002", "Token not found")
+        if token["status"] != "fundraising":
+            raise PostgrestError("P0001", "Token is not in fundraising stage")
+        contribution = self.insert("contributions", {
+            "token_id": token_id_param,
+            "contributor_wallet": contributor_wallet_param,
+            "amount": amount_param,
+            "token_amount": amount_param / token["price_per_token"]
+        })
+        shard = (token_id_param, self.random.randrange(token["raise_shards"]))
+        self.shards[shard] = self.shards.get(shard, 0) + amount_param
+        raised = self.token_amount_raised(token_id_param)
+        if raised >= token["target_raise"]:
+            token["status"] = "completed"
+        return [{"contribution": contribution, "token": dict(token, amount_raised=raised)}]
+
+    def fold_amount_raised(self, token_id_param: Optional[int] = None) -> List[Dict]:
+        """Move shard sums into tokens.amount_raised, like the procedure of the same name."""
+        folded = []
+        for token in self.tables["tokens"]:
+            shards = [key for key in self.shards if key[0] == token["id"]]
+            if not shards or token_id_param not in (None, token["id"]):
+                continue
+            token["amount_raised"] += sum(self.shards.pop(key) for key in shards)
+            if token["status"] == "fundraising" and token["amount_raised"] >= token["target_raise"]:
+                token["status"] = "completed"
+            folded.append({"token_id": token["id"], "amount_raised": token["amount_raised"], "status": token["status"]})
+        return folded
+
+    def refund_contributions(self, token_id: int):
+        token = next(row for row in self.tables["tokens"] if row["id"] == token_id)
+        for contribution in self.tables["contributions"]:
+            if contribution["token_id"] == token_id and contribution["status"] == "completed":
+                self.insert("token_transfers", {
+                    "token_id": token_id,
+                    "from_wallet": token["treasury_wallet"],
+                    "to_wallet": contribution["contributor_wallet"],
+                    "amount": contribution["amount"],
+                    "transfer_type": "refund",
+                    "status": "completed"
+                })
+                contribution["status"] = "refunded"
+
+    def settle_fundraising(self) -> List[Dict]:
+        """Complete or fail (and refund) raises that ended or reached their target, like the procedure."""
+        now = datetime.now(timezone.utc)
+        settled = []
+        for token in self.tables["tokens"]:
+            if token["status"] != "fundraising":
+                continue
+            raised = self.token_amount_raised(token["id"])
+            end = token.get("fundraising_end")
+            if (end is None or datetime.fromisoformat(end) > now) and raised < token["target_raise"]:
+                continue
+            token["status"] = "completed" if raised >= token["target_raise"] * 0.5 else "failed"
+            if token["status"] == "failed":
+                self.refund_contributions(token["id"])
+            settled.append({"settled_token_id": token["id"], "settled_status": token["status"]})
+        return settled
+
+class FakePostgrestServer:
+    """ASGI app plus an in-process uvicorn server; `url` is valid once start() returns."""
+
+    def __init__(self, config: Optional[FakePostgrestConfig] = None):
+        self.config = config or FakePostgrestConfig()
+        self.state = FakePostgrestState(self.config)
+        self.app = Starlette(routes=[
+            Route("/rest/v1/rpc/{function}", self._rpc, methods=["POST"]),
+            Route("/rest/v1/{table}", self._table, methods=["GET", "POST", "PATCH"])
+        ])
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional[asyncio.Task] = None
+        self.url: Optional[str] = None
+
+    async def _delay(self, name: str):
+        self.state.requests[name] = self.state.requests.get(name, 0) + 1
+        if self.config.latency or self.config.jitter:
+            await asyncio.sleep(self.config.latency + self.state.random.uniform(0, self.config.jitter))
+
+    async def _table(self, request: Request) -> Response:
+        table = request.path_params["table"]
+        await self._delay(f"{request.method} {table}")
+        params = list(request.query_params.multi_items())
+        try:
+            if request.method == "GET":
+                return JSONResponse(self.state.select(table, params, request.headers))
+            body = await request.json()
+            if request.method == "POST":
+                rows = body if isinstance(body, list) else [body]
+                return JSONResponse([self.state.insert(table, row) for row in rows], status_code=201)
+            return JSONResponse(self.state.update(table, params, body))
+        except PostgrestError as e:
+            return e.response()
+
+    async def _rpc(self, request: Request) -> Response:
+        function = request.path_params["function"]
+        await self._delay(f"rpc {function}")
+        handler = getattr(self.state, function) if function in RPC_FUNCTIONS else None
+        if handler is None:
+            return PostgrestError("PGRST202", f"Could not find the function public.{function}", 404).response()
+        try:
+            return JSONResponse(handler(**await request.json()))
+        except PostgrestError as e:
+            return e.response()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning", lifespan="off"))
+        self._task = asyncio.ensure_future(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._task
+        self._server = None
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Supabase REST (PostgREST) server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=100, help="fundraising tokens to seed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = FakePostgrestServer(FakePostgrestConfig(latency=args.latency, jitter=args.jitter, seed=args.seed))
+    for _ in range(args.tokens):
+        server.state.add_token()
+    print(f"Fake PostgREST listening on http://{args.host}:{args.port}/rest/v1")
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
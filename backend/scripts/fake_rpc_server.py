@@ -0,0 +1,399 @@
+"""
+Local stand-in for a Solana JSON-RPC node, for deterministic benchmarks and tests.
+
+Implements the methods SolanaTokenManager uses over HTTP, plus signatureSubscribe over
+a websocket on the same port. Slots advance on a wall clock; a sent transaction lands
+`land_slots` slots later unless it is dropped, and blockhashes expire after 150 blocks.
+Latency, 5xx errors, 429 rate limiting and dropped sends can be injected.
+
+Run standalone:
+    python scripts/fake_rpc_server.py --port 8899 --latency 0.02 --rate-limit-rate 0.05
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import base58
+import uvicorn
+from solders.transaction import VersionedTransaction
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+# Blocks a blockhash stays valid for
+BLOCKHASH_VALIDITY = 150
+# Slots from landing to finalization
+FINALIZE_SLOTS = 32
+# Lamports per byte-year, with the two years of rent that make an account exempt
+RENT_LAMPORTS_PER_BYTE = 6960
+ACCOUNT_STORAGE_OVERHEAD = 128
+SLOTS_PER_EPOCH = 432_000
+ASSOCIATED_TOKEN_PROGRAM = "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
+BPF_LOADER = "BPFLoaderUpgradeab1e11111111111111111111111"
+# Programs the app checks for at startup: token, token-2022, associated token, token metadata
+PROGRAMS = (
+    "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+    "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb",
+    "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL",
+    "metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s"
+)
+
+@dataclass
+class FakeRpcConfig:
+    # Seconds added to every HTTP request, plus up to `jitter` more
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Fraction of HTTP requests answered with 503 / 429
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Retry-After sent with 429s; None omits the header
+    retry_after: Optional[float] = None
+    # Fraction of sendTransaction calls accepted but never forwarded to a leader
+    drop_rate: float = 0.0
+    slot_time: float = 0.4
+    # Slots between an accepted send and the transaction landing
+    land_slots: int = 1
+    units_consumed: int = 50_000
+    seed: int = 0
+
+@dataclass
+class FakeAccount:
+    data: bytes
+    owner: str
+    lamports: int = 1_000_000
+    executable: bool = False
+
+@dataclass
+class _Landed:
+    slot: int
+    err: Any = None
+
+class FakeRpcState:
+    """Chain state shared by the HTTP and websocket handlers."""
+
+    def __init__(self, config: FakeRpcConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        # Drops get their own stream, so which sends are dropped doesn't depend on other traffic
+        self.drop_random = random.Random(config.seed)
+        self.started = time.monotonic()
+        self.accounts: Dict[str, FakeAccount] = {program: FakeAccount(bytes(36), BPF_LOADER, executable=True) for program in PROGRAMS}
+        # blockhash -> lastValidBlockHeight of the blockhashes we handed out
+        self.blockhashes: Dict[str, int] = {}
+        self.landed: Dict[str, _Landed] = {}
+        # Every transaction that was forwarded to a leader, by signature
+        self.transactions: Dict[str, VersionedTransaction] = {}
+        # Signatures whose landing is forced to fail with this error
+        self.failures: Dict[str, Any] = {}
+        self.requests: Dict[str, int] = {}
+        self.injected_errors = 0
+        self.injected_rate_limits = 0
+        self.sends = 0
+        self.dropped = 0
+        self.expired = 0
+
+    @property
+    def slot(self) -> int:
+        return int((time.monotonic() - self.started) / self.config.slot_time)
+
+    @property
+    def block_height(self) -> int:
+        return self.slot
+
+    def add_account(self, address: str, data: bytes, owner: str, lamports: int = 1_000_000):
+        self.accounts[address] = FakeAccount(data, owner, lamports)
+
+    def status(self, signature: str) -> Optional[Dict]:
+        landed = self.landed.get(signature)
+        slot = self.slot
+        if landed is None or slot < landed.slot:
+            return None
+        finalized = slot >= landed.slot + FINALIZE_SLOTS
+        return {
+            "slot": landed.slot,
+            "confirmations": None if finalized else slot - landed.slot,
+            "err": landed.err,
+            "status": {"Ok": None} if landed.err is None else {"Err": landed.err},
+            "confirmationStatus": "finalized" if finalized else "confirmed"
+        }
+
+    def send(self, raw: bytes) -> str:
+        tx = VersionedTransaction.from_bytes(raw)
+        signature = str(tx.signatures[0])
+        self.sends += 1
+        if signature in self.landed:
+            return signature
+        last_valid = self.blockhashes.get(str(tx.message.recent_blockhash))
+        if last_valid is not None and self.block_height > last_valid:
+            self.expired += 1
+            return signature
+        if self.drop_random.random() < self.config.drop_rate:
+            self.dropped += 1
+            return signature
+        self.landed[signature] = _Landed(self.slot + self.config.land_slots, self.failures.get(signature))
+        self.transactions[signature] = tx
+        return signature
+
+    def simulation_logs(self, raw: bytes) -> List[str]:
+        """What the associated token program logs for each account it would actually create."""
+        message = VersionedTransaction.from_bytes(raw).message
+        keys = [str(key) for key in message.account_keys]
+        logs = []
+        for ix in message.instructions:
+            if keys[ix.program_id_index] != ASSOCIATED_TOKEN_PROGRAM or bytes(ix.data[:1]) not in (b"", b"\x00", b"\x01"):
+                continue
+            # Accounts loaded from a lookup table aren't resolved here and count as new
+            account = keys[ix.accounts[1]] if ix.accounts[1] < len(keys) else None
+            if account not in self.accounts:
+                logs.append("Program log: Initialize the associated token account")
+        return logs
+
+    def latest_blockhash(self) -> Tuple[str, int]:
+        slot = self.slot
+        blockhash = base58.b58encode(hashlib.sha256(f"blockhash-{slot}".encode()).digest()).decode()
+        last_valid = slot + BLOCKHASH_VALIDITY
+        self.blockhashes[blockhash] = last_valid
+        return blockhash, last_valid
+
+    def stats(self) -> Dict:
+        return {
+            "requests": dict(self.requests),
+            "sends": self.sends,
+            "landed": len(self.landed),
+            "dropped": self.dropped,
+            "expired": self.expired,
+            "injected_errors": self.injected_errors,
+            "injected_rate_limits": self.injected_rate_limits
+        }
+
+def _account_json(account: Optional[FakeAccount], data_slice: Optional[Dict] = None) -> Optional[Dict]:
+    if account is None:
+        return None
+    data = account.data
+    if data_slice:
+        data = data[data_slice["offset"]:data_slice["offset"] + data_slice["length"]]
+    return {
+        "data": [base64.b64encode(data).decode(), "base64"],
+        "executable": account.executable,
+        "lamports": account.lamports,
+        "owner": account.owner,
+        "rentEpoch": 0,
+        "space": len(account.data)
+    }
+
+def _matches(account: FakeAccount, filters: List[Dict]) -> bool:
+    for f in filters:
+        if "dataSize" in f and len(account.data) != f["dataSize"]:
+            return False
+        if "memcmp" in f:
+            offset, expected = f["memcmp"]["offset"], f["memcmp"]["bytes"]
+            expected = base64.b64decode(expected) if f["memcmp"].get("encoding") == "base64" else base58.b58decode(expected)
+            if account.data[offset:offset + len(expected)] != expected:
+                return False
+    return True
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class FakeRpcServer:
+    """ASGI app plus an in-process uvicorn server; `url` is valid once start() returns."""
+
+    def __init__(self, config: Optional[FakeRpcConfig] = None):
+        self.config = config or FakeRpcConfig()
+        self.state = FakeRpcState(self.config)
+        self.app = Starlette(routes=[
+            Route("/", self._http, methods=["POST"]),
+            WebSocketRoute("/", self._websocket)
+        ])
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional[asyncio.Task] = None
+        self.url: Optional[str] = None
+
+    def _handle(self, method: str, params: List) -> Any:
+        state = self.state
+        context = {"slot": state.slot}
+        if method == "getMinimumBalanceForRentExemption":
+            return (params[0] + ACCOUNT_STORAGE_OVERHEAD) * RENT_LAMPORTS_PER_BYTE
+        if method == "getLatestBlockhash":
+            blockhash, last_valid = state.latest_blockhash()
+            return {"context": context, "value": {"blockhash": blockhash, "lastValidBlockHeight": last_valid}}
+        if method == "sendTransaction":
+            return state.send(base64.b64decode(params[0]))
+        if method == "getSignatureStatuses":
+            return {"context": context, "value": [state.status(signature) for signature in params[0]]}
+        if method == "getMultipleAccounts":
+            data_slice = params[1].get("dataSlice") if len(params) > 1 else None
+            return {"context": context, "value": [_account_json(state.accounts.get(a), data_slice) for a in params[0]]}
+        if method == "getAccountInfo":
+            data_slice = params[1].get("dataSlice") if len(params) > 1 else None
+            return {"context": context, "value": _account_json(state.accounts.get(params[0]), data_slice)}
+        if method == "getProgramAccounts":
+            options = params[1] if len(params) > 1 else {}
+            filters = options.get("filters") or []
+            return [
+                {"pubkey": address, "account": _account_json(account, options.get("dataSlice"))}
+                for address, account in state.accounts.items()
+                if account.owner == params[0] and _matches(account, filters)
+            ]
+        if method == "getBlockHeight":
+            return state.block_height
+        if method == "getSlot":
+            return state.slot
+        if method == "getEpochInfo":
+            slot = state.slot
+            return {
+                "absoluteSlot": slot,
+                "blockHeight": state.block_height,
+                "epoch": slot // SLOTS_PER_EPOCH,
+                "slotIndex": slot % SLOTS_PER_EPOCH,
+                "slotsInEpoch": SLOTS_PER_EPOCH,
+                "transactionCount": len(state.landed)
+            }
+        if method == "getRecentPrioritizationFees":
+            slot = state.slot
+            return [{"slot": slot - i, "prioritizationFee": 0} for i in range(min(slot + 1, 150))]
+        if method == "simulateTransaction":
+            return {
+                "context": context,
+                "value": {
+                    "err": None,
+                    "logs": state.simulation_logs(base64.b64decode(params[0])),
+                    "accounts": None,
+                    "unitsConsumed": self.config.units_consumed,
+                    "returnData": None
+                }
+            }
+        raise RpcError(-32601, f"Method not found: {method}")
+
+    def _respond(self, request: Dict) -> Dict:
+        method = request.get("method", "")
+        self.state.requests[method] = self.state.requests.get(method, 0) + 1
+        try:
+            return {"jsonrpc": "2.0", "result": self._handle(method, request.get("params") or []), "id": request.get("id")}
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "error": {"code": e.code, "message": e.message}, "id": request.get("id")}
+
+    async def _http(self, request: Request) -> Response:
+        config = self.config
+        if config.latency or config.jitter:
+            await asyncio.sleep(config.latency + self.state.random.uniform(0, config.jitter))
+        roll = self.state.random.random()
+        if roll < config.rate_limit_rate:
+            self.state.injected_rate_limits += 1
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else None
+            return JSONResponse({"error": "Too many requests"}, status_code=429, headers=headers)
+        if roll < config.rate_limit_rate + config.error_rate:
+            self.state.injected_errors += 1
+            return JSONResponse({"error": "Service unavailable"}, status_code=503)
+
+        try:
+            body = await request.json()
+        except ClientDisconnect:
+            # The caller gave up (a cancelled hedge or rebroadcast) while we were delaying it
+            return Response(status_code=499)
+        if isinstance(body, list):
+            return JSONResponse([self._respond(item) for item in body])
+        return JSONResponse(self._respond(body))
+
+    async def _notify(self, websocket: WebSocket, subscription: int, signature: str, commitment: str):
+        while True:
+            status = self.state.status(signature)
+            if status is not None and (commitment != "finalized" or status["confirmationStatus"] == "finalized"):
+                break
+            await asyncio.sleep(self.config.slot_time / 2)
+        await websocket.send_json({
+            "jsonrpc": "2.0",
+            "method": "signatureNotification",
+            "params": {"result": {"context": {"slot": self.state.slot}, "value": {"err": status["err"]}}, "subscription": subscription}
+        })
+
+    async def _websocket(self, websocket: WebSocket):
+        await websocket.accept()
+        subscription_ids = itertools.count(1)
+        watchers: Dict[int, asyncio.Task] = {}
+        try:
+            while True:
+                request = await websocket.receive_json()
+                method, params = request.get("method"), request.get("params") or []
+                self.state.requests[method] = self.state.requests.get(method, 0) + 1
+                if method == "signatureSubscribe":
+                    subscription = next(subscription_ids)
+                    commitment = (params[1] if len(params) > 1 else {}).get("commitment", "finalized")
+                    await websocket.send_json({"jsonrpc": "2.0", "result": subscription, "id": request.get("id")})
+                    watchers[subscription] = asyncio.ensure_future(self._notify(websocket, subscription, params[0], commitment))
+                elif method == "signatureUnsubscribe":
+                    watcher = watchers.pop(params[0], None)
+                    if watcher is not None:
+                        watcher.cancel()
+                    await websocket.send_json({"jsonrpc": "2.0", "result": watcher is not None, "id": request.get("id")})
+                else:
+                    await websocket.send_json({"jsonrpc": "2.0", "error": {"code": -32601, "message": f"Method not found: {method}"}, "id": request.get("id")})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for watcher in watchers.values():
+                watcher.cancel()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning", lifespan="off"))
+        self._task = asyncio.ensure_future(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._task
+        self._server = None
+        self._task = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Solana JSON-RPC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--slot-time", type=float, default=0.4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    config = FakeRpcConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        drop_rate=args.drop_rate,
+        slot_time=args.slot_time,
+        seed=args.seed
+    )
+    server = FakeRpcServer(config)
+    print(f"Fake RPC listening on http://{args.host}:{args.port}")
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
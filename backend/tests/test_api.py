@@ -0,0 +1,209 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+# app.main refuses to import without a treasury wallet
+os.environ.setdefault("NEXT_PUBLIC_TREASURY_WALLET", "11111111111111111111111111111111")
+
+from app import main
+from app.config import Config
+from app.db.postgrest import get_postgrest_pool
+from app.db.repository import get_token_repository
+from scripts.fake_postgrest_server import FakePostgrestConfig, FakePostgrestServer
+
+WALLET = "11111111111111111111111111111111"
+
+@asynccontextmanager
+async def api(monkeypatch, latency: float = 0.0):
+    """The FastAPI app, in process, backed by a fake PostgREST server."""
+    async with FakePostgrestServer(FakePostgrestConfig(latency=latency)) as server:
+        monkeypatch.setattr(Config, "SUPABASE_URL", server.url)
+        monkeypatch.setattr(Config, "SUPABASE_KEY", "test-key")
+        # Each test starts a fresh database with the same ids
+        await get_token_repository().cache.clear()
+        async with httpx.AsyncClient(app=main.app, base_url="http://test") as client:
+            try:
+                yield client, server.state
+            finally:
+                await get_postgrest_pool().close()
+
+@pytest.mark.asyncio
+async def test_get_and_list_tokens(monkeypatch):
+    async with api(monkeypatch) as (client, state):
+        for index in range(5):
+            state.add_token(status="fundraising" if index % 2 == 0 else "pending")
+
+        resp = await client.get("/api/tokens/2")
+        assert resp.status_code == 200 and resp.json()["symbol"] == "T2"
+        assert (await client.get("/api/tokens/99")).status_code == 404
+
+        resp = await client.get("/api/tokens", params={"status": "fundraising", "limit": 2})
+        assert [token["id"] for token in resp.json()] == [5, 3]
+        resp = await client.get("/api/tokens", params={"status": "fundraising", "limit": 2, "page": 2})
+        assert [token["id"] for token in resp.json()] == [1]
+        assert "x-next-cursor" not in resp.headers
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_walks_ties_in_order(monkeypatch):
+    async with api(monkeypatch) as (client, state):
+        # A batch insert gives its rows the same created_at; id breaks the tie
+        for day in (1, 2, 3, 3, 3, 4, 5):
+            state.add_token(created_at=f"2024-03-0{day}T12:00:00.5+00:00")
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            resp = await client.get("/api/tokens", params=params)
+            assert resp.status_code == 200
+            seen.append([token["id"] for token in resp.json()])
+            cursor = resp.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+        assert seen == [[7, 6], [5, 4], [3, 2], [1]]
+
+        # The page/limit path agrees with the cursor path
+        resp = await client.get("/api/tokens", params={"limit": 2, "page": 2})
+        assert [token["id"] for token in resp.json()] == [5, 4]
+
+        assert (await client.get("/api/tokens", params={"cursor": "not-a-cursor"})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_contribute_maps_procedure_errors(monkeypatch):
+    async with api(monkeypatch) as (client, state):
+        state.add_token(target_raise=100.0, price_per_token=0.5)
+        state.add_token(status="pending")
+
+        resp = await client.post("/api/tokens/1/contribute", json={"amount": 60, "wallet_address": WALLET})
+        assert resp.status_code == 200
+        assert resp.json()["token_amount"] == 120
+        # The contribution sits in a shard; reads see it before and after the fold
+        assert state.tables["tokens"][0]["amount_raised"] == 0
+        assert (await client.get("/api/tokens/1")).json()["amount_raised"] == 60
+        state.fold_amount_raised()
+        assert state.tables["tokens"][0]["amount_raised"] == 60
+        assert (await client.get("/api/tokens/1")).json()["amount_raised"] == 60
+        resp = await client.post("/api/tokens/1/contribute", json={"amount": 40, "wallet_address": WALLET})
+        assert resp.status_code == 200
+        token = (await client.get("/api/tokens/1")).json()
+        assert token["amount_raised"] == 100 and token["status"] == "completed"
+
+        resp = await client.post("/api/tokens/1/contribute", json={"amount": 1, "wallet_address": WALLET})
+        assert resp.status_code == 400 and resp.json()["detail"] == "Token is not in fundraising stage"
+        resp = await client.post("/api/tokens/99/contribute", json={"amount": 1, "wallet_address": WALLET})
+        assert resp.status_code == 404
+
+        # Newest first
+        resp = await client.get("/api/tokens/1/contributions", params={"limit": 1, "page": 2})
+        assert [contribution["amount"] for contribution in resp.json()] == [60]
+
+@pytest.mark.asyncio
+async def test_slow_queries_do_not_block_other_requests(monkeypatch):
+    async with api(monkeypatch, latency=0.2) as (client, state):
+        for _ in range(10):
+            state.add_token()
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(f"/api/tokens/{token_id}") for token_id in range(1, 11)))
+        elapsed = time.perf_counter() - start
+
+        assert all(resp.status_code == 200 for resp in responses)
+        # A blocking client would take 10 x 0.2s; awaited queries overlap
+        assert elapsed < 1.0
+
+@pytest.mark.asyncio
+async def test_token_reads_are_cached_until_a_write(monkeypatch):
+    async with api(monkeypatch) as (client, state):
+        state.add_token(target_raise=100.0)
+        state.add_token()
+
+        for _ in range(3):
+            assert (await client.get("/api/tokens/1")).json()["status"] == "fundraising"
+            assert len((await client.get("/api/tokens")).json()) == 2
+        assert state.requests["GET tokens_live"] == 2
+
+        # A contribution that doesn't complete the raise changes the token's total but not the lists
+        await client.post("/api/tokens/1/contribute", json={"amount": 10, "wallet_address": WALLET})
+        assert (await client.get("/api/tokens/1")).json()["amount_raised"] == 10
+        await client.get("/api/tokens")
+        assert state.requests["GET tokens_live"] == 3
+
+        # Completing the raise and a status update both invalidate the token and the lists
+        await client.post("/api/tokens/1/contribute", json={"amount": 90, "wallet_address": WALLET})
+        assert (await client.get("/api/tokens/1")).json()["status"] == "completed"
+        assert [token["status"] for token in (await client.get("/api/tokens")).json()] == ["fundraising", "completed"]
+        await client.patch("/api/tokens/2/status", params={"status": "failed"})
+        assert (await client.get("/api/tokens/2")).json()["status"] == "failed"
+        assert [token["status"] for token in (await client.get("/api/tokens")).json()] == ["failed", "completed"]
+
+class FakeTokenManager:
+    """Stands in for solana_manager.SolanaTokenManager: every token lands except symbol BAD."""
+
+    async def create_tokens_batch(self, tokens):
+        return [
+            {"index": index, "status": "failed", "error": "Transaction simulation failed"} if token["symbol"] == "BAD"
+            else {"index": index, "status": "success", "token": {**token, "token_address": f"Mint{token['symbol']}"}}
+            for index, token in enumerate(tokens)
+        ]
+
+def batch_token(symbol):
+    return {"name": symbol, "symbol": symbol, "initial_supply": 1000, "target_raise": 100, "price_per_token": 1, "creator_wallet": WALLET}
+
+@pytest.mark.asyncio
+async def test_batch_create_reports_mints_that_were_not_stored(monkeypatch):
+    monkeypatch.setattr(main.solana_manager, "SolanaTokenManager", FakeTokenManager)
+    async with api(monkeypatch) as (client, state):
+        resp = await client.post("/api/tokens/batch", json={"tokens": [batch_token("ONE"), batch_token("BAD")]})
+        assert [item["status"] for item in resp.json()] == ["success", "failed"]
+        assert resp.json()[0]["token"]["token_address"] == "MintONE"
+
+        async def insert_fails(rows):
+            raise Exception("canceling statement due to statement timeout")
+
+        monkeypatch.setattr(get_token_repository(), "insert_tokens", insert_fails)
+        resp = await client.post("/api/tokens/batch", json={"tokens": [batch_token("TWO"), batch_token("THREE")]})
+        assert resp.status_code == 200
+        assert [(item["status"], item["token_address"]) for item in resp.json()] == [("failed", "MintTWO"), ("failed", "MintTHREE")]
+        assert "statement timeout" in resp.json()[0]["error"]
+
+@pytest.mark.asyncio
+async def test_settle_raises_fails_and_refunds_ended_raises(monkeypatch):
+    async with api(monkeypatch) as (client, state):
+        ended = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+        state.add_token(target_raise=100.0, fundraising_end=ended)
+        state.add_token(target_raise=100.0, fundraising_end=ended)
+        state.add_token(target_raise=100.0)
+        for token_id, amount in ((1, 20), (2, 60), (3, 20)):
+            resp = await client.post(f"/api/tokens/{token_id}/contribute", json={"amount": amount, "wallet_address": WALLET})
+            assert resp.status_code == 200
+        for contribution in state.tables["contributions"]:
+            contribution["status"] = "completed"
+        assert (await client.get("/api/tokens/1")).json()["status"] == "fundraising"
+
+        result = await get_token_repository().settle_raises()
+
+        assert result["settled"] == [
+            {"settled_token_id": 1, "settled_status": "failed"},
+            {"settled_token_id": 2, "settled_status": "completed"}
+        ]
+        assert [(await client.get(f"/api/tokens/{token_id}")).json()["status"] for token_id in (1, 2, 3)] == ["failed", "completed", "fundraising"]
+        assert [contribution["status"] for contribution in state.tables["contributions"]] == ["refunded", "completed", "completed"]
+        assert [(transfer["token_id"], transfer["amount"], transfer["transfer_type"]) for transfer in state.tables["token_transfers"]] == [(1, 20, "refund")]
+
+@pytest.mark.asyncio
+async def test_fold_completes_a_raise_concurrent_contributions_overshot(monkeypatch):
+    async with api(monkeypatch) as (client, state):
+        state.add_token(target_raise=100.0)
+        # Two contributions on different shards that each saw the other's increment missing
+        state.shards[(1, 0)], state.shards[(1, 1)] = 60.0, 50.0
+        assert (await client.get("/api/tokens/1")).json()["status"] == "fundraising"
+
+        result = await get_token_repository().settle_raises()
+
+        assert result["folded"] == [{"token_id": 1, "amount_raised": 110.0, "status": "completed"}]
+        token = (await client.get("/api/tokens/1")).json()
+        assert token["status"] == "completed" and token["amount_raised"] == 110
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import pytest
+from solders.hash import Hash
+
+from app.integrations.blockhash_cache import BlockhashCache
+
+class FakeRouter:
+    def __init__(self):
+        self.calls = 0
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_latest_blockhash(self, commitment=None):
+        self.calls += 1
+        return SimpleNamespace(value=SimpleNamespace(blockhash=Hash.new_unique(), last_valid_block_height=1000 + self.calls))
+
+@pytest.mark.asyncio
+async def test_serves_cached_blockhash_until_stale():
+    router = FakeRouter()
+    cache = BlockhashCache(router, refresh_interval=60, max_age=60)
+
+    first = await cache.get()
+    second = await cache.get()
+
+    assert first is second
+    assert first.last_valid_block_height > 1000
+    assert cache.hits >= 1
+    await cache.close()
+
+@pytest.mark.asyncio
+async def test_refreshes_stale_blockhash_inline():
+    router = FakeRouter()
+    cache = BlockhashCache(router, refresh_interval=60, max_age=0)
+
+    first = await cache.get()
+    second = await cache.get()
+
+    assert first.blockhash != second.blockhash
+    assert cache.misses == 2
+    await cache.close()
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.integrations.cluster_cache import MINT_LAYOUT_SIZE, ClusterConstantsCache
+
+class FakeRouter:
+    def __init__(self):
+        self.epoch = 500
+        self.slot_index = 0
+        self.rent_calls = 0
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_epoch_info(self):
+        return SimpleNamespace(value=SimpleNamespace(epoch=self.epoch, slots_in_epoch=432000, slot_index=self.slot_index))
+
+    async def get_minimum_balance_for_rent_exemption(self, size):
+        self.rent_calls += 1
+        return SimpleNamespace(value=(size + 128) * 6960)
+
+    async def get_multiple_accounts(self, pubkeys):
+        return SimpleNamespace(value=[SimpleNamespace(executable=True) for _ in pubkeys])
+
+@pytest.mark.asyncio
+async def test_rent_minimums_are_served_from_cache_within_epoch():
+    router = FakeRouter()
+    cache = ClusterConstantsCache(router)
+    await cache.load()
+    calls_after_load = router.rent_calls
+
+    assert await cache.get_rent_exemption(MINT_LAYOUT_SIZE) == (82 + 128) * 6960
+    assert await cache.get_rent_exemption(MINT_LAYOUT_SIZE) == (82 + 128) * 6960
+    assert router.rent_calls == calls_after_load
+    assert cache.current_epoch == 500
+
+@pytest.mark.asyncio
+async def test_new_epoch_drops_rent_table():
+    router = FakeRouter()
+    router.slot_index = 432000  # Epoch ends immediately
+    cache = ClusterConstantsCache(router)
+    await cache.load()
+    router.epoch = 501
+    calls_before = router.rent_calls
+
+    await cache.get_rent_exemption(MINT_LAYOUT_SIZE)
+
+    assert cache.current_epoch == 501
+    assert router.rent_calls == calls_before + 1
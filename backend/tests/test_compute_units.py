@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from solders.compute_budget import set_compute_unit_limit
+from solders.hash import Hash
+from solders.instruction import AccountMeta, Instruction
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID
+
+from app.integrations.compute_units import ASSOCIATED_ACCOUNT_CREATED_LOG, ComputeUnitEstimator, has_compute_unit_limit
+
+PROGRAM = Pubkey.new_unique()
+
+class FakeRouter:
+    def __init__(self, units=12000, err=None, logs=None):
+        self.units = units
+        self.err = err
+        self.logs = logs or []
+        self.simulated = []
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def simulate_transaction(self, tx, commitment=None):
+        self.simulated.append(tx)
+        await asyncio.sleep(0)
+        return SimpleNamespace(value=SimpleNamespace(err=self.err, units_consumed=self.units, logs=self.logs))
+
+def transfer(amount):
+    return Instruction(PROGRAM, bytes([12]) + amount.to_bytes(8, "little"), [AccountMeta(Pubkey.new_unique(), False, True)])
+
+def build(instructions):
+    payer = Keypair()
+    return Transaction([payer], Message.new_with_blockhash(instructions, payer.pubkey(), Hash.default()), Hash.default())
+
+@pytest.mark.asyncio
+async def test_limit_is_simulated_once_per_shape():
+    router = FakeRouter(units=12000)
+    estimator = ComputeUnitEstimator(router, margin=0.1, headroom=500)
+
+    limits = await asyncio.gather(*(estimator.limit_for([transfer(i), transfer(i + 1)], build) for i in range(5)))
+
+    assert limits == [13700] * 5
+    assert len(router.simulated) == 1
+    assert router.simulated[0].message.instructions[0].data == bytes(set_compute_unit_limit(1_400_000).data)
+
+    # A different batch size is a different shape
+    await estimator.limit_for([transfer(1)], build)
+    assert len(router.simulated) == 2
+
+@pytest.mark.asyncio
+async def test_failed_simulation_leaves_default_budget():
+    estimator = ComputeUnitEstimator(FakeRouter(err="InstructionError"))
+    instructions = [transfer(1)]
+
+    assert await estimator.with_compute_unit_limit(instructions, build) == instructions
+
+@pytest.mark.asyncio
+async def test_failed_simulation_is_not_retried_until_it_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.integrations.compute_units.time.monotonic", lambda: now[0])
+    router = FakeRouter(err="InstructionError")
+    estimator = ComputeUnitEstimator(router, failure_ttl=5.0)
+
+    limits = await asyncio.gather(*(estimator.limit_for([transfer(i)], build) for i in range(5)))
+    assert limits == [None] * 5
+    assert len(router.simulated) == 1
+
+    router.err = None
+    now[0] += 5
+    assert await estimator.limit_for([transfer(1)], build) is not None
+    assert len(router.simulated) == 2
+
+@pytest.mark.asyncio
+async def test_limit_is_prepended_unless_already_set():
+    estimator = ComputeUnitEstimator(FakeRouter(units=5000), margin=0, headroom=0)
+
+    instructions = await estimator.with_compute_unit_limit([transfer(1)], build)
+    assert instructions[0] == set_compute_unit_limit(5000)
+    assert has_compute_unit_limit(instructions)
+    assert await estimator.with_compute_unit_limit(instructions, build) == instructions
+
+@pytest.mark.asyncio
+async def test_simulation_against_existing_accounts_is_not_cached():
+    create = Instruction(ASSOCIATED_TOKEN_PROGRAM_ID, bytes([1]), [AccountMeta(Pubkey.new_unique(), False, True)])
+    # CreateIdempotent found the account already there: cheap, and nothing logged as created
+    router = FakeRouter(units=6000, logs=["Program log: CreateIdempotent"])
+    estimator = ComputeUnitEstimator(router, failure_ttl=0)
+
+    assert await estimator.limit_for([create, transfer(1)], build) is None
+
+    router.units = 30000
+    router.logs = ["Program log: CreateIdempotent", f"Program log: {ASSOCIATED_ACCOUNT_CREATED_LOG}"]
+    limit = await estimator.limit_for([create, transfer(2)], build)
+    assert limit > 30000
+    assert await estimator.limit_for([create, transfer(3)], build) == limit
+    assert len(router.simulated) == 2
@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+
+from app.integrations.confirmation import SignatureSubscriptionService, _Subscription, to_ws_url
+from app.integrations.signature_tracker import SignatureStatusTracker, TransactionFailedError, status_reached
+
+def make_status(confirmation_status=None, err=None):
+    return SimpleNamespace(confirmation_status=confirmation_status, err=err)
+
+class FakeRouter:
+    """Serves one status per call from a script, repeating the last one."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def call(self, fn, hedge=None):
+        self.calls += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return SimpleNamespace(value=[status])
+
+def test_status_reached_orders_commitments():
+    confirmed = make_status(TransactionConfirmationStatus.Confirmed)
+    assert status_reached(confirmed, "processed")
+    assert status_reached(confirmed, "confirmed")
+    assert not status_reached(confirmed, "finalized")
+    assert not status_reached(None, "processed")
+    with pytest.raises(TransactionFailedError):
+        status_reached(make_status(err="InstructionError"), "processed")
+
+def test_to_ws_url():
+    assert to_ws_url("https://api.devnet.solana.com") == "wss://api.devnet.solana.com"
+    assert to_ws_url("http://localhost:8899") == "ws://localhost:8899"
+
+@pytest.mark.asyncio
+async def test_confirm_falls_back_to_polling_without_websocket():
+    router = FakeRouter([make_status(TransactionConfirmationStatus.Finalized)])
+    service = SignatureSubscriptionService("ws://127.0.0.1:9", router, SignatureStatusTracker(router, poll_interval=0))
+
+    await service.confirm(Signature.default(), commitment="finalized", timeout=5)
+
+    assert service.polling_confirmations == 1
+    assert service.websocket_confirmations == 0
+    await service.tracker.close()
+
+@pytest.mark.asyncio
+async def test_failed_status_pre_check_still_waits_on_the_subscription(monkeypatch):
+    class FailingRouter:
+        async def call(self, fn, hedge=None):
+            raise httpx.ConnectError("endpoint down")
+
+    router = FailingRouter()
+    service = SignatureSubscriptionService("ws://127.0.0.1:9", router, SignatureStatusTracker(router, poll_interval=0))
+
+    async def subscribe(signature, commitment):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return _Subscription(signature, future, request_id=1)
+
+    monkeypatch.setattr(service, "_subscribe", subscribe)
+    await service.confirm(Signature.default(), timeout=5)
+
+    assert service.websocket_confirmations == 1
+
+@pytest.mark.asyncio
+async def test_failed_transaction_found_by_the_pre_check_raises_at_once(monkeypatch):
+    router = FakeRouter([make_status(TransactionConfirmationStatus.Processed, err="InstructionError")])
+    service = SignatureSubscriptionService("ws://127.0.0.1:9", router, SignatureStatusTracker(router, poll_interval=0))
+
+    async def subscribe(signature, commitment):
+        # Never notified, so only the pre-check can resolve the confirmation
+        return _Subscription(signature, asyncio.get_running_loop().create_future(), request_id=1)
+
+    monkeypatch.setattr(service, "_subscribe", subscribe)
+    with pytest.raises(TransactionFailedError):
+        await asyncio.wait_for(service.confirm(Signature.default(), timeout=30), 1)
+
+    assert router.calls == 1
+    assert service.websocket_confirmations == 0 and service.polling_confirmations == 0
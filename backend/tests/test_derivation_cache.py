@@ -0,0 +1,65 @@
+from solders.pubkey import Pubkey
+from spl.token.instructions import create_associated_token_account, get_associated_token_address
+
+from app.integrations.derivation_cache import TOKEN_METADATA_PROGRAM_ID, DerivationCache
+
+TOKEN_2022_PROGRAM_ID = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+
+def test_matches_spl_derivation_and_caches():
+    cache = DerivationCache(max_entries=10)
+    owner, mint = Pubkey.new_unique(), Pubkey.new_unique()
+
+    assert cache.associated_token_address(owner, mint) == get_associated_token_address(owner, mint)
+    assert cache.associated_token_address(owner, mint) == get_associated_token_address(owner, mint)
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    # The token program is part of the key
+    assert cache.associated_token_address(owner, mint, TOKEN_2022_PROGRAM_ID) != cache.associated_token_address(owner, mint)
+
+    expected, _ = Pubkey.find_program_address([b"metadata", bytes(TOKEN_METADATA_PROGRAM_ID), bytes(mint)], TOKEN_METADATA_PROGRAM_ID)
+    assert cache.metadata_address(mint) == expected
+
+    payer = Pubkey.new_unique()
+    assert cache.create_associated_token_account(payer, owner, mint) == create_associated_token_account(payer, owner, mint)
+
+def test_batch_is_bounded_and_persisted(tmp_path):
+    path = str(tmp_path / "derived.db")
+    mint = Pubkey.new_unique()
+    owners = [Pubkey.new_unique() for _ in range(20)]
+    cache = DerivationCache(max_entries=8, path=path)
+
+    addresses = cache.associated_token_addresses(owners + owners[:3], mint)
+
+    assert addresses == [get_associated_token_address(owner, mint) for owner in owners + owners[:3]]
+    assert cache.stats()["entries"] == 8
+    assert cache.misses == 20
+    cache.close()
+
+    restarted = DerivationCache(max_entries=100, path=path)
+    assert restarted.stats()["entries"] == 20
+    assert restarted.associated_token_addresses(owners, mint) == addresses[:20]
+    assert restarted.misses == 0
+    restarted.close()
+
+def test_writes_are_batched_and_most_recent_reloaded(tmp_path):
+    path = str(tmp_path / "derived.db")
+    mint = Pubkey.new_unique()
+    owners = [Pubkey.new_unique() for _ in range(6)]
+    cache = DerivationCache(path=path, flush_size=4, flush_interval=3600)
+    commits = []
+    cache._db.set_trace_callback(lambda sql: commits.append(sql) if sql == "COMMIT" else None)
+
+    for owner in owners[:3]:
+        cache.associated_token_address(owner, mint)
+    assert commits == []
+    cache.associated_token_address(owners[3], mint)
+    assert len(commits) == 1
+
+    cache.associated_token_addresses(owners[4:], mint)
+    cache.close()
+
+    # Only room for two: the last two derived come back
+    restarted = DerivationCache(max_entries=2, path=path)
+    assert restarted.associated_token_addresses(owners[4:], mint) == [get_associated_token_address(owner, mint) for owner in owners[4:]]
+    assert restarted.misses == 0
+    restarted.close()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.address_lookup_table_account import AddressLookupTableAccount
+from solders.compute_budget import set_compute_unit_limit, set_compute_unit_price
+from solders.message import Message, MessageV0
+from solders.pubkey import Pubkey
+from solders.transaction import Transaction, VersionedTransaction
+
+from app.integrations.distribution import (
+    PACKET_DATA_SIZE,
+    DistributionCheckpoint,
+    TokenDistributor,
+    default_distribution_id
+)
+from app.integrations.signature_tracker import TransactionExpiredError
+
+class FakeRouter:
+    """Reports every other associated token account as missing."""
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_multiple_accounts(self, pubkeys):
+        return SimpleNamespace(value=[None if i % 2 == 0 else object() for i in range(len(pubkeys))])
+
+class FakeTracker:
+    def __init__(self, expire_first=0):
+        self.expire_first = expire_first
+        self.waited = []
+
+    async def wait(self, signature, commitment="confirmed", last_valid_block_height=None, timeout=None):
+        self.waited.append(str(signature))
+        if len(self.waited) <= self.expire_first:
+            raise TransactionExpiredError("expired")
+
+class FakeLookupTables:
+    async def ensure(self, sender, name, addresses):
+        addresses = list(addresses)
+        return [AddressLookupTableAccount(Pubkey.new_unique(), addresses[i:i + 256]) for i in range(0, len(addresses), 256)]
+
+class FakeManager:
+    def __init__(self, tracker=None):
+        self.router = FakeRouter()
+        self.tracker = tracker or FakeTracker()
+        self.lookup_tables = FakeLookupTables()
+        self.sent = []
+
+    async def sign_instructions(self, instructions, signers, lookup_tables=None, fee_policy="user"):
+        instructions = [set_compute_unit_limit(1_400_000), set_compute_unit_price(1_000_000)] + instructions
+        if lookup_tables:
+            message = MessageV0.try_compile(signers[0].pubkey(), instructions, lookup_tables, Hash.new_unique())
+            return VersionedTransaction(message, signers), 100
+        message = Message.new_with_blockhash(instructions, signers[0].pubkey(), Hash.new_unique())
+        return Transaction(signers, message, message.recent_blockhash), 100
+
+    async def send_transaction(self, tx, last_valid_block_height):
+        self.sent.append(tx)
+        await asyncio.sleep(0)
+        return tx.signatures[0]
+
+    async def confirm_sent(self, tx, last_valid_block_height, commitment="confirmed", timeout=None):
+        await self.tracker.wait(tx.signatures[0], commitment, last_valid_block_height, timeout)
+
+def make_distributions(count):
+    return [{"wallet_address": str(Keypair().pubkey()), "amount": 10 + i} for i in range(count)]
+
+def make_distributor(manager, tmp_path, fee_payers=None, **kwargs):
+    authority = Keypair()
+    return TokenDistributor(
+        manager,
+        Keypair().pubkey(),
+        6,
+        authority,
+        fee_payers or [authority, Keypair()],
+        str(tmp_path / "checkpoint.jsonl"),
+        in_flight_per_payer=2,
+        **kwargs
+    )
+
+@pytest.mark.asyncio
+async def test_distribution_packs_transfers_and_uses_every_fee_payer(tmp_path):
+    manager = FakeManager()
+    distributor = make_distributor(manager, tmp_path)
+
+    result = await distributor.run(make_distributions(60))
+
+    assert result["status"] == "completed"
+    assert result["transfers"] == 60
+    assert result["accounts_created"] == 30
+    assert result["transactions_confirmed"] == len(manager.sent) < 60
+    assert all(len(bytes(tx)) <= PACKET_DATA_SIZE for tx in manager.sent)
+    assert {tx.message.account_keys[0] for tx in manager.sent} == {payer.pubkey() for payer in distributor.fee_payers}
+
+@pytest.mark.asyncio
+async def test_distribution_resumes_from_checkpoint(tmp_path):
+    distributions = make_distributions(10)
+    paid = [[dist["wallet_address"], dist["amount"]] for dist in distributions[:4]]
+    # The fifth wallet was paid part of its amount, e.g. by a run with a smaller list
+    paid.append([distributions[4]["wallet_address"], 5])
+    with open(tmp_path / "checkpoint.jsonl", "w") as f:
+        f.write(json.dumps({"event": "sent", "signature": "sig1", "last_valid_block_height": 90, "transfers": paid}) + "\n")
+        f.write(json.dumps({"event": "confirmed", "signature": "sig1"}) + "\n")
+        f.write('{"event": "sent", "signa')
+
+    manager = FakeManager()
+    result = await make_distributor(manager, tmp_path).run(distributions)
+
+    assert result["skipped"] == 4
+    assert result["transfers"] == 6
+    completed = DistributionCheckpoint(str(tmp_path / "checkpoint.jsonl")).completed
+    assert completed == {dist["wallet_address"]: dist["amount"] for dist in distributions}
+
+def test_default_distribution_id_separates_distinct_payouts():
+    distributions = make_distributions(3)
+    first = default_distribution_id("Mint", "Contract", distributions)
+
+    assert default_distribution_id("Mint", "Contract", list(reversed(distributions))) == first
+    assert default_distribution_id("Mint", "Contract", [{**distributions[0], "amount": 1}, *distributions[1:]]) != first
+    assert default_distribution_id("Mint", "Other", distributions) != first
+
+@pytest.mark.asyncio
+async def test_distribution_resends_expired_batches_once(tmp_path):
+    manager = FakeManager(FakeTracker(expire_first=1))
+    distributor = make_distributor(manager, tmp_path, fee_payers=[Keypair()])
+
+    result = await distributor.run(make_distributions(3))
+
+    assert result["transfers"] == 3
+    assert result["transactions_sent"] == 2
+    assert result["transactions_confirmed"] == 1
+
+@pytest.mark.asyncio
+async def test_distribution_with_lookup_tables_packs_more_per_transaction(tmp_path):
+    distributions = make_distributions(120)
+    legacy = FakeManager()
+    await make_distributor(legacy, tmp_path / "legacy").run(distributions)
+
+    versioned = FakeManager()
+    result = await make_distributor(versioned, tmp_path / "v0", use_lookup_tables=True, lookup_recipients=True).run(distributions)
+
+    assert result["transfers"] == 120
+    assert all(isinstance(tx, VersionedTransaction) for tx in versioned.sent)
+    assert all(len(bytes(tx)) <= PACKET_DATA_SIZE for tx in versioned.sent)
+    assert len(versioned.sent) * 2 <= len(legacy.sent)
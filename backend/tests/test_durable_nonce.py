@@ -0,0 +1,163 @@
+import asyncio
+import struct
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+from solana.rpc.core import RPCException
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.system_program import ID as SYSTEM_PROGRAM_ID, TransferParams, transfer
+
+from app.config import Config
+from app.integrations.durable_nonce import NoncePool, PresignedTransactionQueue, decode_nonce_account
+from app.integrations.signature_tracker import TransactionFailedError
+from app.integrations.solana_manager import SolanaTokenManager
+
+AUTHORITY = Pubkey.new_unique()
+
+def nonce_data(nonce: Hash):
+    return struct.pack("<II32s32sQ", 1, 1, bytes(AUTHORITY), bytes(nonce), 5000)
+
+class FakeRouter:
+    def __init__(self):
+        self.nonces = {}
+        self.requests = []
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_multiple_accounts(self, accounts, commitment=None):
+        self.requests.append(accounts)
+        return SimpleNamespace(value=[SimpleNamespace(data=nonce_data(self.nonces[account])) for account in accounts])
+
+def make_pool(tmp_path, size):
+    router = FakeRouter()
+    pool = NoncePool(router, str(tmp_path / "nonces.json"))
+    for _ in range(size):
+        account = Pubkey.new_unique()
+        router.nonces[account] = Hash.new_unique()
+        pool._accounts.append(account)
+        pool._free.append(account)
+    return pool, router
+
+def test_decode_nonce_account():
+    nonce = Hash.new_unique()
+    assert decode_nonce_account(nonce_data(nonce)) == (AUTHORITY, nonce)
+    with pytest.raises(ValueError):
+        decode_nonce_account(struct.pack("<II32s32sQ", 1, 0, bytes(32), bytes(32), 0))
+
+@pytest.mark.asyncio
+async def test_pool_rereads_only_advanced_nonces(tmp_path):
+    pool, router = make_pool(tmp_path, 3)
+
+    leases = await pool.acquire_many(3)
+    assert len(router.requests) == 1 and len(router.requests[0]) == 3
+    assert pool.in_use == 3
+
+    # Exhausted pool: acquire waits for a release
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    await pool.release(leases[0], advanced=False)
+    reused = await waiter
+    assert reused == leases[0]
+    assert len(router.requests) == 1
+
+    router.nonces[leases[1].account] = Hash.new_unique()
+    await pool.release(leases[1])
+    await pool.release(leases[2], advanced=False)
+    again = await pool.acquire_many(2)
+    assert [str(account) for account in router.requests[-1]] == [str(leases[1].account)]
+    assert again[0].nonce == router.nonces[leases[1].account]
+
+@pytest.mark.asyncio
+async def test_nonce_transactions_carry_advance_first(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SOLANA_PRIORITY_FEES", False)
+    monkeypatch.setattr(Config, "SOLANA_COMPUTE_UNIT_LIMITS", False)
+    pool, router = make_pool(tmp_path, 1)
+    payer = Keypair()
+    # Our payer is the authority of every pool account
+    lease = replace(await pool.acquire(), authority=payer.pubkey())
+
+    tx, last_valid_block_height = await SolanaTokenManager(network="devnet").sign_instructions(
+        [transfer(TransferParams(from_pubkey=payer.pubkey(), to_pubkey=Pubkey.new_unique(), lamports=1))],
+        [payer],
+        nonce=lease
+    )
+
+    assert last_valid_block_height is None
+    assert tx.message.recent_blockhash == lease.nonce
+    advance = tx.message.instructions[0]
+    assert tx.message.account_keys[advance.program_id_index] == SYSTEM_PROGRAM_ID
+    assert advance.data[:4] == bytes([4, 0, 0, 0])
+
+class FakeManager:
+    def __init__(self, outcomes):
+        # signature -> list of outcomes per wait: "confirmed", "timeout" or "failed"
+        self.outcomes = outcomes
+        self.sent = []
+
+    async def sign_instructions(self, instructions, signers, lookup_tables=None, fee_policy="user", nonce=None):
+        tx = SimpleNamespace(signatures=[Keypair().sign_message(bytes(nonce.nonce))], nonce=nonce)
+        return tx, None
+
+    async def send_transaction(self, tx, last_valid_block_height):
+        self.sent.append(tx)
+        return tx.signatures[0]
+
+    async def confirm_sent(self, tx, last_valid_block_height, commitment="confirmed", timeout=None):
+        outcome = self.outcomes[tx.signatures[0]].pop(0)
+        if outcome == "timeout":
+            raise Exception("Transaction confirmation timeout")
+        if outcome == "failed":
+            raise TransactionFailedError("InstructionError")
+
+@pytest.mark.asyncio
+async def test_queue_resubmits_same_bytes_until_landed(tmp_path):
+    pool, _ = make_pool(tmp_path, 3)
+    manager = FakeManager({})
+    queue = PresignedTransactionQueue(manager, pool)
+
+    prepared = [await queue.prepare([], [Keypair()]) for _ in range(3)]
+    assert pool.in_use == 3 and len(queue) == 3
+    for item, outcomes in zip(prepared, (["confirmed"], ["timeout", "confirmed"], ["failed"])):
+        manager.outcomes[item.signature] = outcomes
+
+    result = await queue.submit_all()
+    assert result == {"submitted": 3, "confirmed": 1, "failed": 1, "pending": 1}
+    assert pool.in_use == 1
+
+    result = await queue.submit_all()
+    assert result["confirmed"] == 1 and len(queue) == 0
+    # The timed-out transaction was re-sent as-is, not rebuilt
+    assert manager.sent.count(prepared[1].tx) == 2
+    assert queue.resends == 1 and pool.in_use == 0
+
+@pytest.mark.asyncio
+async def test_rejected_resend_of_a_landed_transaction_is_confirmed(tmp_path):
+    pool, router = make_pool(tmp_path, 2)
+    manager = FakeManager({})
+    queue = PresignedTransactionQueue(manager, pool)
+    landed, lost = [await queue.prepare([], [Keypair()]) for _ in range(2)]
+    manager.outcomes[landed.signature] = ["timeout", "confirmed"]
+    manager.outcomes[lost.signature] = ["timeout"]
+    await queue.submit_all()
+
+    # Both resends fail preflight because their nonces were already advanced
+    async def reject(tx, last_valid_block_height):
+        manager.sent.append(tx)
+        raise RPCException({"message": "Transaction simulation failed: Blockhash not found"})
+
+    async def get_signature_statuses(signatures):
+        return SimpleNamespace(value=[SimpleNamespace(err=None) if signature == landed.signature else None for signature in signatures])
+
+    manager.send_transaction = reject
+    router.get_signature_statuses = get_signature_statuses
+    result = await queue.submit_all()
+
+    assert result == {"submitted": 2, "confirmed": 1, "failed": 1, "pending": 0}
+    # Neither stale nonce is cached for reuse; both are re-read on the next lease
+    assert pool.in_use == 0 and pool._leases == {}
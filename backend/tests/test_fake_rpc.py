@@ -0,0 +1,52 @@
+import base58
+import pytest
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+
+from app.config import Config
+from app.integrations.rpc_guard import RpcGuard
+from app.integrations.rpc_pool import get_rpc_pool
+from app.integrations.solana_manager import SolanaTokenManager
+from scripts.fake_rpc_server import FakeRpcConfig, FakeRpcServer
+
+@pytest.mark.asyncio
+async def test_create_token_lands_through_dropped_sends(monkeypatch):
+    payer = Keypair()
+    monkeypatch.setenv("SOLANA_PAYER_KEY", base58.b58encode(bytes(payer)).decode())
+    monkeypatch.delenv("QUICKNODE_RPC_ENDPOINT", raising=False)
+    monkeypatch.setattr(Config, "SOLANA_RPC_ENDPOINTS", [])
+    monkeypatch.setattr(Config, "SOLANA_WS_ENDPOINT", None)
+    monkeypatch.setattr(Config, "SOLANA_SEND_ENDPOINT", None)
+
+    async with FakeRpcServer(FakeRpcConfig(drop_rate=0.5, slot_time=0.05, seed=1)) as server:
+        monkeypatch.setattr(Config, "SOLANA_LOCALNET_URL", server.url)
+        manager = SolanaTokenManager(network="localnet")
+        manager.rebroadcaster.interval = 0.02
+        try:
+            # The creator is not the payer and doesn't sign
+            result = await manager.create_token("Fake", "FAKE", 1000, str(Keypair().pubkey()), {}, decimals=6)
+        finally:
+            await manager.confirmations.close()
+            await manager.tracker.close()
+            await get_rpc_pool().close()
+
+        assert result["transaction_signature"] in server.state.landed
+        # With this seed the first send is dropped and the resend gets through
+        assert server.state.dropped == 1 and server.state.sends >= 2
+        stats = manager.rebroadcaster.stats()
+        assert stats["landed"] == 1 and stats["resends"] == server.state.sends - 1
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retried_by_the_guard():
+    async with FakeRpcServer(FakeRpcConfig(error_rate=0.2, rate_limit_rate=0.2, retry_after=0.0, seed=1)) as server:
+        client = AsyncClient(server.url)
+        guard = RpcGuard(server.url, base_delay=0.001, max_retries=10, failure_threshold=100)
+        try:
+            for _ in range(20):
+                resp = await guard.call(lambda: client.get_minimum_balance_for_rent_exemption(82))
+                assert resp.value == 1461600
+        finally:
+            await client.close()
+
+        assert server.state.injected_errors > 0 and server.state.injected_rate_limits > 0
+        assert guard.throttled == server.state.injected_rate_limits
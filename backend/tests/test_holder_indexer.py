@@ -0,0 +1,196 @@
+import struct
+from decimal import Decimal
+from types import SimpleNamespace
+
+import base58
+import pytest
+from solders.pubkey import Pubkey
+
+from app.integrations.holder_indexer import HolderIndexer
+
+MINT = Pubkey.new_unique()
+
+class FakeRouter:
+    def __init__(self, holders, decimals=6):
+        # list of (owner, amount), one per token account
+        self.holders = holders
+        self.decimals = decimals
+        self.scans = []
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_account_info(self, pubkey, commitment=None):
+        data = struct.pack("<I32sQB?I32s", 0, bytes(32), 0, self.decimals, True, 0, bytes(32))
+        return SimpleNamespace(value=SimpleNamespace(data=data))
+
+    async def get_program_accounts(self, program_id, commitment=None, encoding=None, data_slice=None, filters=None):
+        assert filters[1].bytes == str(MINT)
+        if data_slice.length == 0:
+            # Account count: keys only
+            return SimpleNamespace(value=[SimpleNamespace(account=SimpleNamespace(data=b"")) for _ in self.holders])
+        assert (data_slice.offset, data_slice.length) == (32, 40)
+        prefix = base58.b58decode(filters[2].bytes)[0] if len(filters) > 2 else None
+        self.scans.append(prefix)
+        value = [
+            SimpleNamespace(account=SimpleNamespace(data=bytes(owner) + struct.pack("<Q", amount)))
+            for owner, amount in self.holders
+            if prefix is None or bytes(owner)[0] == prefix
+        ]
+        return SimpleNamespace(value=value)
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.action = "select"
+        self.payload = None
+        self.window = None
+
+    def select(self, columns):
+        self.columns = [column.split("::")[0] for column in columns.split(",")]
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def is_(self, column, value):
+        assert value == "null"
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        self.payload = values
+        return self
+
+    def order(self, column, desc=False, nullsfirst=False):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def upsert(self, rows, on_conflict="", returning=None):
+        self.action, self.payload = "upsert", rows
+        return self
+
+    def delete(self, returning=None):
+        # The payload is the in_() list, which PostgREST puts in the URL
+        self.action = "delete"
+        return self
+
+    def update(self, values):
+        self.action, self.payload = "update", values
+        return self
+
+    def execute(self):
+        rows = self.db.tables.setdefault(self.table, [])
+        matches = [row for row in rows if all(f(row) for f in self.filters)]
+        if self.action == "select":
+            if self.window:
+                matches = matches[self.window[0]:self.window[1]]
+            data = [{column: str(row[column]) if column == "balance" else row.get(column) for column in self.columns} for row in matches]
+            return SimpleNamespace(data=data)
+        self.db.writes.append((self.table, self.action, self.payload))
+        if self.action == "upsert":
+            for new in self.payload:
+                existing = next((row for row in rows if row["token_id"] == new["token_id"] and row["wallet_address"] == new["wallet_address"]), None)
+                if existing is None:
+                    rows.append(dict(new))
+                else:
+                    existing.update(new)
+        elif self.action == "delete":
+            self.db.tables[self.table] = [row for row in rows if row not in matches]
+        elif self.action == "update":
+            for row in matches:
+                row.update(self.payload)
+        return SimpleNamespace(data=[])
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.writes = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def holder_writes(self):
+        return [write for write in self.writes if write[0] == "token_holders"]
+
+def balances(db):
+    return {row["wallet_address"]: Decimal(row["balance"]) for row in db.tables["token_holders"]}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("partition_threshold", [10_000, 2])
+async def test_index_writes_only_changes(partition_threshold):
+    owners = [Pubkey.new_unique() for _ in range(5)]
+    router = FakeRouter([(owners[0], 1_000_000), (owners[1], 2_500_000), (owners[1], 500_000), (owners[2], 0), (owners[3], 7)])
+    db = FakeSupabase()
+    db.tables["token_wallets"] = [{"token_id": 1, "wallet_address": str(owners[3]), "balance": "0"}]
+    indexer = HolderIndexer(router, db, partition_threshold=partition_threshold)
+    # Partitioning follows the on-chain account count, not a stored holder_count
+    token = {"id": 1, "token_address": str(MINT)}
+
+    result = await indexer.index_token(token)
+
+    # Balances are summed per owner and empty accounts are not holders
+    assert balances(db) == {str(owners[0]): Decimal(1), str(owners[1]): Decimal(3), str(owners[3]): Decimal("0.000007")}
+    assert db.tables["token_wallets"][0]["balance"] == "0.000007"
+    assert (result["holders"], result["updated"], result["partitions"]) == (3, 3, 256 if partition_threshold == 2 else 1)
+    assert db.writes[-1][:2] == ("tokens", "update") and db.writes[-1][2]["holder_count"] == 3
+
+    # Nothing changed: no holder writes
+    db.writes.clear()
+    result = await indexer.index_token(token)
+    assert db.holder_writes() == []
+    assert result["unchanged"] == 3
+
+    # owners[0] sold out, owners[4] bought in
+    db.writes.clear()
+    router.holders = [(owners[1], 3_000_000), (owners[3], 7), (owners[4], 42_000_000)]
+    result = await indexer.index_token(token)
+    assert balances(db) == {str(owners[1]): Decimal(3), str(owners[3]): Decimal("0.000007"), str(owners[4]): Decimal(42)}
+    assert (result["updated"], result["removed"], result["unchanged"]) == (1, 1, 2)
+    upserted = [row["wallet_address"] for table, action, rows in db.holder_writes() if action == "upsert" for row in rows]
+    assert upserted == [str(owners[4])]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("partition_threshold", [10_000, 0])
+async def test_rows_without_owner_prefix_are_diffed_and_backfilled(partition_threshold):
+    owners = [Pubkey.new_unique() for _ in range(3)]
+    router = FakeRouter([(owners[0], 1_000_000), (owners[1], 2_000_000)])
+    db = FakeSupabase()
+    # Written before the owner_prefix column existed
+    db.tables["token_holders"] = [
+        {"token_id": 1, "wallet_address": str(owner), "balance": balance, "owner_prefix": None}
+        for owner, balance in [(owners[0], Decimal(1)), (owners[2], Decimal(5))]
+    ]
+    indexer = HolderIndexer(router, db, partition_threshold=partition_threshold)
+
+    result = await indexer.index_token({"id": 1, "token_address": str(MINT)})
+
+    assert balances(db) == {str(owners[0]): Decimal(1), str(owners[1]): Decimal(2)}
+    assert all(row["owner_prefix"] == bytes(Pubkey.from_string(row["wallet_address"]))[0] for row in db.tables["token_holders"])
+    assert result["removed"] == 1
+
+    db.writes.clear()
+    result = await indexer.index_token({"id": 1, "token_address": str(MINT)})
+    assert db.holder_writes() == [] and result["unchanged"] == 2
+
+@pytest.mark.asyncio
+async def test_removed_holders_are_deleted_in_url_sized_chunks():
+    owners = [Pubkey.new_unique() for _ in range(250)]
+    router = FakeRouter([(owner, 1_000_000) for owner in owners])
+    db = FakeSupabase()
+    indexer = HolderIndexer(router, db)
+    await indexer.index_token({"id": 1, "token_address": str(MINT)})
+
+    router.holders = []
+    db.writes.clear()
+    result = await indexer.index_token({"id": 1, "token_address": str(MINT)})
+
+    assert result["removed"] == 250 and balances(db) == {}
+    assert [len(wallets) for table, action, wallets in db.holder_writes() if action == "delete"] == [100, 100, 50]
@@ -0,0 +1,107 @@
+import asyncio
+import struct
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+from app.integrations.lookup_tables import LookupTableManager
+
+class FakeChain:
+    """Applies create/extend instructions to in-memory tables and serves them back."""
+
+    def __init__(self):
+        self.slot = 100
+        self.tables = {}
+        self.sent = []
+
+    def serialize(self, table):
+        addresses, last_extended_slot = self.tables[table]
+        meta = struct.pack("<IQQB", 1, 2**64 - 1, last_extended_slot, 0) + b"\x00" + b"\x00\x00"
+        return meta + bytes(32) + b"".join(bytes(address) for address in addresses)
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_slot(self, commitment=None):
+        self.slot += 1
+        return SimpleNamespace(value=self.slot)
+
+    async def get_account_info(self, pubkey, commitment=None):
+        if pubkey not in self.tables:
+            return SimpleNamespace(value=None)
+        return SimpleNamespace(value=SimpleNamespace(data=self.serialize(pubkey)))
+
+class FakeSender:
+    def __init__(self, chain):
+        self.chain = chain
+        self.payer = Keypair()
+        self.tracker = self
+
+    def _load_payer(self):
+        return self.payer
+
+    async def wait(self, signature, commitment="confirmed", last_valid_block_height=None, timeout=None):
+        pass
+
+    async def send_instructions(self, instructions, signers, fee_policy="user"):
+        ix = instructions[0]
+        table = ix.accounts[0].pubkey
+        tag = struct.unpack_from("<I", ix.data)[0]
+        if tag == 0:
+            self.chain.tables[table] = ([], 0)
+        else:
+            count = struct.unpack_from("<Q", ix.data, 4)[0]
+            new = [Pubkey.from_bytes(ix.data[12 + 32 * i:44 + 32 * i]) for i in range(count)]
+            self.chain.tables[table] = (self.chain.tables[table][0] + new, self.chain.slot)
+        self.chain.sent.append(tag)
+        return Signature.default(), 1000
+
+@pytest.mark.asyncio
+async def test_ensure_creates_extends_and_caches_tables(tmp_path):
+    chain = FakeChain()
+    sender = FakeSender(chain)
+    manager = LookupTableManager(chain, str(tmp_path / "tables.json"))
+    addresses = [Pubkey.new_unique() for _ in range(300)]
+
+    tables = await manager.ensure(sender, "distribution:mint", addresses)
+
+    assert [len(table.addresses) for table in tables] == [256, 44]
+    assert chain.sent.count(0) == 2
+    assert chain.sent.count(2) == 11
+
+    sent = len(chain.sent)
+    again = await manager.ensure(sender, "distribution:mint", addresses[:10])
+    assert again == tables
+    assert len(chain.sent) == sent
+
+    # A restarted process finds the same tables from the persisted mapping
+    reloaded = LookupTableManager(chain, str(tmp_path / "tables.json"))
+    assert await reloaded.ensure(sender, "distribution:mint", addresses) == tables
+    assert len(chain.sent) == sent
+
+@pytest.mark.asyncio
+async def test_extends_of_a_table_are_confirmed_together(tmp_path):
+    chain = FakeChain()
+    sender = FakeSender(chain)
+    in_flight, most_in_flight = 0, 0
+
+    async def wait(signature, commitment="confirmed", last_valid_block_height=None, timeout=None):
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+
+    sender.wait = wait
+    manager = LookupTableManager(chain, str(tmp_path / "tables.json"))
+    addresses = [Pubkey.new_unique() for _ in range(200)]
+
+    tables = await manager.ensure(sender, "distribution:mint", addresses)
+
+    assert set(tables[0].addresses) == set(addresses)
+    assert chain.sent.count(2) == 7
+    # The seven extends wait for their confirmations together, not one by one
+    assert most_in_flight == 7
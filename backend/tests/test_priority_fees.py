@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from solders.instruction import AccountMeta, Instruction
+from solders.pubkey import Pubkey
+from solders.compute_budget import set_compute_unit_price
+from solders.signature import Signature
+
+from app.integrations.priority_fees import PriorityFeeOracle, has_compute_unit_price
+from app.integrations.signature_tracker import TransactionExpiredError
+
+class FakeRouter:
+    def __init__(self, fees):
+        self.fees = fees
+        self.calls = 0
+
+    async def call(self, fn, hedge=None):
+        self.calls += 1
+        return list(self.fees)
+
+class FakeTracker:
+    def __init__(self):
+        self.futures = []
+
+    def track(self, signature, commitment="confirmed", last_valid_block_height=None):
+        future = asyncio.get_running_loop().create_future()
+        self.futures.append(future)
+        return future
+
+def make_instruction():
+    return Instruction(Pubkey.new_unique(), b"", [AccountMeta(Pubkey.new_unique(), is_signer=False, is_writable=True)])
+
+@pytest.mark.asyncio
+async def test_policies_bid_percentiles_clamped_and_cached():
+    router = FakeRouter([0] * 50 + list(range(1, 51)) * 1)
+    oracle = PriorityFeeOracle(router, FakeTracker(), min_price=1, max_price=40)
+    instructions = [make_instruction()]
+
+    assert await oracle.estimate(instructions, "background") == 1
+    assert await oracle.estimate(instructions, "user") == 40
+    assert await oracle.estimate(instructions, "standard") == 26
+    assert router.calls == 1
+
+    with pytest.raises(ValueError):
+        await oracle.estimate(instructions, "urgent")
+
+@pytest.mark.asyncio
+async def test_compute_unit_price_is_prepended_once():
+    oracle = PriorityFeeOracle(FakeRouter([5000]), FakeTracker())
+    instructions, price = await oracle.with_compute_unit_price([make_instruction()])
+    assert price == 5000
+    assert instructions[0] == set_compute_unit_price(5000)
+    assert has_compute_unit_price(instructions)
+
+    again, price = await oracle.with_compute_unit_price(instructions)
+    assert again == instructions
+    assert price is None
+
+@pytest.mark.asyncio
+async def test_landing_stats_per_policy():
+    tracker = FakeTracker()
+    oracle = PriorityFeeOracle(FakeRouter([0]), tracker)
+    landed, expired = Signature.new_unique(), Signature.new_unique()
+    oracle.signed(landed, "user", 2000)
+    oracle.signed(expired, "user", 10)
+    oracle.sent(landed, 100)
+    oracle.sent(expired, 100)
+
+    tracker.futures[0].set_result(None)
+    tracker.futures[1].set_exception(TransactionExpiredError("expired"))
+    await asyncio.sleep(0)
+
+    stats = oracle.stats()["user"]
+    assert stats["sent"] == 2
+    assert stats["landed"] == 1
+    assert stats["expired"] == 1
+    assert stats["landing_rate"] == 0.5
+    assert stats["price_p50"] == 2000
+    assert stats["time_to_land_p50"] is not None
+
+@pytest.mark.asyncio
+async def test_fees_are_cached_per_transaction_shape():
+    router = FakeRouter([100])
+    oracle = PriorityFeeOracle(router, FakeTracker())
+    program = Pubkey.new_unique()
+
+    def fresh_accounts():
+        # Like create_token: a new mint and token account every time
+        return [Instruction(program, b"", [AccountMeta(Pubkey.new_unique(), is_signer=False, is_writable=True)])]
+
+    for _ in range(5):
+        await oracle.estimate(fresh_accounts())
+    assert router.calls == 1
+
+@pytest.mark.asyncio
+async def test_failed_sends_are_forgotten():
+    oracle = PriorityFeeOracle(FakeRouter([0]), FakeTracker(), max_signed=2)
+    signatures = [Signature.new_unique() for _ in range(3)]
+    oracle.signed(signatures[0], "user", 10)
+    oracle.discard(signatures[0])
+    assert not oracle._signed
+
+    for signature in signatures:
+        oracle.signed(signature, "user", 10)
+    assert list(oracle._signed) == signatures[1:]
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import Message
+from solders.pubkey import Pubkey
+from solders.system_program import TransferParams, transfer
+from solders.transaction import Transaction
+
+from app.integrations import rebroadcast
+from app.integrations.rebroadcast import RebroadcastSender, get_rebroadcast_sender
+from app.integrations.rpc_guard import get_rpc_guard
+from app.integrations.signature_tracker import TransactionExpiredError
+
+class FakeClient:
+    def __init__(self, fail_first=0):
+        self.sent = []
+        self.fail_first = fail_first
+
+    async def send_raw_transaction(self, raw, opts=None):
+        self.sent.append((raw, opts))
+        if len(self.sent) <= self.fail_first:
+            raise Exception("connection reset")
+
+class FakeTracker:
+    def __init__(self, client, land_after=None):
+        self.client = client
+        self.land_after = land_after
+
+    async def wait(self, signature, commitment="confirmed", last_valid_block_height=None, timeout=None):
+        while self.land_after is None or len(self.client.sent) < self.land_after:
+            await asyncio.sleep(0.005)
+            if self.land_after is None and len(self.client.sent) >= 3:
+                raise TransactionExpiredError("Blockhash expired")
+
+def signed_transaction():
+    payer = Keypair()
+    message = Message.new_with_blockhash(
+        [transfer(TransferParams(from_pubkey=payer.pubkey(), to_pubkey=Pubkey.new_unique(), lamports=1))],
+        payer.pubkey(),
+        Hash.new_unique()
+    )
+    return Transaction([payer], message, message.recent_blockhash)
+
+@pytest.mark.asyncio
+async def test_resends_same_bytes_until_landed():
+    client = FakeClient(fail_first=1)
+    sender = RebroadcastSender("http://rebroadcast-landed", client, interval=0.01)
+    tx = signed_transaction()
+
+    await sender.confirm(FakeTracker(client, land_after=4), tx, 1000)
+
+    assert len(client.sent) == 4
+    assert all(raw == bytes(tx) for raw, _ in client.sent)
+    assert all(opts.skip_preflight and opts.max_retries == 0 for _, opts in client.sent)
+    stats = sender.stats()
+    # The failed send is counted but does not stop the loop
+    assert (stats["landed"], stats["resends"], stats["send_errors"]) == (1, 4, 1)
+    assert stats["resends_per_landed_p50"] == 4
+
+@pytest.mark.asyncio
+async def test_stops_resending_once_expired():
+    client = FakeClient()
+    sender = RebroadcastSender("http://rebroadcast-expired", client, interval=0.01)
+
+    with pytest.raises(TransactionExpiredError):
+        await sender.confirm(FakeTracker(client), signed_transaction(), 1000)
+
+    sent = len(client.sent)
+    await asyncio.sleep(0.05)
+    assert len(client.sent) == sent
+    stats = sender.stats()
+    assert (stats["landed"], stats["expired"]) == (0, 1)
+    assert stats["resends_per_landed_p50"] is None
+
+@pytest.mark.asyncio
+async def test_resends_over_budget_are_dropped_without_touching_the_rpc_guard():
+    client = FakeClient()
+    sender = RebroadcastSender("http://rebroadcast-budget", client, interval=0.01, rate=2)
+    guard = get_rpc_guard(sender.url)
+    level = guard.bucket.level
+
+    await sender.confirm(FakeTracker(client, land_after=3), signed_transaction(), 1000)
+
+    # The burst of two went out at once; ticks were dropped until a third token refilled
+    assert len(client.sent) == 3 and sender.dropped > 0 and sender.stats()["resends"] == 3
+    assert guard.calls == 0 and guard.bucket.level >= level
+    # A 429 pause on the endpoint drops resends too
+    guard.bucket.pause(60)
+    assert not await sender._resend(b"raw") and len(client.sent) == 3
+
+@pytest.mark.asyncio
+async def test_pooled_sender_borrows_the_client_on_each_send(monkeypatch):
+    class FakePool:
+        def __init__(self):
+            self.client = FakeClient()
+
+        def get_client(self, endpoint):
+            return self.client
+
+        async def close(self):
+            self.client = FakeClient()
+
+    pool = FakePool()
+    monkeypatch.setattr(rebroadcast, "get_rpc_pool", lambda: pool)
+    monkeypatch.setattr(rebroadcast, "_senders", {})
+    sender = get_rebroadcast_sender("http://rebroadcast-pooled")
+    sender.interval = 0.01
+    tx = signed_transaction()
+
+    before_close = pool.client
+    await sender.confirm(FakeTracker(before_close, land_after=2), tx, 1000)
+    await pool.close()
+    await sender.confirm(FakeTracker(pool.client, land_after=2), tx, 1000)
+
+    # Resends after the pool closed go to its new client, not the closed one
+    assert len(before_close.sent) == 2
+    assert len(pool.client.sent) == 2
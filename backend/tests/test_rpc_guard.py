@@ -0,0 +1,80 @@
+import time
+
+import httpx
+import pytest
+
+from app.integrations.rpc_guard import CircuitBreaker, CircuitOpenError, RpcGuard, TokenBucket
+
+def http_error(status, headers=None):
+    request = httpx.Request("POST", "http://rpc.test")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+class Script:
+    """Raises the scripted errors in order, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+@pytest.mark.asyncio
+async def test_token_bucket_meters_requests_past_the_burst():
+    bucket = TokenBucket(rate=100, capacity=5)
+    started = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+    assert time.monotonic() - started >= 0.09
+    assert bucket.level < 1
+
+@pytest.mark.asyncio
+async def test_rate_limited_call_honors_retry_after_for_everyone():
+    guard = RpcGuard("http://rpc.test", rate=1000, burst=10, base_delay=0.01)
+    fn = Script(http_error(429, {"Retry-After": "0.1"}))
+
+    started = time.monotonic()
+    assert await guard.call(fn) == "ok"
+    assert time.monotonic() - started >= 0.1
+    assert guard.throttled == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_server_errors_then_probes():
+    guard = RpcGuard("http://rpc.test", rate=1000, burst=10, max_retries=10, base_delay=0.001, failure_threshold=3, reset_timeout=0.05)
+
+    with pytest.raises(CircuitOpenError):
+        await guard.call(Script(*[http_error(503)] * 5))
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    assert guard.stats()["breaker_state"] == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await guard.call(Script())
+    assert guard.rejected == 2
+
+    time.sleep(0.06)
+    assert await guard.call(Script()) == "ok"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+@pytest.mark.asyncio
+async def test_node_errors_are_not_retried():
+    guard = RpcGuard("http://rpc.test", rate=1000, burst=10)
+    fn = Script(ValueError("Transaction simulation failed"))
+
+    with pytest.raises(ValueError):
+        await guard.call(fn)
+    assert fn.calls == 1
+    assert guard.breaker.failures == 0
+
+@pytest.mark.asyncio
+async def test_wrapped_transport_errors_are_retried():
+    guard = RpcGuard("http://rpc.test", rate=1000, burst=10, base_delay=0.001)
+    wrapped = Exception("SolanaRpcException")
+    wrapped.__cause__ = httpx.ConnectError("connection refused")
+
+    assert await guard.call(Script(wrapped)) == "ok"
+    assert guard.retries == 1
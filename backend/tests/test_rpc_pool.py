@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.integrations.rpc_pool import RpcClientPool
+
+ENDPOINT = "https://api.devnet.solana.com"
+OTHER_ENDPOINT = "https://api.testnet.solana.com"
+
+def test_clients_share_one_session():
+    pool = RpcClientPool()
+    client = pool.get_client(ENDPOINT)
+
+    assert pool.get_client(ENDPOINT) is client
+    assert pool.get_client(OTHER_ENDPOINT)._provider.session is client._provider.session
+
+@pytest.mark.asyncio
+async def test_close_releases_session_and_clients():
+    pool = RpcClientPool()
+    client = pool.get_client(ENDPOINT)
+    session = client._provider.session
+
+    await pool.close()
+
+    assert session.is_closed
+    assert pool.get_client(ENDPOINT) is not client
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_provider_sessions_are_closed_when_swapped(monkeypatch):
+    pool = RpcClientPool()
+    replaced = []
+    discard = pool._discard_session
+    monkeypatch.setattr(pool, "_discard_session", lambda session: (replaced.append(session), discard(session)))
+
+    client = pool.get_client(ENDPOINT)
+    await asyncio.sleep(0)
+
+    assert replaced[0] is not client._provider.session and replaced[0].is_closed
+
+def test_provider_sessions_swapped_outside_the_loop_close_with_the_pool():
+    pool = RpcClientPool()
+    pool.get_client(ENDPOINT)
+    replaced = list(pool._discarded)
+
+    asyncio.run(pool.close())
+
+    assert replaced and all(session.is_closed for session in replaced) and not pool._discarded
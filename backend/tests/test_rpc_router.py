@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from app.integrations.rpc_pool import RpcClientPool
+from app.integrations.rpc_router import RpcRouter
+
+FAST = "https://fast.example"
+SLOW = "https://slow.example"
+
+def make_router(**kwargs) -> RpcRouter:
+    return RpcRouter([SLOW, FAST], pool=RpcClientPool(), **kwargs)
+
+def test_ranks_by_latency_and_health():
+    router = make_router()
+    slow, fast = router.endpoints
+    router.record(slow, 0.5, error=False)
+    router.record(fast, 0.05, error=False)
+    assert router.ranked()[0] is fast
+
+    for _ in range(10):
+        router.record(fast, 0.0, error=True)
+    assert router.ranked()[0] is slow
+
+def test_unmeasured_endpoints_rank_after_measured_ones():
+    router = RpcRouter([SLOW, FAST, "https://public.example"], pool=RpcClientPool())
+    slow, fast, public = router.endpoints
+    assert router.ranked() == [slow, fast, public]
+
+    router.record(fast, 0.3, error=False)
+    assert router.ranked() == [fast, slow, public]
+
+@pytest.mark.asyncio
+async def test_hedges_slow_primary_to_runner_up():
+    router = make_router(default_hedge_delay=0.01)
+
+    async def read(client):
+        if client._provider.endpoint_uri == SLOW:
+            await asyncio.sleep(1)
+            return SLOW
+        return FAST
+
+    assert await router.call(read) == FAST
+    assert router.hedged_requests == 1
+
+@pytest.mark.asyncio
+async def test_falls_back_when_primary_fails():
+    router = make_router(default_hedge_delay=0.01)
+
+    async def read(client):
+        if client._provider.endpoint_uri == SLOW:
+            raise ConnectionError("boom")
+        return FAST
+
+    assert await router.call(read) == FAST
+    assert router.endpoints[0].errors == 1
@@ -0,0 +1,89 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from solders.keypair import Keypair
+from solders.transaction_status import TransactionConfirmationStatus
+
+from app.integrations.signature_tracker import (
+    SignatureStatusTracker,
+    TransactionExpiredError,
+    TransactionFailedError
+)
+
+def make_signature():
+    return Keypair().sign_message(b"tracker")
+
+class FakeRouter:
+    """Answers getSignatureStatuses from a dict and getBlockHeight from a counter."""
+
+    def __init__(self):
+        self.statuses = {}
+        self.block_height = 100
+        self.batches = []
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_signature_statuses(self, signatures):
+        self.batches.append(len(signatures))
+        return SimpleNamespace(value=[self.statuses.get(signature) for signature in signatures])
+
+    async def get_block_height(self):
+        return SimpleNamespace(value=self.block_height)
+
+@pytest.mark.asyncio
+async def test_polls_all_pending_signatures_in_batches():
+    router = FakeRouter()
+    tracker = SignatureStatusTracker(router, poll_interval=0, batch_size=256)
+    signatures = [make_signature() for _ in range(300)]
+    futures = [tracker.track(signature) for signature in signatures]
+    for signature in signatures:
+        router.statuses[signature] = SimpleNamespace(confirmation_status=TransactionConfirmationStatus.Confirmed, err=None)
+
+    await asyncio.wait_for(asyncio.gather(*futures), 1)
+
+    assert router.batches[:2] == [256, 44]
+    assert tracker.pending_count == 0
+    await tracker.close()
+
+@pytest.mark.asyncio
+async def test_failed_and_expired_signatures_raise():
+    router = FakeRouter()
+    tracker = SignatureStatusTracker(router, poll_interval=0)
+    failed, expired = make_signature(), make_signature()
+    router.statuses[failed] = SimpleNamespace(confirmation_status=TransactionConfirmationStatus.Processed, err="InstructionError")
+    router.block_height = 151
+
+    with pytest.raises(TransactionFailedError):
+        await tracker.wait(failed, timeout=1)
+    with pytest.raises(TransactionExpiredError):
+        await tracker.wait(expired, last_valid_block_height=150, timeout=1)
+    await tracker.close()
+
+@pytest.mark.asyncio
+async def test_landing_between_the_two_reads_is_not_expired():
+    router = FakeRouter()
+    tracker = SignatureStatusTracker(router, poll_interval=0)
+    signature = make_signature()
+
+    class LandsAfterFirstCall:
+        """The transaction lands, and the chain moves past its blockhash, right after the first read."""
+
+        def __init__(self):
+            self.calls = 0
+
+        async def call(self, fn, hedge=None):
+            resp = await fn(router)
+            self.calls += 1
+            if self.calls == 1:
+                router.statuses[signature] = SimpleNamespace(confirmation_status=TransactionConfirmationStatus.Confirmed, err=None)
+                router.block_height = 151
+            return resp
+
+    tracker.router = LandsAfterFirstCall()
+    future = tracker.track(signature, last_valid_block_height=150)
+    await tracker.poll_once()
+
+    assert future.done() and future.exception() is None
+    await tracker.close()
@@ -0,0 +1,72 @@
+import struct
+
+import pytest
+from solders.pubkey import Pubkey
+
+from app.integrations.spl_accounts import (
+    FROZEN,
+    OWNER_AMOUNT_SLICE,
+    TOKEN_ACCOUNT_DTYPE,
+    decode_array,
+    decode_mint,
+    decode_owner_amounts,
+    decode_token_account,
+    decode_token_accounts,
+    pubkey_at
+)
+
+MINT = Pubkey.new_unique()
+DELEGATE = Pubkey.new_unique()
+
+def token_account(owner, amount, delegate=None, state=1, is_native=None):
+    return struct.pack(
+        "<32s32sQI32sBIQQI32s",
+        bytes(MINT), bytes(owner), amount,
+        1 if delegate else 0, bytes(delegate) if delegate else bytes(32),
+        state,
+        0 if is_native is None else 1, is_native or 0,
+        0,
+        0, bytes(32)
+    )
+
+def test_decode_mint_from_memoryview():
+    authority = Pubkey.new_unique()
+    data = bytes(10) + struct.pack("<I32sQB?I32s", 1, bytes(authority), 5_000, 6, True, 0, bytes(32))
+
+    mint = decode_mint(memoryview(data)[10:])
+
+    assert mint.mint_authority == authority
+    assert (mint.supply, mint.decimals, mint.is_initialized, mint.freeze_authority) == (5_000, 6, True, None)
+    with pytest.raises(ValueError):
+        decode_mint(data[:40])
+
+def test_decode_token_accounts_match_single_decode():
+    owners = [Pubkey.new_unique() for _ in range(3)]
+    accounts = [
+        token_account(owners[0], 10),
+        token_account(owners[1], 2**64 - 1, delegate=DELEGATE, state=FROZEN),
+        token_account(owners[2], 0, is_native=2_039_280)
+    ]
+
+    decoded = decode_token_accounts(accounts)
+
+    assert decoded == [decode_token_account(memoryview(data)) for data in accounts]
+    assert [account.owner for account in decoded] == owners
+    assert decoded[1].amount == 2**64 - 1 and decoded[1].delegate == DELEGATE and decoded[1].state == FROZEN
+    assert decoded[2].is_native == 2_039_280 and decoded[0].is_native is None
+
+    offset, length = OWNER_AMOUNT_SLICE
+    assert decode_owner_amounts([data[offset:offset + length] for data in accounts])[0] == (owners[0], 10)
+
+    with pytest.raises(ValueError):
+        decode_token_accounts(accounts + [accounts[0][:100]])
+
+def test_numpy_decode_matches_struct_decode():
+    owners = [Pubkey.new_unique() for _ in range(50)]
+    accounts = [token_account(owner, i) for i, owner in enumerate(owners)]
+
+    array = decode_array(accounts, TOKEN_ACCOUNT_DTYPE)
+
+    assert int(array["amount"].sum()) == sum(range(50))
+    assert pubkey_at(array, "owner", 7) == owners[7]
+    assert pubkey_at(array, "mint", 0) == MINT
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+
+from app.integrations.rebroadcast import RebroadcastSender
+from app.integrations.solana_manager import SolanaTokenManager
+
+class FakeCluster:
+    async def get_rent_exemption(self, size):
+        return 1461600
+
+class FakeTracker:
+    def __init__(self):
+        self.waited = []
+
+    async def wait(self, signature, commitment="confirmed", last_valid_block_height=None, timeout=None):
+        self.waited.append((signature, last_valid_block_height))
+
+def make_manager():
+    payer = Keypair()
+    manager = SolanaTokenManager.__new__(SolanaTokenManager)
+    manager._load_payer = lambda: payer
+    manager.cluster = FakeCluster()
+    manager.tracker = FakeTracker()
+    manager.rebroadcaster = RebroadcastSender("http://localhost:8899", client=None)
+    manager.in_flight = 0
+    manager.max_in_flight = 0
+    manager.reject = None
+
+    async def sign_instructions(instructions, signers):
+        # Really signed, so a missing signer fails the way it would on a live cluster
+        return manager._compile(instructions, signers, None, Hash.default()), 1000
+
+    async def send_transaction(tx, last_valid_block_height):
+        if manager.reject is not None and manager.reject(tx):
+            raise Exception("Transaction simulation failed")
+        manager.in_flight += 1
+        manager.max_in_flight = max(manager.max_in_flight, manager.in_flight)
+        await asyncio.sleep(0.01)
+        manager.in_flight -= 1
+        return tx.signatures[0]
+
+    manager.sign_instructions = sign_instructions
+    manager.send_transaction = send_transaction
+    return manager
+
+def make_token(symbol, creator_wallet):
+    return {
+        "name": f"Token {symbol}",
+        "symbol": symbol,
+        "initial_supply": 1000,
+        "creator_wallet": creator_wallet,
+        "features": {}
+    }
+
+@pytest.mark.asyncio
+async def test_create_tokens_batch_bounds_concurrency_and_confirms_all():
+    manager = make_manager()
+    creator = str(Keypair().pubkey())
+    tokens = [make_token(f"T{i}", creator) for i in range(10)]
+
+    results = await manager.create_tokens_batch(tokens, concurrency=3)
+
+    assert [result["index"] for result in results] == list(range(10))
+    assert all(result["status"] == "success" for result in results)
+    assert [result["token"]["symbol"] for result in results] == [f"T{i}" for i in range(10)]
+    assert manager.max_in_flight == 3
+    assert len(manager.tracker.waited) == 10
+    assert manager.tracker.waited[0][1] == 1000
+
+@pytest.mark.asyncio
+async def test_create_tokens_batch_reports_per_item_failures():
+    manager = make_manager()
+    creator = str(Keypair().pubkey())
+    tokens = [make_token("GOOD", creator), make_token("BAD", "not-a-wallet")]
+
+    results = await manager.create_tokens_batch(tokens)
+
+    assert results[0]["status"] == "success"
+    assert results[1]["status"] == "failed"
+    assert results[1]["error"]
+
+@pytest.mark.asyncio
+async def test_create_tokens_batch_isolates_a_failed_send():
+    manager = make_manager()
+    tokens = [make_token(f"T{i}", str(Keypair().pubkey())) for i in range(5)]
+    rejected = tokens[2]["creator_wallet"]
+    manager.reject = lambda tx: rejected in [str(key) for key in tx.message.account_keys]
+
+    results = await manager.create_tokens_batch(tokens)
+
+    assert [result["status"] for result in results] == ["success", "success", "failed", "success", "success"]
+    assert results[2]["error"] == "Transaction simulation failed"
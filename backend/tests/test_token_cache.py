@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.db import cache as cache_module
+from app.db.cache import MemoryCacheBackend, TokenCache
+
+@pytest.mark.asyncio
+async def test_memory_backend_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    backend = MemoryCacheBackend(max_entries=2)
+
+    await backend.set("a", 1, ttl=5)
+    await backend.set("b", 2, ttl=5)
+    assert await backend.get("a") == 1
+    # "b" is now least recently used
+    await backend.set("c", 3, ttl=5)
+    assert await backend.get("b") is None and await backend.get("c") == 3
+
+    now[0] += 5
+    assert await backend.get("a") is None
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    token_cache = TokenCache(MemoryCacheBackend(), ttl=10)
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1}
+
+    results = await asyncio.gather(*(token_cache.get_token(1, load) for _ in range(10)))
+    assert results == [{"id": 1}] * 10 and loads == 1
+    assert await token_cache.get_token(1, load) == {"id": 1} and loads == 1
+    assert token_cache.stats()["misses"] == 1
+
+    # Misses are not cached
+    assert await token_cache.get_token(2, lambda: asyncio.sleep(0)) is None
+    assert token_cache.stats()["misses"] == 2
+    assert await token_cache.get_token(2, lambda: asyncio.sleep(0)) is None
+    assert token_cache.stats()["misses"] == 3
+
+@pytest.mark.asyncio
+async def test_invalidation_wins_over_a_load_in_flight():
+    token_cache = TokenCache(MemoryCacheBackend(), ttl=10)
+    release = asyncio.Event()
+
+    async def stale_load():
+        await release.wait()
+        return {"id": 1, "status": "fundraising"}
+
+    async def fresh_load():
+        return {"id": 1, "status": "completed"}
+
+    pending = asyncio.ensure_future(token_cache.get_token(1, stale_load))
+    await asyncio.sleep(0)
+    await token_cache.invalidate_token(1)
+    release.set()
+    assert (await pending)["status"] == "fundraising"
+    assert (await token_cache.get_token(1, fresh_load))["status"] == "completed"
+
+@pytest.mark.asyncio
+async def test_list_invalidation_bumps_the_generation():
+    token_cache = TokenCache(MemoryCacheBackend(), ttl=10)
+    pages = iter([["first"], ["second"]])
+
+    async def load():
+        return next(pages)
+
+    query = {"status": "fundraising", "page": 1}
+    assert await token_cache.list_tokens(query, load) == ["first"]
+    assert await token_cache.list_tokens(query, load) == ["first"]
+    await token_cache.invalidate_lists()
+    assert await token_cache.list_tokens(query, load) == ["second"]
@@ -0,0 +1,156 @@
+import asyncio
+import struct
+from types import SimpleNamespace
+
+import pytest
+from solders.pubkey import Pubkey
+from solders.rpc.responses import AccountNotification, SubscriptionResult
+from spl.token.constants import TOKEN_PROGRAM_ID
+
+from app.integrations.derivation_cache import get_derivation_cache
+from app.integrations.token_info import TOKEN_2022_PROGRAM_ID, TokenInfoCache, decode_metadata, decode_mint, decode_token_info
+
+AUTHORITY = Pubkey.new_unique()
+TOKEN_ACCOUNT_SIZE = 165
+
+def mint_data(supply, decimals=9):
+    return struct.pack("<I32sQB?I32s", 1, bytes(AUTHORITY), supply, decimals, True, 0, bytes(32))
+
+def metadata_data(mint, name, symbol):
+    def string(value, size):
+        return struct.pack("<I", size) + value.encode().ljust(size, b"\x00")
+    return bytes([4]) + bytes(AUTHORITY) + bytes(mint) + string(name, 32) + string(symbol, 10) + string("https://x", 200) + struct.pack("<H", 500)
+
+class FakeRouter:
+    def __init__(self, mints):
+        # mint -> supply
+        self.mints = mints
+        self.requests = []
+
+    async def call(self, fn, hedge=None):
+        return await fn(self)
+
+    async def get_multiple_accounts(self, accounts, commitment=None):
+        self.requests.append(accounts)
+        await asyncio.sleep(0)
+        value = []
+        for i in range(0, len(accounts), 2):
+            mint = accounts[i]
+            if mint in self.mints:
+                value.append(SimpleNamespace(data=mint_data(self.mints[mint]), owner=TOKEN_PROGRAM_ID))
+                value.append(SimpleNamespace(data=metadata_data(mint, f"Token {self.mints[mint]}", "TKN")))
+            else:
+                value.extend([None, None])
+        return SimpleNamespace(value=value)
+
+class FakeWebsocket:
+    open = True
+
+    def __init__(self):
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send_data(self, message):
+        self.sent.append(message)
+
+    async def recv(self):
+        return [await self.incoming.get()]
+
+    async def close(self):
+        pass
+
+def cache_with_websocket(router):
+    cache = TokenInfoCache("ws://unused", router)
+    ws = FakeWebsocket()
+    cache._ws = ws
+    cache._reader = asyncio.ensure_future(cache._read_loop(ws))
+    return cache, ws
+
+def test_decode_mint_and_metadata():
+    mint = Pubkey.new_unique()
+
+    assert decode_mint(mint_data(1_000, decimals=6)) == {
+        "mint_authority": str(AUTHORITY),
+        "supply": 1_000,
+        "decimals": 6,
+        "is_initialized": True,
+        "freeze_authority": None
+    }
+    metadata = decode_metadata(metadata_data(mint, "Strata", "STR"))
+    assert (metadata["name"], metadata["symbol"], metadata["uri"]) == ("Strata", "STR", "https://x")
+    assert metadata["seller_fee_basis_points"] == 500
+
+def test_only_initialized_mints_decode():
+    mint = Pubkey.new_unique()
+    metadata = SimpleNamespace(data=metadata_data(mint, "Strata", "STR"))
+
+    assert decode_token_info(mint, SimpleNamespace(data=mint_data(1_000), owner=TOKEN_PROGRAM_ID), metadata)["supply"] == 1_000
+    # A token account is larger than a mint and would decode into nonsense
+    token_account = SimpleNamespace(data=mint_data(1_000) + bytes(83), owner=TOKEN_PROGRAM_ID)
+    assert decode_token_info(mint, token_account, metadata) is None
+    # Right size, wrong owner
+    assert decode_token_info(mint, SimpleNamespace(data=mint_data(1_000), owner=Pubkey.new_unique()), metadata) is None
+    uninitialized = struct.pack("<I32sQB?I32s", 0, bytes(32), 0, 0, False, 0, bytes(32))
+    assert decode_token_info(mint, SimpleNamespace(data=uninitialized, owner=TOKEN_PROGRAM_ID), metadata) is None
+
+    # Token-2022 mints with extensions: padded to the token account size, then the account type
+    extended = mint_data(5) + bytes(TOKEN_ACCOUNT_SIZE - 82) + bytes([1]) + bytes(8)
+    assert decode_token_info(mint, SimpleNamespace(data=extended, owner=TOKEN_2022_PROGRAM_ID), None)["supply"] == 5
+    extended_account = mint_data(5) + bytes(TOKEN_ACCOUNT_SIZE - 82) + bytes([2]) + bytes(8)
+    assert decode_token_info(mint, SimpleNamespace(data=extended_account, owner=TOKEN_2022_PROGRAM_ID), None) is None
+
+@pytest.mark.asyncio
+async def test_fifty_tokens_cost_one_call_and_are_cached():
+    mints = {Pubkey.new_unique(): supply for supply in range(1, 51)}
+    router = FakeRouter(mints)
+    cache = TokenInfoCache("ws://127.0.0.1:1", router)
+
+    addresses = [str(mint) for mint in mints] + ["not-a-mint"]
+    infos = await cache.get_many(addresses)
+
+    assert len(router.requests) == 1
+    assert router.requests[0][1] == get_derivation_cache().metadata_address(next(iter(mints)))
+    assert infos["not-a-mint"] is None
+    assert infos[addresses[0]]["supply"] == 1
+    assert infos[addresses[0]]["metadata"]["name"] == "Token 1"
+
+    await cache.get_many(addresses[:50])
+    assert len(router.requests) == 1
+
+    assert await cache.get(str(Pubkey.new_unique())) is None
+    assert len(router.requests) == 2
+
+    # 120 tokens need three calls, made concurrently
+    more = {Pubkey.new_unique(): 7 for _ in range(120)}
+    router.mints.update(more)
+    await cache.get_many([str(mint) for mint in more])
+    assert len(router.requests) == 5
+    assert max(len(accounts) for accounts in router.requests) == 100
+
+@pytest.mark.asyncio
+async def test_account_notification_invalidates_token():
+    mint = Pubkey.new_unique()
+    router = FakeRouter({mint: 10})
+    cache, ws = cache_with_websocket(router)
+
+    assert (await cache.get(str(mint)))["supply"] == 10
+    # Mint and metadata are both watched
+    assert len(ws.sent) == 2
+    for request_id, subscription_id in ((1, 101), (2, 102)):
+        await ws.incoming.put(SubscriptionResult.from_json(f'{{"jsonrpc":"2.0","result":{subscription_id},"id":{request_id}}}'))
+    await asyncio.sleep(0.01)
+
+    router.mints[mint] = 20
+    assert (await cache.get(str(mint)))["supply"] == 10
+    assert len(router.requests) == 1
+
+    await ws.incoming.put(AccountNotification.from_json(
+        '{"result":{"context":{"slot":1},"value":{"lamports":1,"data":["","base64"],'
+        '"owner":"11111111111111111111111111111111","executable":false,"rentEpoch":0}},"subscription":101}'
+    ))
+    await asyncio.sleep(0.01)
+
+    assert (await cache.get(str(mint)))["supply"] == 20
+    assert len(router.requests) == 2
+    assert cache.invalidations == 1
+    await cache.close()
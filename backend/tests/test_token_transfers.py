@@ -0,0 +1,76 @@
+import struct
+from contextlib import asynccontextmanager
+
+import base58
+import pytest
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from spl.token.constants import ASSOCIATED_TOKEN_PROGRAM_ID, TOKEN_PROGRAM_ID
+
+from app.config import Config
+from app.integrations.rpc_pool import get_rpc_pool
+from app.integrations.solana_manager import SolanaTokenManager
+from scripts.fake_rpc_server import FakeRpcConfig, FakeRpcServer
+
+@asynccontextmanager
+async def localnet(monkeypatch):
+    """A manager whose payer holds a 6-decimal mint, talking to a fake RPC server."""
+    payer = Keypair()
+    monkeypatch.setenv("SOLANA_PAYER_KEY", base58.b58encode(bytes(payer)).decode())
+    monkeypatch.delenv("QUICKNODE_RPC_ENDPOINT", raising=False)
+    for name, value in (("SOLANA_RPC_ENDPOINTS", []), ("SOLANA_FEE_PAYER_KEYS", []), ("SOLANA_WS_ENDPOINT", None), ("SOLANA_SEND_ENDPOINT", None)):
+        monkeypatch.setattr(Config, name, value)
+    async with FakeRpcServer(FakeRpcConfig(slot_time=0.05)) as server:
+        monkeypatch.setattr(Config, "SOLANA_LOCALNET_URL", server.url)
+        mint = Pubkey.new_unique()
+        server.state.add_account(str(mint), struct.pack("<I32sQB?I32s", 0, bytes(32), 0, 6, True, 0, bytes(32)), str(TOKEN_PROGRAM_ID))
+        manager = SolanaTokenManager(network="localnet")
+        try:
+            yield manager, server, str(mint), str(payer.pubkey())
+        finally:
+            await manager.tracker.close()
+            await get_rpc_pool().close()
+
+def instructions(server, signature):
+    tx = server.state.transactions[signature]
+    keys = tx.message.account_keys
+    return [(keys[ix.program_id_index], bytes(ix.data)) for ix in tx.message.instructions]
+
+@pytest.mark.asyncio
+async def test_transfer_token_creates_missing_account_once(monkeypatch):
+    async with localnet(monkeypatch) as (manager, server, mint, payer):
+        recipient = str(Pubkey.new_unique())
+
+        first = await manager.transfer_token(mint, payer, recipient, 1.5)
+        ixs = instructions(server, first["transaction_signature"])
+        assert (ASSOCIATED_TOKEN_PROGRAM_ID, bytes([1])) in ixs
+        assert (TOKEN_PROGRAM_ID, bytes([12]) + struct.pack("<QB", 1_500_000, 6)) in ixs
+
+        # The account is now known to exist: no lookup and no create instruction
+        lookups = server.state.requests["getMultipleAccounts"]
+        second = await manager.transfer_token(mint, payer, recipient, 2)
+        assert server.state.requests["getMultipleAccounts"] == lookups
+        assert ASSOCIATED_TOKEN_PROGRAM_ID not in [program for program, _ in instructions(server, second["transaction_signature"])]
+        # Decimals were read once for both transfers
+        assert server.state.requests["getAccountInfo"] == 1
+
+        with pytest.raises(ValueError):
+            await manager.transfer_token(mint, recipient, payer, 1)
+
+@pytest.mark.asyncio
+async def test_transfer_tokens_batch_packs_recipients(monkeypatch):
+    async with localnet(monkeypatch) as (manager, server, mint, payer):
+        wallets = [str(Pubkey.new_unique()) for _ in range(30)]
+        transfers = [{"wallet_address": wallet, "amount": 1} for wallet in wallets]
+        transfers.insert(3, {"wallet_address": "not-a-wallet", "amount": 1})
+        transfers.insert(7, {"wallet_address": wallets[0], "amount": 0.0000001})
+
+        results = await manager.transfer_tokens_batch(mint, payer, transfers)
+
+        assert [result["index"] for result in results] == list(range(32))
+        assert results[3]["status"] == "failed" and results[7]["status"] == "failed"
+        transferred = [result for result in results if result["status"] == "transferred"]
+        assert [result["to"] for result in transferred] == wallets
+        signatures = {result["transaction_signature"] for result in transferred}
+        assert len(signatures) < len(wallets) / 4
+        assert len(server.state.transactions) == len(signatures)
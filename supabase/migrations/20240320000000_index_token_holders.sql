@@ -0,0 +1,16 @@
+-- Columns used by the on-chain holder indexer
+ALTER TABLE token_holders
+ADD COLUMN IF NOT EXISTS owner_prefix SMALLINT;
+
+ALTER TABLE tokens
+ADD COLUMN IF NOT EXISTS holder_count INTEGER,
+ADD COLUMN IF NOT EXISTS holders_indexed_at TIMESTAMP WITH TIME ZONE;
+
+-- One row per holder, so snapshots can be bulk-upserted
+CREATE UNIQUE INDEX IF NOT EXISTS token_holders_token_wallet_idx ON token_holders(token_id, wallet_address);
+
+-- Large tokens are diffed one owner-prefix partition at a time
+CREATE INDEX IF NOT EXISTS token_holders_token_prefix_idx ON token_holders(token_id, owner_prefix);
+
+-- Scheduled runs pick the least recently indexed tokens first
+CREATE INDEX IF NOT EXISTS tokens_holders_indexed_at_idx ON tokens(holders_indexed_at NULLS FIRST);
@@ -0,0 +1,58 @@
+-- Record a contribution in one call: validate the token, bump amount_raised and
+-- insert the contribution row in the same transaction. The UPDATE takes the token
+-- row lock, so concurrent contributions are serialized instead of overwriting
+-- each other's amount_raised. Returns one row holding both records.
+CREATE OR REPLACE FUNCTION contribute_to_token(
+  token_id_param BIGINT,
+  contributor_wallet_param TEXT,
+  amount_param DECIMAL
+)
+RETURNS TABLE (contribution JSONB, token JSONB)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  token_row tokens%ROWTYPE;
+  contribution_row contributions%ROWTYPE;
+BEGIN
+  IF amount_param IS NULL OR amount_param <= 0 THEN
+    RAISE EXCEPTION 'Invalid amount' USING ERRCODE = '22023';
+  END IF;
+
+  UPDATE tokens
+  SET
+    amount_raised = amount_raised + amount_param,
+    status = CASE
+      WHEN amount_raised + amount_param >= target_raise THEN 'completed'
+      ELSE status
+    END
+  WHERE id = token_id_param
+    AND status = 'fundraising'
+  RETURNING * INTO token_row;
+
+  IF NOT FOUND THEN
+    IF EXISTS (SELECT 1 FROM tokens WHERE id = token_id_param) THEN
+      RAISE EXCEPTION 'Token is not in fundraising stage' USING ERRCODE = 'P0001';
+    END IF;
+    RAISE EXCEPTION 'Token not found' USING ERRCODE = 'P0002';
+  END IF;
+
+  INSERT INTO contributions (
+    token_id,
+    contributor_wallet,
+    amount,
+    token_amount,
+    status
+  )
+  VALUES (
+    token_id_param,
+    contributor_wallet_param,
+    amount_param,
+    amount_param / token_row.price_per_token,
+    'pending'
+  )
+  RETURNING * INTO contribution_row;
+
+  RETURN QUERY SELECT to_jsonb(contribution_row), to_jsonb(token_row);
+END;
+$$;
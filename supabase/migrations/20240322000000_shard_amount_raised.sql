@@ -0,0 +1,219 @@
+-- Sharded amount_raised counters. Contributions add to one of raise_shards
+-- counter rows picked at random instead of updating the token row, so a hot
+-- token's contributions no longer queue on a single row lock. The live total is
+-- tokens.amount_raised plus its shards; fold_amount_raised() periodically moves
+-- the shard sums back into tokens.amount_raised. Reads go through the tokens_live
+-- view, whose live_amount_raised is that total.
+ALTER TABLE tokens
+ADD COLUMN IF NOT EXISTS raise_shards SMALLINT NOT NULL DEFAULT 16 CHECK (raise_shards > 0);
+
+CREATE TABLE IF NOT EXISTS token_raise_shards (
+  token_id BIGINT NOT NULL REFERENCES tokens(id),
+  shard SMALLINT NOT NULL,
+  amount DECIMAL NOT NULL DEFAULT 0,
+  PRIMARY KEY (token_id, shard)
+);
+
+-- Amount raised including contributions not yet folded into the token row
+CREATE OR REPLACE FUNCTION token_amount_raised(token_id_param BIGINT)
+RETURNS DECIMAL
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+  SELECT t.amount_raised + COALESCE(
+    (SELECT SUM(s.amount) FROM token_raise_shards s WHERE s.token_id = t.id),
+    0
+  )
+  FROM tokens t
+  WHERE t.id = token_id_param;
+$$;
+
+-- Token rows with the live total, for the API's detail and list reads. The
+-- subquery runs per returned row, so paged lists only sum the shards they show.
+CREATE OR REPLACE VIEW tokens_live AS
+SELECT
+  t.*,
+  t.amount_raised + COALESCE(
+    (SELECT SUM(s.amount) FROM token_raise_shards s WHERE s.token_id = t.id),
+    0
+  ) AS live_amount_raised
+FROM tokens t;
+
+-- Move the shard sums of one token (or of every token with shards) into
+-- tokens.amount_raised. Shard rows are always locked before the token row, here
+-- and in contribute_to_token, so folds and contributions cannot deadlock.
+-- Concurrent contributions on different shards don't see each other's increments,
+-- so each can find the total still short of the target; the fold sees the committed
+-- sum and completes the raise instead.
+CREATE OR REPLACE FUNCTION fold_amount_raised(token_id_param BIGINT DEFAULT NULL)
+RETURNS TABLE (token_id BIGINT, amount_raised DECIMAL, status TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  shard_token BIGINT;
+  folded DECIMAL;
+BEGIN
+  FOR shard_token IN
+    SELECT DISTINCT s.token_id
+    FROM token_raise_shards s
+    WHERE token_id_param IS NULL OR s.token_id = token_id_param
+  LOOP
+    WITH drained AS (
+      DELETE FROM token_raise_shards s
+      WHERE s.token_id = shard_token
+      RETURNING s.amount
+    )
+    SELECT COALESCE(SUM(drained.amount), 0) INTO folded FROM drained;
+
+    RETURN QUERY
+    UPDATE tokens t
+    SET amount_raised = t.amount_raised + folded,
+        status = CASE
+          WHEN t.status = 'fundraising' AND t.amount_raised + folded >= t.target_raise THEN 'completed'
+          ELSE t.status
+        END
+    WHERE t.id = shard_token
+    RETURNING t.id, t.amount_raised, t.status::TEXT;
+  END LOOP;
+END;
+$$;
+
+-- Same contract as before: one call, one row holding the contribution and the
+-- token (with the live amount_raised). The target check uses the rolled-up total;
+-- only the contribution that reaches it takes the token row lock to flip status.
+CREATE OR REPLACE FUNCTION contribute_to_token(
+  token_id_param BIGINT,
+  contributor_wallet_param TEXT,
+  amount_param DECIMAL
+)
+RETURNS TABLE (contribution JSONB, token JSONB)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  token_row tokens%ROWTYPE;
+  contribution_row contributions%ROWTYPE;
+  raised DECIMAL;
+BEGIN
+  IF amount_param IS NULL OR amount_param <= 0 THEN
+    RAISE EXCEPTION 'Invalid amount' USING ERRCODE = '22023';
+  END IF;
+
+  SELECT * INTO token_row FROM tokens WHERE id = token_id_param;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Token not found' USING ERRCODE = 'P0002';
+  END IF;
+  IF token_row.status <> 'fundraising' THEN
+    RAISE EXCEPTION 'Token is not in fundraising stage' USING ERRCODE = 'P0001';
+  END IF;
+
+  INSERT INTO token_raise_shards (token_id, shard, amount)
+  VALUES (token_id_param, floor(random() * token_row.raise_shards)::SMALLINT, amount_param)
+  ON CONFLICT ON CONSTRAINT token_raise_shards_pkey
+  DO UPDATE SET amount = token_raise_shards.amount + EXCLUDED.amount;
+
+  INSERT INTO contributions (
+    token_id,
+    contributor_wallet,
+    amount,
+    token_amount,
+    status
+  )
+  VALUES (
+    token_id_param,
+    contributor_wallet_param,
+    amount_param,
+    amount_param / token_row.price_per_token,
+    'pending'
+  )
+  RETURNING * INTO contribution_row;
+
+  raised := token_amount_raised(token_id_param);
+  IF raised >= token_row.target_raise THEN
+    UPDATE tokens
+    SET status = 'completed'
+    WHERE id = token_id_param
+      AND status = 'fundraising';
+    IF FOUND THEN
+      token_row.status := 'completed';
+    ELSE
+      -- Another transaction changed the status first; report what it set
+      SELECT status INTO token_row.status FROM tokens WHERE id = token_id_param;
+    END IF;
+  END IF;
+  token_row.amount_raised := raised;
+
+  RETURN QUERY SELECT to_jsonb(contribution_row), to_jsonb(token_row);
+END;
+$$;
+
+-- Refund transfers are recorded with transfer_type 'refund', which the original
+-- check constraint rejected, failing the whole settle with them
+ALTER TABLE token_transfers DROP CONSTRAINT IF EXISTS token_transfers_transfer_type_check;
+ALTER TABLE token_transfers ADD CONSTRAINT token_transfers_transfer_type_check
+  CHECK (transfer_type IN ('transfer', 'vest', 'unlock', 'refund'));
+
+-- Complete or fail (and refund) every raise that has ended or reached its target.
+-- It has to see shard totals too, or a token could be failed and refunded while
+-- its contributions sit in unfolded shards. Contributions no longer update the
+-- token row, so nothing row-triggered would notice a raise ending; the fold job
+-- calls this every minute. Returns the tokens it settled.
+CREATE OR REPLACE FUNCTION settle_fundraising()
+RETURNS TABLE (settled_token_id BIGINT, settled_status TEXT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+  token_record RECORD;
+BEGIN
+  FOR token_record IN
+    SELECT t.id, t.target_raise, t.fundraising_end, token_amount_raised(t.id) AS raised
+    FROM tokens t
+    WHERE t.status = 'fundraising'
+  LOOP
+    -- Still running: period not over (or open-ended) and target not reached
+    CONTINUE WHEN (token_record.fundraising_end IS NULL OR token_record.fundraising_end > NOW())
+      AND token_record.raised < token_record.target_raise;
+
+    settled_token_id := token_record.id;
+    IF token_record.raised >= (token_record.target_raise * 0.5) THEN
+      settled_status := 'completed';
+    ELSE
+      settled_status := 'failed';
+    END IF;
+
+    UPDATE tokens t
+    SET status = settled_status
+    WHERE t.id = token_record.id
+      AND t.status = 'fundraising';
+    -- Settled by a concurrent call or contribution in the meantime
+    CONTINUE WHEN NOT FOUND;
+
+    IF settled_status = 'failed' THEN
+      PERFORM refund_contributions(token_record.id);
+    END IF;
+    RETURN NEXT;
+  END LOOP;
+END;
+$$;
+
+-- Inserting a fundraising token still runs the sweep, as before
+CREATE OR REPLACE FUNCTION check_fundraising_status()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM * FROM settle_fundraising();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- fold_amount_raised() only moves money from the shards into the row, so its
+-- UPDATEs must not re-run the sweep for each token folded; the fold job runs
+-- settle_fundraising() once per pass instead.
+DROP TRIGGER IF EXISTS check_fundraising_status_trigger ON tokens;
+CREATE TRIGGER check_fundraising_status_trigger
+  AFTER INSERT ON tokens
+  FOR EACH ROW
+  WHEN (NEW.status = 'fundraising')
+  EXECUTE FUNCTION check_fundraising_status();
@@ -0,0 +1,10 @@
+-- Token and contribution lists page by (created_at, id), newest first. Each list
+-- query gets an index in that order behind its equality filter, so a cursor page
+-- is an index range scan starting at the cursor instead of an OFFSET scan.
+CREATE INDEX IF NOT EXISTS tokens_created_at_id_idx ON tokens(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS tokens_status_created_at_id_idx ON tokens(status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS tokens_creator_created_at_id_idx ON tokens(creator_wallet, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS contributions_token_created_at_id_idx ON contributions(token_id, created_at DESC, id DESC);